@@ -0,0 +1,256 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+'''
+    Benchmark of race generation on a grid of number of players and players per race, with fixed seeds
+    For each size: seconds, peak memory (tracemalloc), races, repeated pairings and races more than the minimum
+    Primitives of the race search (costOfRace, leastExpensiveRaces) are timed on a tournament generated halfway
+    Results are written as JSON, and can be compared with the JSON of a previous run (baseline) with the same configuration
+    Sizes whose generation is too big (more than --maxWork races scored by a run, estimated) are skipped
+
+    EXAMPLES:
+        python benchmark.py --output baseline.json
+        python benchmark.py --players 8,16,32 --playersPerRace 3,4 --baseline baseline.json
+'''
+
+import argparse
+import json
+import sys
+import tracemalloc
+from itertools import combinations, islice
+from math import comb
+from random import Random
+from time import perf_counter
+
+from tournamentGenerator import Tournament, RandomPlayerGenerator, RaceGenerator, minimumNumberOfRaces
+from tournamentGenerator.raceGenerator import repeatedPairings
+from tournamentGenerator.raceCosts import costOfRace, leastExpensiveRaces
+
+PLAYERS = [8,12,16,24,32,48,64,100,150,200,300]
+PLAYERS_PER_RACE = [2,3,4,5,6,7,8]
+METHODS = ["generate_lowCostForPlayerWithLeastRaces","generate_randomUntilSameNumberOfRaces"]
+# size of the tournament of the primitives
+PRIMITIVES_PLAYERS = 24
+PRIMITIVES_PLAYERS_PER_RACE = 4
+# configuration that must be the same to compare with a baseline
+COMPARED_CONFIG = ("method","incrementalCosts","designs")
+
+def estimatedWork(numberOfPlayers, playersPerRace, method=METHODS[0]):
+    '''
+        races scored by a run, estimated: a search for each race of the minimum number of races,
+        each search scores the races of a fixed player (every race for the races added by generate_randomUntilSameNumberOfRaces)
+    '''
+    races = minimumNumberOfRaces(numberOfPlayers,playersPerRace)
+    if method == "generate_randomUntilSameNumberOfRaces":
+        return races*comb(numberOfPlayers,playersPerRace)
+    return races*comb(numberOfPlayers-1,playersPerRace-1)
+
+def feasible(numberOfPlayers, playersPerRace, maxWork, method=METHODS[0]):
+    ''' checks if a size can be generated: races scored by a run (see estimatedWork) not more than maxWork '''
+    if playersPerRace < 2 or playersPerRace > numberOfPlayers:
+        return False
+    return estimatedWork(numberOfPlayers,playersPerRace,method) <= maxWork
+
+def _generate(numberOfPlayers, playersPerRace, seed, method, incrementalCosts, designs):
+    tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+    raceGenerator = RaceGenerator(playersPerRace,rng=Random(seed),incrementalCosts=incrementalCosts,designs=designs)
+    getattr(raceGenerator,method)(tournament)
+    return tournament
+
+def benchmarkCase(numberOfPlayers, playersPerRace, seed=1, method=METHODS[0], incrementalCosts=False, designs=True, memory=True):
+    ''' generates a tournament and returns its measures as dict (peak memory is measured by a second run) '''
+    start = perf_counter()
+    tournament = _generate(numberOfPlayers,playersPerRace,seed,method,incrementalCosts,designs)
+    seconds = perf_counter() - start
+    result = {\
+        "players": numberOfPlayers,\
+        "playersPerRace": playersPerRace,\
+        "seed": seed,\
+        "seconds": seconds,\
+        "races": len(tournament.races),\
+        "repeatedPairings": repeatedPairings(tournament),\
+        "racesMoreThanMinimum": len(tournament.races) - minimumNumberOfRaces(numberOfPlayers,playersPerRace)\
+    }
+    if memory:
+        # tracemalloc slows down generation, so time is measured without it
+        tracemalloc.start()
+        _generate(numberOfPlayers,playersPerRace,seed,method,incrementalCosts,designs)
+        result["peakMemory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def _bestSeconds(function, repeat):
+    ''' least seconds of repeat calls of function '''
+    best = None
+    for i in range(0,repeat):
+        start = perf_counter()
+        function()
+        seconds = perf_counter() - start
+        if best == None or seconds < best:
+            best = seconds
+    return best
+
+def benchmarkPrimitives(numberOfPlayers=PRIMITIVES_PLAYERS, playersPerRace=PRIMITIVES_PLAYERS_PER_RACE, seed=1, repeat=5):
+    '''
+        times the primitives of the race search on a tournament with half of the minimum number of races,
+        returns dict with the seconds of a call (best of repeat runs) of
+            costOfRace (mean of a call on each race of the players)
+            leastExpensiveRaces of a fixed player, and between every player
+    '''
+    tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+    raceGenerator = RaceGenerator(playersPerRace,rng=Random(seed),designs=False)
+    for race in islice(raceGenerator.iterRaces(tournament),minimumNumberOfRaces(numberOfPlayers,playersPerRace)//2):
+        pass
+    players = tournament.getPlayers()
+    averageNumberOfRaces = tournament.averageNumberOfRaces()
+    races = list(combinations(players,playersPerRace))
+    def costOfRaces():
+        for race in races:
+            costOfRace(race,averageNumberOfRaces)
+    return {\
+        "players": numberOfPlayers,\
+        "playersPerRace": playersPerRace,\
+        "costOfRace": _bestSeconds(costOfRaces,repeat)/len(races),\
+        "leastExpensiveRacesFixedPlayer": _bestSeconds(\
+            lambda : leastExpensiveRaces(players[1:],playersPerRace,averageNumberOfRaces,[players[0]]),repeat),\
+        "leastExpensiveRaces": _bestSeconds(\
+            lambda : leastExpensiveRaces(players,playersPerRace,averageNumberOfRaces),repeat)\
+    }
+
+def runBenchmark(players=PLAYERS, playersPerRace=PLAYERS_PER_RACE, seeds=(1,), method=METHODS[0],\
+        incrementalCosts=False, designs=True, memory=True, maxWork=20000000, primitives=True, log=None):
+    ''' runs benchmarkPrimitives and benchmarkCase on the grid, returns dict with configuration, primitives, results and skipped sizes '''
+    results = []
+    skipped = []
+    primitiveSeconds = None
+    if primitives:
+        primitiveSeconds = benchmarkPrimitives()
+        if log != None:
+            log(_formatPrimitives(primitiveSeconds))
+    for n in players:
+        for k in playersPerRace:
+            if not feasible(n,k,maxWork,method):
+                skipped.append([n,k])
+                continue
+            for seed in seeds:
+                result = benchmarkCase(n,k,seed,method,incrementalCosts,designs,memory)
+                results.append(result)
+                if log != None:
+                    log(_formatResult(result))
+    return {\
+        "config": {\
+            "method": method,\
+            "incrementalCosts": incrementalCosts,\
+            "designs": designs,\
+            "maxWork": maxWork,\
+            "python": sys.version.split()[0]\
+        },\
+        "primitives": primitiveSeconds,\
+        "results": results,\
+        "skipped": skipped\
+    }
+
+def _formatResult(result):
+    line = "players " + str(result["players"]) + ", per race " + str(result["playersPerRace"]) + ", seed " + str(result["seed"])
+    line += ": " + str(round(result["seconds"],3)) + "s, " + str(result["races"]) + " races (+" + str(result["racesMoreThanMinimum"]) + ")"
+    line += ", " + str(result["repeatedPairings"]) + " repeated pairings"
+    if "peakMemory" in result:
+        line += ", " + str(result["peakMemory"] // 1024) + " KiB"
+    return line
+
+def _formatPrimitives(primitives):
+    line = "primitives, players " + str(primitives["players"]) + ", per race " + str(primitives["playersPerRace"])
+    line += ": costOfRace " + str(round(primitives["costOfRace"]*1e6,3)) + "us"
+    line += ", leastExpensiveRaces fixed player " + str(round(primitives["leastExpensiveRacesFixedPlayer"]*1e3,3)) + "ms"
+    line += ", every player " + str(round(primitives["leastExpensiveRaces"]*1e3,3)) + "ms"
+    return line
+
+def compare(benchmark, baseline, tolerance=0.1, minimumSeconds=0.01):
+    '''
+        compares the results of benchmark with the ones of baseline (same players, players per race and seed)
+        returns list of regressions as strings: slower or more memory by more than tolerance, more races or repeated pairings
+        (slower by less than minimumSeconds is not a regression, times that short are noise)
+        primitives are compared if both have them for the same size: slower by more than tolerance
+        raises ValueError if the configuration of baseline is not the same (method, incrementalCosts, designs)
+    '''
+    for key in COMPARED_CONFIG:
+        if benchmark["config"].get(key) != baseline["config"].get(key):
+            raise ValueError("baseline " + key + " is " + str(baseline["config"].get(key)) + ", not " + str(benchmark["config"].get(key)))
+    baselineResults = {(r["players"],r["playersPerRace"],r["seed"]) : r for r in baseline["results"]}
+    regressions = []
+    primitives = benchmark.get("primitives")
+    basePrimitives = baseline.get("primitives")
+    if primitives != None and basePrimitives != None and\
+            (primitives["players"],primitives["playersPerRace"]) == (basePrimitives["players"],basePrimitives["playersPerRace"]):
+        for measure in ("costOfRace","leastExpensiveRacesFixedPlayer","leastExpensiveRaces"):
+            if primitives[measure] > basePrimitives[measure]*(1+tolerance):
+                regressions.append("primitives: " + measure + " " + str(basePrimitives[measure]) + " -> " + str(primitives[measure]))
+    for result in benchmark["results"]:
+        key = (result["players"],result["playersPerRace"],result["seed"])
+        if key not in baselineResults:
+            continue
+        base = baselineResults[key]
+        case = "players " + str(key[0]) + ", per race " + str(key[1]) + ", seed " + str(key[2])
+        for measure in ("seconds","peakMemory"):
+            if measure in result and measure in base and result[measure] > base[measure]*(1+tolerance)\
+                    and (measure != "seconds" or result[measure] - base[measure] > minimumSeconds):
+                regressions.append(case + ": " + measure + " " + str(base[measure]) + " -> " + str(result[measure]))
+        for measure in ("races","repeatedPairings"):
+            if result[measure] > base[measure]:
+                regressions.append(case + ": " + measure + " " + str(base[measure]) + " -> " + str(result[measure]))
+    return regressions
+
+def _integers(s):
+    return [int(x) for x in s.split(",")]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark of race generation")
+    parser.add_argument("--players",type=_integers,default=PLAYERS,help="comma separated numbers of players")
+    parser.add_argument("--playersPerRace",type=_integers,default=PLAYERS_PER_RACE,help="comma separated players per race")
+    parser.add_argument("--seeds",type=_integers,default=[1],help="comma separated seeds")
+    parser.add_argument("--method",choices=METHODS,default=METHODS[0])
+    parser.add_argument("--incrementalCosts",action="store_true")
+    parser.add_argument("--noDesigns",action="store_true",help="always search, even if a design is known")
+    parser.add_argument("--noMemory",action="store_true",help="do not measure peak memory (one run for each size)")
+    parser.add_argument("--maxWork",type=int,default=20000000,help="skip sizes with more races scored by a run (estimated)")
+    parser.add_argument("--noPrimitives",action="store_true",help="do not time the primitives of the race search")
+    parser.add_argument("--output",help="JSON file for the results")
+    parser.add_argument("--baseline",help="JSON file of a previous run to compare with")
+    parser.add_argument("--tolerance",type=float,default=0.1,help="relative increase of time or memory considered a regression")
+    args = parser.parse_args()
+
+    benchmark = runBenchmark(args.players,args.playersPerRace,args.seeds,args.method,args.incrementalCosts,\
+        not args.noDesigns,not args.noMemory,args.maxWork,not args.noPrimitives,print)
+    for n, k in benchmark["skipped"]:
+        print("skipped players " + str(n) + ", per race " + str(k))
+    if args.output != None:
+        with open(args.output,"w") as f:
+            json.dump(benchmark,f,indent=1)
+    if args.baseline != None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(benchmark,baseline,args.tolerance)
+        except ValueError as e:
+            print("ERROR: cannot compare with the baseline: " + str(e))
+            sys.exit(2)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if len(regressions) != 0:
+            sys.exit(1)
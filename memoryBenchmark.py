@@ -0,0 +1,49 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import sys
+import tracemalloc
+from random import Random
+from datetime import time
+
+from tournamentGenerator import Tournament, RandomPlayerGenerator
+
+def tournamentMemory(numberOfPlayers, playersPerRace, numberOfRaces, seed=1, columnarRaces=False):
+    ''' bytes allocated by a tournament of random races, each one with a race result '''
+    rng = Random(seed)
+    tracemalloc.start()
+    tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers),(4,3,2,1),columnarRaces=columnarRaces)
+    players = tournament.players
+    for r in range(0,numberOfRaces):
+        race = rng.sample(players,playersPerRace)
+        tournament.addRace(race)
+        tournament.addRaceResult([(race[i],i+1,time(0,1,rng.randint(0,59),rng.randint(0,999)*1000)) for i in range(0,playersPerRace)])
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 and not (len(sys.argv) == 5 and sys.argv[4] == "columnar"):
+        print("Usage: python memoryBenchmark.py NUMBER_OF_PLAYERS NUMBER_PLAYERS_PER_RACE NUMBER_OF_RACES [columnar]")
+        sys.exit()
+    numberOfPlayers = int(sys.argv[1])
+    playersPerRace = int(sys.argv[2])
+    numberOfRaces = int(sys.argv[3])
+    memory = tournamentMemory(numberOfPlayers,playersPerRace,numberOfRaces,columnarRaces=(len(sys.argv) == 5))
+    print("Memory: " + str(memory // 1024) + " KiB")
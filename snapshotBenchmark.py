@@ -0,0 +1,54 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import sys
+import pickle
+from time import time as now
+from random import Random
+from datetime import time
+
+from tournamentGenerator import Tournament, RandomPlayerGenerator
+from tournamentGenerator.snapshot import dumpSnapshot, loadSnapshot
+
+def randomTournament(numberOfPlayers, playersPerRace, numberOfRaces, seed=1):
+    ''' tournament of random races, each one with a race result '''
+    rng = Random(seed)
+    tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers),(4,3,2,1))
+    players = tournament.getPlayers()
+    for r in range(0,numberOfRaces):
+        race = rng.sample(players,playersPerRace)
+        tournament.addRace(race)
+        tournament.addRaceResult([(race[i],i+1,time(0,1,rng.randint(0,59),rng.randint(0,999)*1000)) for i in range(0,playersPerRace)])
+    return tournament
+
+def timed(function, *args):
+    ''' returns (result, seconds) '''
+    start = now()
+    result = function(*args)
+    return result, now() - start
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print("Usage: python snapshotBenchmark.py NUMBER_OF_PLAYERS NUMBER_PLAYERS_PER_RACE NUMBER_OF_RACES")
+        sys.exit()
+    tournament = randomTournament(int(sys.argv[1]),int(sys.argv[2]),int(sys.argv[3]))
+    for name, dump, load in (("pickle",pickle.dumps,pickle.loads),("snapshot",dumpSnapshot,loadSnapshot)):
+        data, dumpTime = timed(dump,tournament)
+        loaded, loadTime = timed(load,data)
+        print(name + ": " + str(len(data) // 1024) + " KiB, dump " + str(round(dumpTime,3)) + "s, load " + str(round(loadTime,3)) + "s")
@@ -0,0 +1,43 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.bounds import *
+
+class BoundsTest(unittest.TestCase):
+    def test_schonheimBound(self):
+        self.assertEqual(schonheimBound(7,3),7)
+        self.assertEqual(schonheimBound(10,4),8)
+        self.assertEqual(schonheimBound(6,3),6)
+
+    def test_minimumRacesOfEachPlayer(self):
+        # projective plane of order 3
+        self.assertEqual(minimumRacesOfEachPlayer(13,4),4)
+        # 10*3 not divisible by 4
+        self.assertEqual(minimumRacesOfEachPlayer(10,4),4)
+        # 7*2 and 7*3 not divisible by 4
+        self.assertEqual(minimumRacesOfEachPlayer(7,4),4)
+        # would be a design with 8 races and 16 players (Fisher)
+        self.assertEqual(minimumRacesOfEachPlayer(16,6),6)
+
+    def test_minimumNumberOfRaces(self):
+        self.assertEqual(minimumNumberOfRaces(13,4),13)
+        self.assertEqual(minimumNumberOfRaces(9,3),12)
+        self.assertEqual(minimumNumberOfRaces(10,4),10)
+        self.assertEqual(minimumNumberOfRaces(4,4),1)
@@ -0,0 +1,66 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from itertools import combinations
+from tournamentGenerator.designs import *
+
+class DesignsTest(unittest.TestCase):
+    def _checkDesign(self,numberOfPlayers,playersPerRace):
+        races = design(numberOfPlayers,playersPerRace)
+        timesFaced = {}
+        for race in races:
+            self.assertEqual(len(set(race)),playersPerRace)
+            for couple in combinations(sorted(race),2):
+                timesFaced[couple] = timesFaced.get(couple,0) + 1
+        # every couple faces exactly once
+        self.assertEqual(len(timesFaced),numberOfPlayers*(numberOfPlayers-1)//2)
+        self.assertEqual(set(timesFaced.values()),set([1]))
+        return races
+
+    def test_primePower(self):
+        self.assertEqual(primePower(16),(2,4))
+        self.assertEqual(primePower(9),(3,2))
+        self.assertEqual(primePower(7),(7,1))
+        self.assertEqual(primePower(12),None)
+
+    def test_galoisField(self):
+        field = GaloisField(4)
+        # every non zero element has an inverse
+        for a in range(1,4):
+            self.assertEqual(field.mul[a].count(1),1)
+        # characteristic 2
+        for a in range(0,4):
+            self.assertEqual(field.add[a][a],0)
+
+    def test_affinePlane(self):
+        self.assertEqual(len(self._checkDesign(9,3)),12)
+        self.assertEqual(len(self._checkDesign(16,4)),20)
+
+    def test_projectivePlane(self):
+        self.assertEqual(len(self._checkDesign(13,4)),13)
+        self.assertEqual(len(self._checkDesign(31,6)),31)
+
+    def test_steinerTripleSystem(self):
+        self.assertEqual(len(self._checkDesign(15,3)),35)
+        self.assertEqual(len(self._checkDesign(19,3)),57)
+
+    def test_noDesign(self):
+        self.assertEqual(design(12,4),None)
+        self.assertEqual(design(10,3),None)
@@ -0,0 +1,93 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.faceCounts import *
+from tournamentGenerator.tournament import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class FaceCountsTest(unittest.TestCase):
+    def test_addFaced(self):
+        faceCounts = FaceCounts(3)
+        faceCounts.addFaced(0,1)
+        faceCounts.addFaced(0,1)
+        faceCounts.addFaced(1,0)
+        self.assertEqual(faceCounts.timesFaced(0,1),2)
+        self.assertEqual(faceCounts.timesFaced(1,0),1)
+        self.assertFalse(faceCounts.hasFaced(0,2))
+        self.assertEqual(faceCounts.numberPlayersFaced(0),1)
+        self.assertFalse(faceCounts.playerFacedEveryone(0))
+        faceCounts.addFaced(0,2)
+        self.assertTrue(faceCounts.playerFacedEveryone(0))
+        self.assertFalse(faceCounts.everyoneFacedEveryone())
+
+    def test_tournamentAddRace(self):
+        # 4 players (ABCD)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(4))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        tournament.addRace([A,B,C])
+        tournament.addRace([A,B,D])
+        faceCounts = tournament.faceCounts
+        self.assertEqual(faceCounts.timesFaced(A.index,B.index),2)
+        self.assertEqual(faceCounts.timesFaced(B.index,A.index),2)
+        self.assertEqual(faceCounts.timesFaced(C.index,D.index),0)
+        self.assertEqual(A.playersNotFaced(tournament.players),[])
+        self.assertEqual(C.playersNotFaced(tournament.players),[D])
+        self.assertFalse(faceCounts.everyoneFacedEveryone())
+        tournament.addRace([B,C,D])
+        self.assertTrue(faceCounts.everyoneFacedEveryone())
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_numpy(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(3),useNumpy=True)
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        self.assertTrue(tournament.faceCounts.usesNumpy)
+        tournament.addRace([A,B])
+        tournament.addRace([A,B,C])
+        self.assertEqual(A.numberOfTimesAlreadyFaced(B),2)
+        self.assertEqual(B.numberOfTimesAlreadyFaced(C),1)
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+
+    def test_addPlayers(self):
+        faceCounts = FaceCounts(2)
+        faceCounts.addFaced(0,1)
+        faceCounts.addFaced(1,0)
+        faceCounts.addPlayers(1)
+        self.assertEqual(faceCounts.numberOfPlayers,3)
+        self.assertEqual(faceCounts.timesFaced(0,1),1)
+        self.assertFalse(faceCounts.hasFaced(0,2))
+        self.assertFalse(faceCounts.playerFacedEveryone(0))
+        self.assertFalse(faceCounts.everyoneFacedEveryone())
+        for i, j in ((0,2),(2,0),(1,2),(2,1)):
+            faceCounts.addFaced(i,j)
+        self.assertTrue(faceCounts.everyoneFacedEveryone())
+
+    def test_removeFaced(self):
+        faceCounts = FaceCounts(2)
+        faceCounts.addFaced(0,1)
+        faceCounts.addFaced(1,0)
+        self.assertTrue(faceCounts.everyoneFacedEveryone())
+        faceCounts.removeFaced(0,1)
+        self.assertFalse(faceCounts.hasFaced(0,1))
+        self.assertFalse(faceCounts.everyoneFacedEveryone())
@@ -20,6 +20,7 @@ import unittest
 from tournamentGenerator.helper import *
 from tournamentGenerator.player import Player
 from datetime import time
+from random import Random
 
 class PlayerTest(unittest.TestCase):
 
@@ -88,3 +89,17 @@ class PlayerTest(unittest.TestCase):
                 [E,B,C,D]\
             ]\
         )
+
+    def test_timeToMicroseconds(self):
+        self.assertEqual(timeToMicroseconds(time(0,1,21,340000)),81340000)
+        self.assertEqual(microsecondsToTime(81340000),time(0,1,21,340000))
+        self.assertEqual(microsecondsToTime(timeToMicroseconds(time(2,3,4,5))),time(2,3,4,5))
+
+    def test_randomWithRng(self):
+        # same numbers as the methods of the rng
+        self.assertEqual([randomIndex(2**32,Random(7)) for i in range(0,3)],[Random(7).randint(0,2**32-1)]*3)
+        rng, expected = Random(7), Random(7)
+        self.assertEqual([randomFraction(rng) for i in range(0,3)],[expected.random() for i in range(0,3)])
+        for i in range(0,10):
+            self.assertTrue(0 <= randomIndex(3) < 3)
+            self.assertTrue(0 <= randomFraction() < 1)
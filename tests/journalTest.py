@@ -0,0 +1,148 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+import os
+import tempfile
+import shutil
+from datetime import time
+from tournamentGenerator.journal import *
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._basePath = os.path.join(self._directory,"tournament")
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _standings(self, tournament):
+        return (tournament.getStandingsPrintable(),tournament.getFastestLapStandingPrintable(),\
+            [[player.index for player in race] for race in tournament.racesToDo])
+
+    def _tournamentWithJournal(self, journal):
+        # 5 players (ABCDE), 3 races, 2 race results in the journal
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        journal.checkpoint(tournament)
+        journal.addRace(tournament,[B,C,D,E])
+        journal.addRaceResult(tournament,[(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        journal.addRaceResult(tournament,[(E,1,time(0,1,20,0)),(B,2,time(0,1,22,0)),(C,3,time(0,1,21,0)),(D,4,time(0,1,23,0))])
+        return tournament
+
+    def test_recover(self):
+        journal = Journal(self._basePath)
+        tournament = self._tournamentWithJournal(journal)
+        journal.close()
+        self.assertEqual(journal.events,3)
+        recovered = Journal(self._basePath).recover()
+        self.assertEqual(self._standings(recovered),self._standings(tournament))
+        self.assertEqual(len(recovered.races),3)
+
+    def test_recoverIncompleteEvent(self):
+        journal = Journal(self._basePath)
+        self._tournamentWithJournal(journal)
+        journal.close()
+        # the last race result was not completely written
+        size = os.path.getsize(journal.journalPath)
+        with open(journal.journalPath,"r+b") as f:
+            f.truncate(size - 5)
+        recoveredJournal = Journal(self._basePath)
+        recovered = recoveredJournal.recover()
+        self.assertEqual(recoveredJournal.events,2)
+        self.assertEqual(len(recovered.raceResults),1)
+        # incomplete event removed, so new events can be appended
+        self.assertTrue(os.path.getsize(journal.journalPath) < size - 5)
+
+    def test_compact(self):
+        journal = Journal(self._basePath,compactEvery=2)
+        tournament = self._tournamentWithJournal(journal)
+        journal.close()
+        # snapshot after 2 events, 1 event in the journal
+        self.assertEqual(journal.events,1)
+        self.assertEqual(self._standings(Journal(self._basePath).recover()),self._standings(tournament))
+
+    def test_noSnapshot(self):
+        self.assertEqual(Journal(self._basePath).recover(),None)
+
+    def test_logRace(self):
+        # races added by a RaceGenerator are only written to the journal
+        journal = Journal(self._basePath)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        journal.checkpoint(tournament)
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        journal.logRace(tournament,[A,B,C,D])
+        journal.addRaceResult(tournament,[(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        journal.close()
+        recovered = Journal(self._basePath).recover()
+        self.assertEqual(len(recovered.races),1)
+        self.assertEqual(self._standings(recovered),self._standings(tournament))
+
+    def test_crashDuringCheckpoint(self):
+        journal = Journal(self._basePath)
+        tournament = self._tournamentWithJournal(journal)
+        journal.close()
+        with open(journal.journalPath,"rb") as f:
+            oldJournal = f.read()
+        # snapshot replaced, crash before the journal is emptied
+        journal.checkpoint(tournament)
+        journal.close()
+        with open(journal.journalPath,"wb") as f:
+            f.write(oldJournal)
+        recoveredJournal = Journal(self._basePath)
+        recovered = recoveredJournal.recover()
+        # the events of the old journal are not applied again
+        self.assertEqual(recoveredJournal.events,0)
+        self.assertEqual(len(recovered.races),3)
+        self.assertEqual(self._standings(recovered),self._standings(tournament))
+        # new events are appended to the journal of the new snapshot
+        A, B, C, D, E = recovered.players
+        recoveredJournal.addRace(recovered,[A,C,D,E])
+        recoveredJournal.close()
+        self.assertEqual(len(Journal(self._basePath).recover().races),4)
+
+    def test_crashWritingJournalHeader(self):
+        journal = Journal(self._basePath)
+        tournament = self._tournamentWithJournal(journal)
+        journal.close()
+        with open(journal.journalPath,"r+b") as f:
+            f.truncate(3)
+        recovered = Journal(self._basePath).recover()
+        self.assertEqual(len(recovered.races),2)
+
+    def test_noSnapshotOfTheTournament(self):
+        # journal of another tournament on disk
+        journal = Journal(self._basePath)
+        self._tournamentWithJournal(journal)
+        journal.close()
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        journal = Journal(self._basePath)
+        with self.assertRaises(ValueError):
+            journal.addRace(tournament,[A,B,C,D])
+        self.assertEqual(len(tournament.races),0)
+        journal.checkpoint(tournament)
+        journal.addRace(tournament,[A,B,C,D])
+        journal.close()
+        self.assertEqual(len(Journal(self._basePath).recover().races),1)
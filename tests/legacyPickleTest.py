@@ -0,0 +1,80 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+import copyreg
+import pickle
+from datetime import time
+from tournamentGenerator.legacyPickle import *
+from tournamentGenerator.player import Player
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class _Legacy():
+    ''' pickled as an object of cls of the first version (attributes in __dict__) '''
+    def __init__(self, cls, state):
+        self._cls = cls
+        self._state = state
+
+    def __reduce__(self):
+        return (copyreg._reconstructor,(self._cls,object,None),self._state)
+
+def _legacyPlayer(name, races, racesDone, points, fastestLap):
+    return _Legacy(Player,{"_name":name,"_races":races,"_racesDone":racesDone,"_points":points,"_fastestLap":fastestLap,"_facedPlayers":[]})
+
+class LegacyPickleTest(unittest.TestCase):
+    def test_loadPickle(self):
+        # 5 players (ABCDE), 2 races, a race result, pickled by the first version
+        A, B, C, D, E = [_legacyPlayer(name,0,0,0,None) for name in "ABCDE"]
+        legacy = _Legacy(Tournament,{\
+            "_players":[A,B,C,D,E],\
+            "_points":(4,3,2,1),\
+            "_pointsFastestLap":1,\
+            "_races":[[A,B,C,D],[B,C,D,E]],\
+            "_raceResults":[[(B,time(0,1,21,0)),(A,time(0,1,20,0)),(D,time(0,1,22,0)),(C,time(0,1,23,0))]],\
+            "_racesToDo":[[B,C,D,E]],\
+            "_standings":[B,A,D,C,E],\
+            "_standingsFastestLap":[A,B,D,C]\
+        })
+        data = pickle.dumps(legacy)
+        # players of this version have __slots__
+        with self.assertRaises(AttributeError):
+            pickle.loads(data)
+        tournament = loadPickle(data)
+        self.assertEqual([player.name for player in tournament.players],["A","B","C","D","E"])
+        self.assertEqual([[player.name for player in race] for race in tournament.races],[["A","B","C","D"],["B","C","D","E"]])
+        self.assertEqual([[player.name for player in race] for race in tournament.racesToDo],[["B","C","D","E"]])
+        # B first, A second with the fastest lap: same points, in the order of players
+        self.assertEqual([(player.name,player.points) for player in tournament.standings],[("A",4),("B",4),("D",2),("C",1),("E",0)])
+        self.assertEqual(tournament.getFastestLapPlayer().name,"A")
+        A, B, C, D, E = tournament.players
+        self.assertEqual(B.numberOfTimesAlreadyFaced(C),2)
+        self.assertFalse(A.hasFaced(E))
+
+    def test_loadPickleThisVersion(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        loaded = loadPickle(pickle.dumps(tournament))
+        self.assertEqual(loaded.getStandingsPrintable(),tournament.getStandingsPrintable())
+        self.assertEqual(len(loaded.races),1)
+
+    def test_notPickle(self):
+        with self.assertRaises(ValueError):
+            loadPickle(pickle.dumps([1,2,3]))
@@ -0,0 +1,63 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from time import perf_counter
+import unittest
+from random import Random
+from tournamentGenerator.localSearch import *
+from tournamentGenerator.localSearch import _Schedule
+from tournamentGenerator.raceGenerator import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class LocalSearchTest(unittest.TestCase):
+    def test_improveSchedule(self):
+        # 10 players, 4 per race: the search generates 15 races, 10 are enough
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        RaceGenerator(4,rng=Random(1)).generate_lowCostForPlayerWithLeastRaces(tournament)
+        numberOfRaces = len(tournament.races)
+        removed = improveSchedule(tournament,4,5,Random(2))
+        self.assertEqual(len(tournament.races),numberOfRaces-removed)
+        self.assertTrue(removed > 0)
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+
+    def test_improveScheduleAtLowerBound(self):
+        # 9 players, 3 per race: 12 races are the lower bound, no search
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(9))
+        RaceGenerator(3,rng=Random(1)).generate_lowCostForPlayerWithLeastRaces(tournament)
+        self.assertEqual(len(tournament.races),12)
+        start = perf_counter()
+        self.assertEqual(improveSchedule(tournament,3,5,Random(2)),0)
+        self.assertTrue(perf_counter() - start < 1)
+
+    def test_improveScheduleNotValid(self):
+        # not everyone faced everyone, nothing to improve
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5))
+        tournament.addRace(tournament.players[0:4])
+        self.assertEqual(improveSchedule(tournament,4,1),0)
+        self.assertEqual(len(tournament.races),1)
+
+    def test_swapDelta(self):
+        schedule = _Schedule(4,[[0,1],[2,3]])
+        self.assertEqual(schedule.notFaced,4)
+        # 0 with 3, 1 with 2: faced couples are different but still 2
+        self.assertEqual(schedule.swapDelta(0,1,1,3),0)
+        schedule.swap(0,1,1,3)
+        self.assertEqual(schedule.races,[[0,3],[2,1]])
+        self.assertEqual(schedule.notFaced,4)
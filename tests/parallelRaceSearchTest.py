@@ -0,0 +1,49 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.parallelRaceSearch import *
+from tournamentGenerator.raceCosts import *
+from tournamentGenerator.tournament import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class ParallelRaceSearchTest(unittest.TestCase):
+    def test_sameRacesAsLeastExpensiveRaces(self):
+        # 8 players (ABCDEFGH)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(8))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        tournament.addRace([A,B,C])
+        tournament.addRace([A,B,D])
+        tournament.addRace([A,C,D])
+        players = list(tournament.players)
+        players.remove(A) # because I fix A
+        # every search in worker processes
+        with ParallelRaceSearch(2,0) as raceSearch:
+            for playersPerRace in [2,3,4]:
+                self.assertEqual(\
+                    raceSearch(tournament.players,playersPerRace,tournament.averageNumberOfRaces()),\
+                    leastExpensiveRaces(tournament.players,playersPerRace,tournament.averageNumberOfRaces())\
+                )
+                self.assertEqual(\
+                    raceSearch(players,playersPerRace,tournament.averageNumberOfRaces(),[A]),\
+                    leastExpensiveRaces(players,playersPerRace,tournament.averageNumberOfRaces(),[A])\
+                )
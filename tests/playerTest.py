@@ -18,6 +18,9 @@
 
 import unittest
 from tournamentGenerator.player import *
+from tournamentGenerator.faceCounts import FaceCounts
+from tournamentGenerator.playerColumns import PlayerColumns
+from datetime import time
 
 class PlayerTest(unittest.TestCase):
     def _return10players(self):
@@ -43,6 +46,40 @@ class PlayerTest(unittest.TestCase):
 ####################
 ### PLAYER CLASS ###
 ####################
+    def test_attachFaceCounts(self):
+        # counters and faced players move to the columns and face counts, and stay the same
+        playerA = Player("A")
+        playerB = Player("B")
+        playerC = Player("C")
+        playerA.addRace()
+        playerA.addPoints(3)
+        playerA.fastestLap = time(0,1,21,340000)
+        playersFaceEachOther(playerA,playerB)
+        playersFaceEachOther(playerA,playerC)
+        players = [playerA,playerB]
+        self.assertEqual(playerA.faceCounts,None)
+        faceCounts = FaceCounts(2)
+        columns = PlayerColumns(players)
+        for i in range(0,2):
+            players[i].attachFaceCounts(faceCounts,i,columns)
+        for player in players:
+            player.indexFacedPlayers()
+        self.assertEqual(columns.races[0],1)
+        self.assertEqual(playerA.races,1)
+        self.assertEqual(playerA.points,3)
+        self.assertEqual(playerA.fastestLap,time(0,1,21,340000))
+        self.assertEqual(playerB.fastestLap,None)
+        self.assertTrue(faceCounts.hasFaced(0,1))
+        self.assertIs(playerA.faceCounts,faceCounts)
+        # playerC is not in the columns, so it stays in the faced players list
+        self.assertEqual(playerA.facedPlayers,[playerB,playerC])
+        self.assertEqual(playerA.numberPlayersFaced(),2)
+        playersFaceEachOther(playerA,playerB)
+        playerA.addRaceDone()
+        self.assertEqual(playerA.numberOfTimesAlreadyFaced(playerB),2)
+        self.assertEqual(playerA.facedPlayers,[playerB,playerB,playerC])
+        self.assertEqual(playerA.racesDone,1)
+
     def test_hasFaced(self):
         playerA = Player("A")
         playerB = Player("B")
@@ -0,0 +1,66 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from datetime import time
+from tournamentGenerator.raceColumns import *
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class RaceColumnsTest(unittest.TestCase):
+    def test_raceColumns(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5))
+        A, B, C, D, E = tournament.players
+        races = RaceColumns(tournament.players)
+        races.append([A,B,C])
+        races.append([E,D])
+        self.assertEqual(len(races),2)
+        self.assertEqual(races[0],[A,B,C])
+        self.assertEqual(races[-1],[E,D])
+        self.assertEqual(list(races),[[A,B,C],[E,D]])
+        self.assertEqual(list(races.playerIndexes(1)),[4,3])
+        with self.assertRaises(IndexError):
+            races[2]
+        # player not of the tournament
+        with self.assertRaises(ValueError):
+            races.append([A,RandomPlayerGenerator(1).generate()[0]])
+
+    def test_raceResultColumns(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(3))
+        A, B, C = tournament.players
+        raceResults = RaceResultColumns(tournament.players)
+        raceResults.append([(B,time(0,1,21,340000)),(A,time(0,1,20,0))],[1,2])
+        self.assertEqual(raceResults[0],[(B,time(0,1,21,340000)),(A,time(0,1,20,0))])
+        self.assertEqual(list(raceResults.positions(0)),[1,2])
+        self.assertEqual(list(raceResults.lapTimes(0)),[81340000,80000000])
+
+    def test_columnarTournament(self):
+        # same races, results and standings as a tournament with lists
+        tournaments = [Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1),columnarRaces=columnar) for columnar in (False,True)]
+        for tournament in tournaments:
+            A, B, C, D, E = tournament.players
+            tournament.addRace([A,B,C,D])
+            tournament.addRace([A,B,C,E])
+            tournament.addRace([B,C,D,E])
+            tournament.addRaceResult([(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        self.assertEqual([[p.name for p in race] for race in tournaments[1].races],[[p.name for p in race] for race in tournaments[0].races])
+        self.assertEqual([[p.name for p in race] for race in tournaments[1].racesToDo],[[p.name for p in race] for race in tournaments[0].racesToDo])
+        self.assertEqual([[(p.name,t) for p,t in result] for result in tournaments[1].raceResults],[[(p.name,t) for p,t in result] for result in tournaments[0].raceResults])
+        self.assertEqual(tournaments[1].getStandingsPrintable(),tournaments[0].getStandingsPrintable())
+        self.assertTrue(tournaments[1].raceExists([tournaments[1].players[4],tournaments[1].players[1],tournaments[1].players[2],tournaments[1].players[0]]))
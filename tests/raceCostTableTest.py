@@ -0,0 +1,85 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.raceCostTable import *
+from tournamentGenerator.raceCosts import *
+from tournamentGenerator.tournament import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+from tournamentGenerator.raceGenerator import RaceGenerator
+from random import Random
+
+class RaceCostTableTest(unittest.TestCase):
+    def test_leastExpensiveRaces(self):
+        # 7 players (ABCDEFG)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(7))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        E = tournament.players[4]
+        table = RaceCostTable(tournament.players,3)
+        self.assertEqual(len(table),35)
+        for race in [[A,B,C],[A,B,D],[A,C,D],[C,D,E]]:
+            tournament.addRace(race)
+            table.update(race)
+            # same races, in the same order, as leastExpensiveRaces
+            self.assertEqual(\
+                table.leastExpensiveRaces(tournament.players),\
+                leastExpensiveRaces(tournament.players,3,tournament.averageNumberOfRaces())\
+            )
+
+    def test_lazyBuild(self):
+        # 60 players, 5 per race: too many races for the table
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(60))
+        table = RaceCostTable(tournament.players,5)
+        self.assertFalse(table.buildable)
+        with self.assertRaises(ValueError):
+            table.leastExpensiveRaces(tournament.players)
+        self.assertFalse(table.built)
+        # the race generator searches without the table
+        raceGenerator = RaceGenerator(5,incrementalCosts=True,rng=Random(1))
+        raceGenerator._prepareCostTable(tournament)
+        players = tournament.getPlayers()[0:9]
+        race = raceGenerator._leastExpensiveRace(players,tournament.averageNumberOfRaces())
+        self.assertIn(list(race),[list(race) for race in leastExpensiveRaces(players,5,tournament.averageNumberOfRaces())])
+        # 7 players, 3 per race: the table is built by the searches without fixed players only
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(7))
+        raceGenerator = RaceGenerator(3,incrementalCosts=True,rng=Random(1),designs=False)
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        self.assertFalse(raceGenerator._costTable.built)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(7))
+        raceGenerator = RaceGenerator(3,incrementalCosts=True,rng=Random(1),designs=False)
+        raceGenerator.generate_randomUntilSameNumberOfRaces(tournament)
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+
+    def test_cost(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        E = tournament.players[4]
+        table = RaceCostTable(tournament.players,3)
+        for race in [[A,B,C],[C,D,E],[A,B,E]]:
+            tournament.addRace(race)
+            table.update(race)
+        for race in [[D,A,B],[D,A,C],[D,B,E]]:
+            self.assertEqual(round(table.cost(race,tournament.averageNumberOfRaces()),5),round(tournament.costOfRace(race),5))
@@ -123,3 +123,72 @@ class RaceCostsTest(unittest.TestCase):
         E = tournament.players[4]
         # all the races cost the same, so should have 5*4*3*2/(2*3*4) races (all combinations of three players, since one is fixed)
         self.assertEqual(len(leastExpensiveRaces(tournament.players,4,tournament.averageNumberOfRaces())),5)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_leastExpensiveRacesVectorized(self):
+        # 7 players (ABCDEFG)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(7))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        tournament.addRace([A,B,C])
+        tournament.addRace([A,B,D])
+        tournament.addRace([A,C,D])
+        # same races, in the same order, as leastExpensiveRaces
+        for playersPerRace in [2,3,4]:
+            self.assertEqual(\
+                leastExpensiveRacesVectorized(tournament.players,playersPerRace,tournament.averageNumberOfRaces()),\
+                leastExpensiveRaces(tournament.players,playersPerRace,tournament.averageNumberOfRaces())\
+            )
+        players = list(tournament.players)
+        players.remove(A) # because I fix A
+        players.remove(B) # because I fix B
+        self.assertEqual(\
+            leastExpensiveRacesVectorized(players,4,tournament.averageNumberOfRaces(),[A,B]),\
+            leastExpensiveRaces(players,4,tournament.averageNumberOfRaces(),[A,B])\
+        )
+        # only fixed players
+        self.assertEqual(leastExpensiveRacesVectorized(players,2,tournament.averageNumberOfRaces(),[A,B]),[[A,B]])
+
+    def test_leastExpensiveRacesBranchAndBound(self):
+        # 7 players (ABCDEFG)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(7))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        tournament.addRace([A,B,C])
+        tournament.addRace([A,B,D])
+        tournament.addRace([A,C,D])
+        # same races, in the same order, as leastExpensiveRaces
+        for playersPerRace in [2,3,4]:
+            self.assertEqual(\
+                leastExpensiveRacesBranchAndBound(tournament.players,playersPerRace,tournament.averageNumberOfRaces()),\
+                leastExpensiveRaces(tournament.players,playersPerRace,tournament.averageNumberOfRaces())\
+            )
+        players = list(tournament.players)
+        players.remove(A) # because I fix A
+        self.assertEqual(\
+            leastExpensiveRacesBranchAndBound(players,3,tournament.averageNumberOfRaces(),[A]),\
+            leastExpensiveRaces(players,3,tournament.averageNumberOfRaces(),[A])\
+        )
+
+    def test_playerAndRefacingCosts(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C])
+        tournament.addRace([A,B,D])
+        # A fixed: B faced A twice, C and D once
+        playerCost,refacing = playerAndRefacingCosts([B,C,D,E],[A])
+        self.assertEqual(playerCost,[3+9,2+3,2+3,1])
+        self.assertEqual(refacing,[[0,3,3,0],[3,0,0,0],[3,0,0,0],[0,0,0,0]])
+        self.assertEqual(playerAndRefacingCosts([B,C],None),([3,2],[[0,3],[3,0]]))
+        if numpy is not None:
+            playerCost,refacing = playerAndRefacingCosts([B,C,D,E],[A],True)
+            self.assertEqual(playerCost.tolist(),[3+9,2+3,2+3,1])
+            self.assertEqual(refacing.tolist(),[[0,3,3,0],[3,0,0,0],[3,0,0,0],[0,0,0,0]])
+        # races from the indexes of the players
+        self.assertEqual(racesOfIndexes([B,C,D,E],[(0,1),(2,3)],[A]),[[B,C,A],[D,E,A]])
+        self.assertEqual(racesOfIndexes([B,C,D,E],[(0,1)]),[(B,C)])
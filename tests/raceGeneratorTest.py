@@ -0,0 +1,147 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from random import Random
+from threading import Event, Lock
+from tournamentGenerator.raceGenerator import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+from tournamentGenerator.generationStats import GenerationStats
+
+class RaceGeneratorTest(unittest.TestCase):
+    def _generate(self,numberOfPlayers,playersPerRace,seed):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+        raceGenerator = RaceGenerator(playersPerRace,rng=Random(seed))
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        return [[player.name for player in race] for race in tournament.races]
+
+    def test_seededGeneration(self):
+        # same seed, same races
+        self.assertEqual(self._generate(12,4,1),self._generate(12,4,1))
+        self.assertEqual(self._generate(10,3,7),self._generate(10,3,7))
+
+    def test_stats(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        addedRaces = []
+        stats = GenerationStats(lambda race, cost : addedRaces.append(race))
+        raceGenerator = RaceGenerator(4,rng=Random(1),designs=False,stats=stats)
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        self.assertEqual(addedRaces,list(tournament.races))
+        self.assertEqual(len(stats.raceCosts),len(tournament.races))
+        self.assertEqual(stats.searches,len(stats.tieSizes))
+        self.assertTrue(stats.searches > 0 and stats.candidatesScored >= stats.searches)
+        self.assertTrue(min(stats.tieSizes) >= 1)
+        self.assertEqual(set(stats.phaseSeconds),{"allPlayersFaceEachOther","allPlayersSameNumberOfRaces"})
+        # same races with or without stats
+        self.assertEqual([[player.index for player in race] for race in tournament.races],\
+            [[player.index for player in race] for race in self._generateIndexes(10,4,1)])
+
+    def test_iterRaces(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        races = [list(race) for race in RaceGenerator(4,rng=Random(1),designs=False).iterRaces(tournament)]
+        self.assertEqual(races,[list(race) for race in tournament.races])
+        self.assertEqual([[player.index for player in race] for race in races],\
+            [[player.index for player in race] for race in self._generateIndexes(10,4,1)])
+
+    def test_iterRaces_cancel(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        cancel = Event()
+        races = []
+        for race in RaceGenerator(4,rng=Random(1),designs=False).iterRaces(tournament,cancel=cancel):
+            races.append(race)
+            if len(races) == 3:
+                cancel.set()
+        self.assertEqual(len(races),3)
+        self.assertEqual(len(tournament.races),3)
+
+    def test_iterRaces_addRace(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        lock = Lock()
+        searchesWithLock = []
+        class LockCheckingGenerator(RaceGenerator):
+            def _leastExpensiveRace(self,*args):
+                searchesWithLock.append(lock.locked())
+                return RaceGenerator._leastExpensiveRace(self,*args)
+        def addRace(tournament,race):
+            with lock:
+                tournament.addRace(race)
+        races = list(LockCheckingGenerator(4,rng=Random(1),designs=False).iterRaces(tournament,addRace=addRace))
+        # races added by addRace, searched without its lock
+        self.assertEqual([list(race) for race in races],[list(race) for race in tournament.races])
+        self.assertEqual([[player.index for player in race] for race in races],\
+            [[player.index for player in race] for race in self._generateIndexes(10,4,1)])
+        self.assertTrue(len(searchesWithLock) > 0 and not any(searchesWithLock))
+
+    def test_generate_newPlayers(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(20))
+        raceGenerator = RaceGenerator(4,rng=Random(1))
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        races = tournament.getRaces()
+        added = raceGenerator.generate_newPlayers(tournament,[Player("New1"),Player("New2")])
+        # races generated before are kept
+        self.assertEqual(tournament.getRaces()[:len(races)],races)
+        self.assertEqual(added,len(tournament.races) - len(races))
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        self.assertEqual(tournament.getNumberOfPlayers(),22)
+
+    def _generateIndexes(self,numberOfPlayers,playersPerRace,seed):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+        RaceGenerator(playersPerRace,rng=Random(seed),designs=False).generate_lowCostForPlayerWithLeastRaces(tournament)
+        return tournament.races
+
+    def test_generate_bestOf(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        raceGenerator = RaceGenerator(4,rng=Random(1))
+        runs = raceGenerator.generate_bestOf(tournament,5)
+        self.assertTrue(runs >= 1 and runs <= 5)
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        # 13 players, 4 per race: stops as soon as a schedule has the minimum number of races
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(13))
+        raceGenerator = RaceGenerator(4,rng=Random(3))
+        raceGenerator.generate_bestOf(tournament,50,2)
+        self.assertEqual(len(tournament.races),13)
+        self.assertEqual(repeatedPairings(tournament),0)
+        self.assertEqual(raceGenerator.optimalityGap,0)
+        # at least a run is needed
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(10))
+        self.assertRaises(ValueError,RaceGenerator(4).generate_bestOf,tournament,0)
+        self.assertEqual(len(tournament.races),0)
+
+    def test_workersWithRaceSearch(self):
+        # the races are searched by a ParallelRaceSearch, so another raceSearch is refused
+        self.assertRaises(ValueError,RaceGenerator,4,raceSearch=leastExpensiveRacesBranchAndBound,workers=2)
+        raceGenerator = RaceGenerator(4,raceSearch=leastExpensiveRacesBranchAndBound,workers=1)
+        self.assertIs(raceGenerator._raceSearch,leastExpensiveRacesBranchAndBound)
+
+    def test_generate_design(self):
+        # 16 players, 4 per race: affine plane of order 4
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(16))
+        raceGenerator = RaceGenerator(4)
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        self.assertEqual(len(tournament.races),20)
+        self.assertEqual(raceGenerator.optimalityGap,0)
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        # without designs, the search
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(16))
+        raceGenerator = RaceGenerator(4,designs=False)
+        raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+        self.assertTrue(len(tournament.races) >= 20)
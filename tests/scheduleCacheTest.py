@@ -0,0 +1,113 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+import os
+import tempfile
+import shutil
+from random import Random
+from tournamentGenerator.scheduleCache import *
+from tournamentGenerator.raceGenerator import RaceGenerator
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+from tournamentGenerator.playerGeneratorFromFile import PlayerGeneratorFromFile
+
+class ScheduleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._cache = ScheduleCache(os.path.join(self._directory,"cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _schedule(self, numberOfPlayers, playersPerRace, seed):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+        RaceGenerator(playersPerRace,rng=Random(seed),designs=False).generate_lowCostForPlayerWithLeastRaces(tournament)
+        return scheduleOf(tournament)
+
+    def test_getSchedule(self):
+        races = self._schedule(10,4,1)
+        self.assertEqual(self._cache.getSchedule(10,4,1),None)
+        self.assertTrue(self._cache.putSchedule(10,4,races,1))
+        self.assertEqual(self._cache.getSchedule(10,4,1),races)
+        # other keys
+        self.assertEqual(self._cache.getSchedule(10,4),None)
+        self.assertEqual(self._cache.getSchedule(10,4,2),None)
+        self.assertEqual(self._cache.getSchedule(11,4,1),None)
+
+    def test_bestKnown(self):
+        races = self._schedule(10,4,1)
+        self._cache.putSchedule(10,4,races)
+        # more races: not stored
+        self.assertFalse(self._cache.putSchedule(10,4,races + [races[0]]))
+        self.assertEqual(self._cache.getSchedule(10,4),races)
+        # fewer races: stored
+        self.assertTrue(self._cache.putSchedule(10,4,races[1:]))
+        self.assertEqual(self._cache.getSchedule(10,4),races[1:])
+
+    def test_bestKnownSameNumberOfRaces(self):
+        races = self._schedule(10,4,1)
+        # same number of races, a race played twice: more repeated pairings
+        worse = races[:-1] + [races[0]]
+        self.assertTrue(scheduleScoreOf(10,worse) > scheduleScoreOf(10,races))
+        self._cache.putSchedule(10,4,worse)
+        self.assertTrue(self._cache.putSchedule(10,4,races))
+        self.assertEqual(self._cache.getSchedule(10,4),races)
+        self.assertFalse(self._cache.putSchedule(10,4,worse))
+        # as good: the cached one is kept
+        self.assertFalse(self._cache.putSchedule(10,4,list(reversed(races))))
+        self.assertEqual(self._cache.getSchedule(10,4),races)
+
+    def test_evict(self):
+        races = self._schedule(10,4,1)
+        self._cache.putSchedule(10,4,races,1)
+        size = os.path.getsize(self._cache._path(10,4,1))
+        cache = ScheduleCache(self._cache.directory,2*size)
+        cache.putSchedule(10,4,races,2)
+        # schedule 1 used after schedule 2
+        os.utime(cache._path(10,4,2),(0,0))
+        self.assertEqual(cache.getSchedule(10,4,1),races)
+        cache.putSchedule(10,4,races,3)
+        self.assertEqual(cache.getSchedule(10,4,2),None)
+        self.assertEqual(cache.getSchedule(10,4,1),races)
+        self.assertEqual(cache.getSchedule(10,4,3),races)
+
+    def test_invalid(self):
+        self._cache.putSchedule(10,4,self._schedule(10,4,1))
+        path = self._cache._path(10,4,None)
+        with open(path,"r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+        self.assertEqual(self._cache.getSchedule(10,4),None)
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            self._cache.putSchedule(10,4,[[0,1,2]])
+
+    def test_addSchedule(self):
+        # schedule mapped by position onto other players
+        races = self._schedule(10,4,1)
+        filename = os.path.join(self._directory,"players.txt")
+        with open(filename,"w") as f:
+            f.write("".join("Player" + str(i) + "\n" for i in range(0,10)))
+        tournament = Tournament.init_WithPlayerGenerator(PlayerGeneratorFromFile(filename))
+        raceGenerator = RaceGenerator(4)
+        raceGenerator.addSchedule(tournament,races)
+        self.assertEqual([[player.name for player in race] for race in tournament.races],\
+            [["Player" + str(i) for i in race] for race in races])
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
@@ -0,0 +1,47 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.sequenceView import *
+
+class SequenceViewTest(unittest.TestCase):
+    def test_view(self):
+        a = [1,2,3]
+        view = SequenceView(a)
+        self.assertEqual(len(view),3)
+        self.assertEqual(view[1],2)
+        self.assertEqual(view[-1],3)
+        self.assertEqual(view,[1,2,3])
+        self.assertNotEqual(view,[1,2])
+        self.assertTrue(2 in view)
+        # the view follows the changes, the copy does not
+        copy = view.copy()
+        a.append(4)
+        self.assertEqual(view,[1,2,3,4])
+        self.assertEqual(copy,[1,2,3])
+        # read-only
+        with self.assertRaises(TypeError):
+            view[0] = 5
+
+    def test_viewOfFunction(self):
+        a = [[1],[2]]
+        view = SequenceView(lambda : a[-1])
+        self.assertEqual(view,[2])
+        a.append([3,4])
+        self.assertEqual(view,[3,4])
@@ -0,0 +1,195 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+import os
+import io
+import tempfile
+import shutil
+import threading
+import pickle
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from tournamentGenerator.tournamentShell import TournamentShell
+from tournamentGenerator.journal import Journal
+from tournamentGenerator.scheduleCache import ScheduleCache
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class _PausingLock():
+    ''' lock of the shell that stops the background generation after it released the lock pauseAfter times '''
+    def __init__(self, pauseAfter):
+        self._lock = threading.RLock()
+        self._thread = threading.current_thread()
+        self._pauseAfter = pauseAfter
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self._lock.release()
+        if threading.current_thread() is not self._thread:
+            self._pauseAfter -= 1
+            if self._pauseAfter == 0:
+                self.paused.set()
+                self.resume.wait(10)
+
+class ShellGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._basePath = os.path.join(self._directory,"tournament")
+        self._cache = ScheduleCache(os.path.join(self._directory,"cache"))
+        self._output = io.StringIO()
+        self._redirect = redirect_stdout(self._output)
+        self._redirect.__enter__()
+
+    def tearDown(self):
+        self._redirect.__exit__(None,None,None)
+        shutil.rmtree(self._directory)
+
+    def _shell(self, numberOfPlayers=12):
+        return TournamentShell(np=numberOfPlayers,pr=4,p=(4,3,2,1),journal=Journal(self._basePath),scheduleCache=self._cache)
+
+    def _indexes(self, races):
+        return [[player.index for player in race] for race in races]
+
+    def _recover(self):
+        return TournamentShell.init_fromBackup(self._basePath + ".tgs")
+
+    def test_generateInBackground(self):
+        shell = self._shell()
+        shell.onecmd("generateTournament -b")
+        shell.waitGeneration()
+        self.assertFalse(shell.generating)
+        tournament = shell._tournament
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        self.assertEqual(self._indexes(self._recover()._tournament.races),self._indexes(tournament.races))
+        self.assertEqual(self._cache.getSchedule(12,4),self._indexes(tournament.races))
+
+    def test_recoverWhenGenerationStarts(self):
+        shell = self._shell()
+        # the background generation waits for the lock, the backup has no races
+        with shell._lock:
+            shell.onecmd("generateTournament -b")
+            recovered = self._recover()
+        shell.waitGeneration()
+        self.assertEqual(len(recovered._tournament.races),0)
+        self.assertEqual(recovered.playersPerRace,None)
+        self.assertEqual(recovered.numberOfPlayers,12)
+
+    def test_cancelGeneration(self):
+        shell = self._shell()
+        lock = shell._lock = _PausingLock(1)
+        shell.onecmd("generateTournament -b")
+        self.assertTrue(lock.paused.wait(10))
+        self.assertTrue(shell.generating)
+        shell.onecmd("cancelGeneration")
+        lock.resume.set()
+        shell.waitGeneration()
+        # no race generated after cancelling
+        self.assertEqual(len(shell._tournament.races),1)
+        self.assertIn("Generation cancelled: 1 races",self._output.getvalue())
+        self.assertEqual(self._indexes(self._recover()._tournament.races),self._indexes(shell._tournament.races))
+        # incomplete schedule not cached
+        self.assertEqual(self._cache.getSchedule(12,4),None)
+
+    def test_playRaceWhileGenerating(self):
+        shell = self._shell()
+        lock = shell._lock = _PausingLock(2)
+        shell.onecmd("generateTournament -b")
+        self.assertTrue(lock.paused.wait(10))
+        self.assertTrue(shell.generating)
+        with patch("builtins.input",side_effect=["1","1:21:340","2","1:22:450","3","1:23:100","4","1:24:200"]):
+            shell.onecmd("playRace 1")
+        self.assertIn("Race results inserted",self._output.getvalue())
+        lock.resume.set()
+        shell.waitGeneration()
+        tournament = shell._tournament
+        self.assertEqual(len(tournament.raceResults),1)
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        recovered = self._recover()._tournament
+        self.assertEqual(recovered.getStandingsPrintable(),tournament.getStandingsPrintable())
+        self.assertEqual(self._indexes(recovered.racesToDo),self._indexes(tournament.racesToDo))
+
+    def test_addPlayers(self):
+        shell = self._shell()
+        shell.onecmd("generateTournament")
+        races = self._indexes(shell._tournament.races)
+        shell.onecmd("addPlayers New1 New2")
+        tournament = shell._tournament
+        self.assertEqual(shell.numberOfPlayers,14)
+        self.assertEqual(self._indexes(tournament.races)[:len(races)],races)
+        self.assertTrue(tournament.playersSameNumberOfRaces())
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+        recovered = self._recover()
+        self.assertEqual([player.name for player in recovered._tournament.players][-2:],["New1","New2"])
+        self.assertEqual(self._indexes(recovered._tournament.races),self._indexes(tournament.races))
+
+    def test_cachedSchedule(self):
+        shell = self._shell()
+        shell.onecmd("generateTournament")
+        self.assertNotIn("cached schedule",self._output.getvalue())
+        cachedShell = self._shell()
+        cachedShell.onecmd("generateTournament")
+        self.assertIn("Tournament generated (cached schedule)",self._output.getvalue())
+        self.assertEqual(self._indexes(cachedShell._tournament.races),self._indexes(shell._tournament.races))
+        # the cache is used also by the background generation
+        backgroundShell = self._shell()
+        backgroundShell.onecmd("generateTournament -b")
+        self.assertFalse(backgroundShell.generating)
+        self.assertEqual(self._indexes(backgroundShell._tournament.races),self._indexes(shell._tournament.races))
+        # cache skipped (the schedule generated replaces the cached one if better)
+        output = self._output.getvalue()
+        uncachedShell = self._shell()
+        uncachedShell.onecmd("generateTournament --noCache")
+        self.assertNotIn("cached schedule",self._output.getvalue()[len(output):])
+        self.assertTrue(uncachedShell._tournament.playersSameNumberOfRaces())
+
+    def test_playRaceAfterPickleBackup(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        filename = os.path.join(self._directory,"old.p")
+        with open(filename,"wb") as f:
+            pickle.dump(tournament,f)
+        # the shell journals in the working directory
+        directory = os.getcwd()
+        os.chdir(self._directory)
+        try:
+            shell = TournamentShell.init_fromBackup(filename)
+            with patch("builtins.input",side_effect=["1","1:21:340","2","1:22:450","3","1:23:100","4","1:24:200"]):
+                shell.onecmd("playRace 1")
+            recovered = Journal("tournament").recover()
+        finally:
+            os.chdir(directory)
+        self.assertEqual(len(recovered.races),2)
+        self.assertEqual(recovered.getStandingsPrintable(),shell._tournament.getStandingsPrintable())
+
+    def test_printRacesInBackground(self):
+        shell = self._shell()
+        shell.onecmd("generateTournament -b --printRacesOnGenerate")
+        shell.waitGeneration()
+        output = self._output.getvalue()
+        for number in range(1,len(shell._tournament.races)+1):
+            self.assertIn(str(number).rjust(2) + ". [",output)
@@ -0,0 +1,108 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+import os
+import tempfile
+import shutil
+from datetime import time
+from tournamentGenerator.snapshotReader import *
+from tournamentGenerator.snapshot import saveSnapshot
+from tournamentGenerator.journal import Journal
+from tournamentGenerator.tournament import Tournament
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class SnapshotReaderTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._filename = os.path.join(self._directory,"tournament.tgs")
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_snapshotReader(self):
+        # 5 players (ABCDE), 3 races, 2 race results
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        tournament.addRace([B,C,D,E])
+        tournament.addRaceResult([(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        tournament.addRaceResult([(E,1,time(0,1,20,0)),(B,2,time(0,1,22,0)),(C,3,time(0,1,21,0)),(D,4,time(0,1,23,0))])
+        saveSnapshot(tournament,self._filename)
+        with SnapshotReader(self._filename) as reader:
+            self.assertEqual(reader.numberOfPlayers,5)
+            self.assertEqual(reader.points,(4,3,2,1))
+            self.assertEqual(reader.getRaces(),[[0,1,2,3],[0,1,2,4],[1,2,3,4]])
+            self.assertEqual(reader.getRacesToDo(),[[0,1,2,4]])
+            self.assertEqual(reader.getRaceResult(1)[0],(4,time(0,1,20,0)))
+            self.assertEqual(reader.getStandings(),[player.index for player in tournament.getStandings()])
+            self.assertEqual(reader.getStandingsPrintable(),tournament.getStandingsPrintable())
+            self.assertEqual(reader.getFastestLapStanding(),[player.index for player in tournament.getFastestLapStanding()])
+            self.assertEqual(reader.getFastestLapStandingPrintable(),tournament.getFastestLapStandingPrintable())
+            self.assertEqual(reader.playerName(2),C.name)
+            self.assertEqual(reader.playerPoints(0),A.points)
+            self.assertEqual(reader.playerRaces(1),3)
+            self.assertEqual(reader.playerFastestLap(4),time(0,1,20,0))
+
+    def test_journal(self):
+        # 5 players (ABCDE), 2 races in the snapshot, a race and 2 race results in the journal
+        journal = Journal(os.path.join(self._directory,"tournament"))
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        journal.checkpoint(tournament)
+        journal.addRace(tournament,[B,C,D,E])
+        journal.addRaceResult(tournament,[(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        # same fastest lap: first by position
+        journal.addRaceResult(tournament,[(E,2,time(0,1,20,0)),(B,1,time(0,1,20,0)),(C,3,time(0,1,21,0)),(D,4,time(0,1,23,0))])
+        journal.close()
+        with SnapshotReader(self._filename) as reader:
+            self.assertEqual(reader.journalEvents,3)
+            self.assertEqual(reader.numberOfRaces,3)
+            self.assertEqual(reader.numberOfRaceResults,2)
+            self.assertEqual(reader.getRaces(),[[0,1,2,3],[0,1,2,4],[1,2,3,4]])
+            self.assertEqual(reader.getRacesToDo(),[[0,1,2,4]])
+            self.assertEqual(reader.getRaceResult(1),[(1,time(0,1,20,0)),(4,time(0,1,20,0)),(2,time(0,1,21,0)),(3,time(0,1,23,0))])
+            self.assertEqual(reader.getStandingsPrintable(),tournament.getStandingsPrintable())
+            self.assertEqual(reader.getFastestLapStandingPrintable(),tournament.getFastestLapStandingPrintable())
+            self.assertEqual([reader.playerRaces(i) for i in range(0,5)],[player.races for player in tournament.players])
+        # only the snapshot
+        with SnapshotReader(self._filename,journal=False) as reader:
+            self.assertEqual(reader.journalEvents,0)
+            self.assertEqual(reader.numberOfRaces,2)
+            self.assertEqual(reader.getStandings(),[0,1,2,3,4])
+        # journal of the previous snapshot (crash while checkpointing): its events are in the snapshot
+        with open(journal.journalPath,"rb") as f:
+            oldJournal = f.read()
+        journal.checkpoint(tournament)
+        journal.close()
+        with open(journal.journalPath,"wb") as f:
+            f.write(oldJournal)
+        with SnapshotReader(self._filename) as reader:
+            self.assertEqual(reader.journalEvents,0)
+            self.assertEqual(reader.numberOfRaces,3)
+            self.assertEqual(reader.getStandingsPrintable(),tournament.getStandingsPrintable())
+
+    def test_notSnapshot(self):
+        with open(self._filename,"wb") as f:
+            f.write(b"not a tournament snapshot, but long enough to have a header")
+        with self.assertRaises(ValueError):
+            SnapshotReader(self._filename)
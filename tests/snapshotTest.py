@@ -0,0 +1,67 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from datetime import time
+from tournamentGenerator.snapshot import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class SnapshotTest(unittest.TestCase):
+    def _tournament(self, columnarRaces=False):
+        # 5 players (ABCDE), 3 races, 2 race results
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1),2,columnarRaces=columnarRaces)
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        tournament.addRace([B,C,D,E])
+        tournament.addRaceResult([(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(C,2,time(0,1,21,484000)),(D,3,time(0,1,23,0))])
+        tournament.addRaceResult([(E,1,time(0,1,20,0)),(B,2,time(0,1,22,0)),(C,3,time(0,1,21,0)),(D,4,time(0,1,23,0))])
+        return tournament
+
+    def _assertSameTournament(self, a, b):
+        self.assertEqual([player.name for player in a.players],[player.name for player in b.players])
+        self.assertEqual([[player.index for player in race] for race in a.races],[[player.index for player in race] for race in b.races])
+        self.assertEqual([[player.index for player in race] for race in a.racesToDo],[[player.index for player in race] for race in b.racesToDo])
+        self.assertEqual(a.getStandingsPrintable(),b.getStandingsPrintable())
+        self.assertEqual(a.getFastestLapStandingPrintable(),b.getFastestLapStandingPrintable())
+        self.assertEqual(a.points,b.points)
+        self.assertEqual(a.pointsFastestLap,b.pointsFastestLap)
+        self.assertEqual([player.races for player in a.players],[player.races for player in b.players])
+        n = a.getNumberOfPlayers()
+        self.assertEqual([[a.faceCounts.timesFaced(i,j) for j in range(0,n)] for i in range(0,n)],\
+            [[b.faceCounts.timesFaced(i,j) for j in range(0,n)] for i in range(0,n)])
+        self.assertEqual([a.faceCounts.numberPlayersFaced(i) for i in range(0,n)],[b.faceCounts.numberPlayersFaced(i) for i in range(0,n)])
+        self.assertEqual(a.somebodyDidNotFaceEveryone(),b.somebodyDidNotFaceEveryone())
+
+    def test_snapshot(self):
+        for columnarRaces in (False,True):
+            tournament = self._tournament(columnarRaces)
+            data = dumpSnapshot(tournament)
+            loaded = loadSnapshot(data)
+            self._assertSameTournament(tournament,loaded)
+            self.assertEqual(loaded.columnarRaces,columnarRaces)
+            # same snapshot of the loaded tournament
+            self.assertEqual(dumpSnapshot(loaded),data)
+
+    def test_notSnapshot(self):
+        with self.assertRaises(ValueError):
+            loadSnapshot(b"not a snapshot")
+        data = dumpSnapshot(self._tournament())
+        with self.assertRaises(ValueError):
+            loadSnapshot(data[:len(data)//2])
@@ -0,0 +1,51 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import unittest
+from tournamentGenerator.standings import *
+from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
+
+class StandingsTest(unittest.TestCase):
+    def test_addRemove(self):
+        players = RandomPlayerGenerator(4).generate()
+        points = {players[0]:1, players[1]:5, players[2]:1, players[3]:3}
+        standings = Standings(lambda player : (-points[player],players.index(player)),players)
+        self.assertEqual(standings.players,[players[1],players[3],players[0],players[2]])
+        self.assertEqual(standings.first(),players[1])
+        # players[2] goes to first place
+        standings.remove(players[2])
+        self.assertFalse(players[2] in standings)
+        points[players[2]] = 6
+        standings.add(players[2])
+        self.assertTrue(players[2] in standings)
+        self.assertEqual(standings.players,[players[2],players[1],players[3],players[0]])
+        self.assertEqual(len(standings),4)
+
+    def test_rank(self):
+        players = RandomPlayerGenerator(4).generate()
+        points = {players[0]:3, players[1]:5, players[2]:3, players[3]:1}
+        standings = Standings(lambda player : (-points[player],players.index(player)),players)
+        self.assertEqual(standings.rank(players[1]),1)
+        # same points, same rank
+        self.assertEqual(standings.rank(players[0]),2)
+        self.assertEqual(standings.rank(players[2]),2)
+        self.assertEqual(standings.rank(players[3]),4)
+        self.assertEqual(standings.position(players[2]),3)
+        self.assertEqual(standings.top(2),[players[1],players[0]])
+        self.assertEqual(standings.between(2,3),[players[0],players[2]])
@@ -21,6 +21,7 @@ from tournamentGenerator.tournament import *
 from tournamentGenerator.randomPlayerGenerator import RandomPlayerGenerator
 
 from random import shuffle
+import pickle
 
 class TournamentTest(unittest.TestCase):
 
@@ -591,6 +592,72 @@ class TournamentTest(unittest.TestCase):
         self.assertEqual(D.points,3)
         self.assertEqual(E.points,3)
 
+    def test_addRaceResults(self):
+        # 5 players (ABCDE), same results added one by one and in a batch
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        self.generateRaceResult1(tournament)
+        self.generateRaceResult2(tournament)
+        self.generateRaceResult3(tournament)
+        batchTournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A = batchTournament.players[0]
+        B = batchTournament.players[1]
+        C = batchTournament.players[2]
+        D = batchTournament.players[3]
+        E = batchTournament.players[4]
+        batchTournament.addRace([A,B,D,E])
+        batchTournament.addRace([B,C,D,E])
+        batchTournament.addRaceResults(\
+            [\
+                [(A,1,time(0,1,21,340000)),(B,4,time(0,1,22,450000)),(E,2,time(0,1,21,484000)),(D,3,time(0,1,23,000000))],\
+                [(A,2,time(0,1,21,300000)),(B,3,time(0,1,21,450000)),(C,1,time(0,1,20,984000)),(D,4,time(0,1,24,000000))],\
+                [(C,1,time(0,1,25,300000)),(B,3,time(0,1,25,450000)),(D,2,time(0,1,25,984000)),(E,4,time(0,1,26,000000))]\
+            ]\
+        )
+        self.assertEqual(batchTournament.getStandingsPrintable(),tournament.getStandingsPrintable())
+        self.assertEqual(batchTournament.getFastestLapStandingPrintable(),tournament.getFastestLapStandingPrintable())
+        self.assertEqual(len(batchTournament.raceResults),3)
+        self.assertEqual(batchTournament.racesToDo,[])
+
+    def test_playerChangedOutsideOfTournament(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A, B, C, D, E = tournament.players
+        tournament.addRace([B,C,D,E])
+        E.addPoints(10)
+        self.assertEqual(tournament.getStandings()[0],E)
+        E.fastestLap = time(0,1,20,0)
+        self.assertEqual(tournament.getFastestLapStanding(),[E])
+        tournament.addRaceResult([(B,1,time(0,1,19,0)),(C,2,time(0,1,21,0)),(D,3,time(0,1,22,0)),(E,4,time(0,1,23,0))])
+        self.assertEqual([(player.name,player.points) for player in tournament.getStandings()],\
+            [(E.name,11),(B.name,5),(C.name,3),(D.name,2),(A.name,0)])
+        self.assertEqual(tournament.getFastestLapStanding(),[B,E,C,D])
+
+    def test_addRaceResultsNotValid(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        other = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        valid = [(A,1,time(0,1,21,340000)),(B,2,time(0,1,22,450000))]
+        # same position twice
+        with self.assertRaises(ValueError):
+            tournament.addRaceResults([valid,[(A,1,time(0,1,21,340000)),(B,1,time(0,1,22,450000))]])
+        # player of another tournament
+        with self.assertRaises(ValueError):
+            tournament.addRaceResults([valid,[(A,1,time(0,1,21,340000)),(other.players[1],2,time(0,1,22,450000))]])
+        # time not of type time
+        with self.assertRaises(TypeError):
+            tournament.addRaceResults([valid,[(A,1,81.34),(B,2,time(0,1,22,450000))]])
+        # position not an int, or not between 1 and the players of the race
+        for position in ('2',0,3,2.0):
+            with self.assertRaises(ValueError):
+                tournament.addRaceResults([valid,[(A,1,time(0,1,21,340000)),(B,position,time(0,1,22,450000))]])
+        # nothing added
+        self.assertEqual(tournament.raceResults,[])
+        self.assertEqual(A.points,0)
+        self.assertEqual(tournament.getFastestLapStanding(),[])
+        self.assertEqual(len(tournament.getStandings()),5)
+
 ### HELPER FUNCTION ###
     def generateRaceResult1(self,tournament):
         A = tournament.players[0]
@@ -686,6 +753,31 @@ class TournamentTest(unittest.TestCase):
         self.generateRaceResult3(tournament)
         self.assertEqual(tournament.getStandings(),[C,A,D,B,E])
 
+    def test_getRank(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        self.generateRaceResult1(tournament)
+        self.generateRaceResult2(tournament)
+        self.generateRaceResult3(tournament)
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        E = tournament.players[4]
+        # C 10, A 8, D 6, B 5, E 4
+        self.assertEqual(tournament.getRank(C),1)
+        self.assertEqual(tournament.getRank(B),4)
+        self.assertEqual(tournament.getTopStandings(2),[C,A])
+        self.assertEqual(tournament.getStandingsBetween(2,4),[A,D,B])
+
+    def test_pickle(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        self.generateRaceResult1(tournament)
+        copy = pickle.loads(pickle.dumps(tournament))
+        self.assertEqual(copy.getStandingsPrintable(),tournament.getStandingsPrintable())
+        self.assertEqual(copy.getFastestLapStandingPrintable(),tournament.getFastestLapStandingPrintable())
+
     def test_getFastestLapStandingPrintable(self):
         # 5 players (ABCDE)
         tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
@@ -830,6 +922,112 @@ class TournamentTest(unittest.TestCase):
             ]\
         )
 
+    def test_getRacesToDoDuplicateRaces(self):
+        # 4 players (ABCD)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(4),(4,3,2,1))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        # race result added before its race
+        tournament.addRaceResult(\
+            [\
+                (C,1,time(0,1,21,340000)),\
+                (B,2,time(0,1,22,450000)),\
+                (A,3,time(0,1,21,484000))\
+            ]\
+        )
+        # same race twice
+        tournament.addRace([A,B,C])
+        tournament.addRace([B,C,D])
+        tournament.addRace([D,C,B])
+        self.assertTrue(tournament.raceExists([C,D,B]))
+        self.assertFalse(tournament.raceExists([A,B,D]))
+        self.assertEqual(tournament.racesToDo,[[B,C,D],[D,C,B]])
+        # one result removes only one of the same races
+        tournament.addRaceResult(\
+            [\
+                (D,1,time(0,1,21,340000)),\
+                (B,2,time(0,1,22,450000)),\
+                (C,3,time(0,1,21,484000))\
+            ]\
+        )
+        self.assertEqual(tournament.racesToDo,[[D,C,B]])
+        self.assertEqual(tournament.getRaceToDo(0),[D,C,B])
+
+    def test_views(self):
+        # 5 players (ABCDE)
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
+        A = tournament.players[0]
+        B = tournament.players[1]
+        C = tournament.players[2]
+        D = tournament.players[3]
+        E = tournament.players[4]
+        races = tournament.races
+        racesToDo = tournament.racesToDo
+        standings = tournament.standings
+        copy = tournament.getRacesToDo()
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        # views follow the tournament, copies do not
+        self.assertEqual(races,[[A,B,C,D],[A,B,C,E]])
+        self.assertEqual(racesToDo,[[A,B,C,D],[A,B,C,E]])
+        self.assertEqual(copy,[])
+        self.generateRaceResult1(tournament)
+        self.assertEqual(racesToDo,[[A,B,C,D],[A,B,C,E]])
+        self.generateRaceResult2(tournament)
+        self.assertEqual(racesToDo,[[A,B,C,E]])
+        self.assertEqual(tournament.getRaceToDo(0),[A,B,C,E])
+        self.assertEqual(standings,tournament.getStandings())
+        self.assertEqual(standings[0],A)
+        with self.assertRaises(TypeError):
+            tournament.players[0] = B
+
+    def test_playersOfOtherTournament(self):
+        tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5))
+        with self.assertRaises(ValueError):
+            Tournament(tournament.getPlayers())
+        A = Player("A")
+        with self.assertRaises(ValueError):
+            Tournament([A,A])
+        # the first tournament still works
+        A, B, C, D, E = tournament.players
+        tournament.addRace([A,B,C,D])
+        tournament.addRace([A,B,C,E])
+        tournament.addRace([B,C,D,E])
+        tournament.addRace([A,D,E,B])
+        self.assertFalse(tournament.somebodyDidNotFaceEveryone())
+
+    def test_addPlayers(self):
+        # 5 players (ABCDE), F and G join after a race result
+        for columnarRaces in (False,True):
+            tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1),columnarRaces=columnarRaces)
+            self.generateRaceResult1(tournament)
+            A, B, C, D, E = tournament.players
+            standings = tournament.getStandingsPrintable()
+            F = Player("F")
+            G = Player("G")
+            tournament.addPlayers([F,G])
+            self.assertEqual(tournament.getNumberOfPlayers(),7)
+            self.assertEqual((F.index,G.index),(5,6))
+            self.assertEqual(tournament.getStandings()[-2:],[F,G])
+            self.assertEqual(tournament.getStandingsPrintable()[:len(standings)-1],standings[:-1])
+            self.assertTrue(tournament.somebodyDidNotFaceEveryone())
+            self.assertFalse(A.hasFaced(F))
+            tournament.addRace([A,B,F,G])
+            self.assertTrue(F.hasFaced(A))
+            self.assertEqual(F.races,1)
+            self.assertTrue(tournament.raceExists([A,B,F,G]))
+            tournament.addRaceResult([(A,2,time(0,1,21,0)),(B,3,time(0,1,22,0)),(F,1,time(0,1,20,0)),(G,4,time(0,1,23,0))])
+            self.assertEqual(tournament.getFastestLapPlayer(),F)
+            # first and fastest lap
+            self.assertEqual(F.points,5)
+        with self.assertRaises(ValueError):
+            tournament.addPlayers([A])
+        H = Player("H")
+        with self.assertRaises(ValueError):
+            tournament.addPlayers([H,H])
+
     def test_getRacesToDo2(self):
         # 5 players (ABCDE)
         tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(5),(4,3,2,1))
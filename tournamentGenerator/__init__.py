@@ -5,3 +5,18 @@ from .player import *
 from .raceCosts import *
 from .randomPlayerGenerator import *
 from .playerGeneratorFromFile import *
+from .faceCounts import FaceCounts
+from .raceCostTable import RaceCostTable
+from .parallelRaceSearch import ParallelRaceSearch
+from .bounds import *
+from .designs import design
+from .localSearch import improveSchedule
+from .standings import Standings
+from .playerColumns import PlayerColumns
+from .raceColumns import RaceColumns, RaceResultColumns
+from .sequenceView import SequenceView
+from .snapshot import saveSnapshot, loadSnapshotFile
+from .journal import Journal
+from .snapshotReader import SnapshotReader
+from .generationStats import GenerationStats
+from .scheduleCache import ScheduleCache
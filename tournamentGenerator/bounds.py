@@ -0,0 +1,63 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+def _ceilDivision(a, b):
+    return -(-a // b)
+
+def schonheimBound(numberOfPlayers, playersPerRace, t=2):
+    '''
+        Schönheim bound: minimum number of races so that every group of t players is in a race
+            L(v,k,t) = ceil(v/k * L(v-1,k-1,t-1)), with L(v,k,0) = 1
+    '''
+    if t == 0:
+        return 1
+    return _ceilDivision(numberOfPlayers * schonheimBound(numberOfPlayers-1,playersPerRace-1,t-1),playersPerRace)
+
+def minimumRacesOfEachPlayer(numberOfPlayers, playersPerRace):
+    '''
+        minimum number of races of each player so that everyone faces everyone with same number of races:
+            each player faces at most playersPerRace-1 players per race
+            number of races * playersPerRace = numberOfPlayers * races of each player
+            if nobody faces anyone twice, the races are a design, which needs numberOfPlayers races at least (Fisher)
+    '''
+    if playersPerRace < 2:
+        raise ValueError("Players per race must be at least 2")
+    if numberOfPlayers <= playersPerRace:
+        return 1
+    races = _ceilDivision(numberOfPlayers-1,playersPerRace-1)
+    while True:
+        # number of players faced more than once by each player
+        repeated = (playersPerRace-1)*races - (numberOfPlayers-1)
+        if (numberOfPlayers*races) % playersPerRace == 0:
+            if repeated != 0 or numberOfPlayers*races // playersPerRace >= numberOfPlayers:
+                return races
+        races += 1
+
+def minimumNumberOfRaces(numberOfPlayers, playersPerRace):
+    ''' lower bound of the number of races so that everyone faces everyone with same number of races '''
+    if numberOfPlayers <= playersPerRace:
+        return 1
+    return max(\
+        schonheimBound(numberOfPlayers,playersPerRace),\
+        numberOfPlayers*minimumRacesOfEachPlayer(numberOfPlayers,playersPerRace) // playersPerRace\
+    )
+
+def optimalityGap(tournament, playersPerRace):
+    ''' number of races of tournament more than the lower bound '''
+    return len(tournament.races) - minimumNumberOfRaces(tournament.getNumberOfPlayers(),playersPerRace)
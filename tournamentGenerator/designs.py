@@ -0,0 +1,192 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from itertools import combinations, product
+
+def primePower(q):
+    ''' returns (p,m) if q = p^m with p prime, None otherwise '''
+    if q < 2:
+        return None
+    p = 2
+    while q % p != 0:
+        p += 1
+    m = 0
+    while q % p == 0:
+        q //= p
+        m += 1
+    if q != 1:
+        return None
+    return (p,m)
+
+class GaloisField():
+    '''
+        finite field with q = p^m elements, numbered 0..q-1
+            element a is the polynomial with the base p digits of a as coefficients (lowest first)
+            multiplication is modulo a monic irreducible polynomial of degree m
+        addition and multiplication are precomputed in tables
+    '''
+    def __init__(self, q):
+        p,m = primePower(q)
+        self._q = q
+        elements = [self._digits(a,p,m) for a in range(0,q)]
+        modulus = self._irreducible(p,m)
+        self.add = [[self._number([(x+y) % p for x,y in zip(a,b)],p) for b in elements] for a in elements]
+        self.mul = [[self._number(self._multiply(a,b,modulus,p),p) for b in elements] for a in elements]
+
+    @property
+    def q(self):
+        return self._q
+
+    def _digits(self,a,p,m):
+        digits = []
+        for i in range(0,m):
+            digits.append(a % p)
+            a //= p
+        return digits
+
+    def _number(self,digits,p):
+        a = 0
+        for digit in reversed(digits):
+            a = a*p + digit
+        return a
+
+    def _remainder(self,a,modulus,p):
+        ''' remainder of polynomial a divided by monic polynomial modulus '''
+        a = list(a)
+        m = len(modulus) - 1
+        for i in range(len(a)-1,m-1,-1):
+            coefficient = a[i]
+            if coefficient != 0:
+                for j in range(0,m+1):
+                    a[i-m+j] = (a[i-m+j] - coefficient*modulus[j]) % p
+        return (a + [0]*m)[:m]
+
+    def _multiply(self,a,b,modulus,p):
+        product = [0]*(len(a)+len(b)-1)
+        for i in range(0,len(a)):
+            for j in range(0,len(b)):
+                product[i+j] = (product[i+j] + a[i]*b[j]) % p
+        return self._remainder(product,modulus,p)
+
+    def _irreducible(self,p,m):
+        ''' first monic polynomial of degree m without monic factors of degree 1..m/2 '''
+        for coefficients in product(range(0,p),repeat=m):
+            polynomial = list(coefficients) + [1]
+            irreducible = True
+            for degree in range(1,m//2+1):
+                for factor in product(range(0,p),repeat=degree):
+                    if not any(self._remainder(polynomial,list(factor)+[1],p)[:degree]):
+                        irreducible = False
+                        break
+                if not irreducible:
+                    break
+            if irreducible:
+                return polynomial
+
+def affinePlane(q):
+    '''
+        affine plane of order q (q prime power): q^2 players, races of q players
+            player (x,y) is x*q+y, races are the lines y = a*x+b and x = c
+    '''
+    field = GaloisField(q)
+    races = []
+    for a in range(0,q):
+        for b in range(0,q):
+            races.append([x*q + field.add[field.mul[a][x]][b] for x in range(0,q)])
+    for c in range(0,q):
+        races.append([c*q + y for y in range(0,q)])
+    return races
+
+def projectivePlane(q):
+    '''
+        projective plane of order q (q prime power): q^2+q+1 players, races of q+1 players
+            players and races are the triples of GF(q) with first non zero coordinate 1
+            player x is in race l if x0*l0 + x1*l1 + x2*l2 = 0
+    '''
+    field = GaloisField(q)
+    points = [(1,y,z) for y in range(0,q) for z in range(0,q)] + [(0,1,z) for z in range(0,q)] + [(0,0,1)]
+    races = []
+    for line in points:
+        race = []
+        for i in range(0,len(points)):
+            point = points[i]
+            dot = 0
+            for j in range(0,3):
+                dot = field.add[dot][field.mul[point[j]][line[j]]]
+            if dot == 0:
+                race.append(i)
+        races.append(race)
+    return races
+
+def steinerTripleSystem(v):
+    '''
+        Steiner triple system of v players (v = 1 or 3 mod 6): every couple of players in exactly one race of 3
+            v = 6n+3: Bose construction, with the idempotent quasigroup x o y = (x+y)/2 of Z_(2n+1)
+            v = 6n+1: Skolem construction, with the half-idempotent quasigroup of Z_2n
+        player (x,i) is 3*x+i
+    '''
+    races = []
+    if v % 6 == 3:
+        n = (v - 3) // 6 * 2 + 1
+        half = (n + 1) // 2
+        for x in range(0,n):
+            races.append([3*x,3*x+1,3*x+2])
+        for x,y in combinations(range(0,n),2):
+            z = ((x + y) * half) % n
+            for i in range(0,3):
+                races.append([3*x+i,3*y+i,3*z+(i+1) % 3])
+    elif v % 6 == 1:
+        n = (v - 1) // 6
+        infinity = v - 1
+        # x o y = f((x+y) mod 2n), with f(2a) = a and f(2a+1) = n+a
+        def operation(x,y):
+            s = (x + y) % (2*n)
+            return s // 2 if s % 2 == 0 else n + s // 2
+        for x in range(0,n):
+            races.append([3*x,3*x+1,3*x+2])
+            for i in range(0,3):
+                races.append([infinity,3*(x+n)+i,3*x+(i+1) % 3])
+        for x,y in combinations(range(0,2*n),2):
+            z = operation(x,y)
+            for i in range(0,3):
+                races.append([3*x+i,3*y+i,3*z+(i+1) % 3])
+    else:
+        raise ValueError("Steiner triple systems need 1 or 3 mod 6 players")
+    return races
+
+def design(numberOfPlayers, playersPerRace):
+    '''
+        races (lists of player indexes) where every couple of players faces exactly once,
+        if a construction is known for the parameters, None otherwise
+    '''
+    n = numberOfPlayers
+    k = playersPerRace
+    if k == n:
+        return [list(range(0,n))]
+    if k == 2 and n > 2:
+        return [list(race) for race in combinations(range(0,n),2)]
+    if k < 2 or k > n:
+        return None
+    if n == k*k and primePower(k) != None:
+        return affinePlane(k)
+    if n == k*k - k + 1 and primePower(k-1) != None:
+        return projectivePlane(k-1)
+    if k == 3 and (n % 6 == 1 or n % 6 == 3):
+        return steinerTripleSystem(n)
+    return None
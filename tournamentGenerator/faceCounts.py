@@ -0,0 +1,128 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class FaceCounts():
+    '''
+        Face-count index of a tournament.
+        Dense matrix keyed by player index:
+            the cell (i,j) is the number of times player i has faced player j
+        Every read is O(1), so it replaces the scans of the faced players lists
+        If useNumpy, the matrix is a numpy array (needed by the vectorized race costs)
+    '''
+    def __init__(self, numberOfPlayers, useNumpy=False):
+        if useNumpy and numpy is None:
+            raise ImportError("numpy is needed for a numpy face-count index")
+        self._numberOfPlayers = numberOfPlayers
+        if useNumpy:
+            self._counts = numpy.zeros((numberOfPlayers,numberOfPlayers),dtype=numpy.int32)
+        else:
+            # rows of 32 bit integers, half the memory of lists
+            self._counts = [array('i',[0])*numberOfPlayers for i in range(numberOfPlayers)]
+        # number of different players faced by each player
+        self._numberPlayersFaced = [0]*numberOfPlayers
+        # number of players that haven't faced every other player
+        self._playersNotFacedEveryone = numberOfPlayers if numberOfPlayers > 1 else 0
+
+    @property
+    def numberOfPlayers(self):
+        return self._numberOfPlayers
+
+    @property
+    def counts(self):
+        ''' the matrix itself (list of array.array or numpy array), must not be modified '''
+        return self._counts
+
+    @property
+    def usesNumpy(self):
+        return not isinstance(self._counts,list)
+
+    def addPlayers(self, count):
+        ''' adds count players (the next indexes) that have not faced anyone '''
+        n = self._numberOfPlayers + count
+        if self.usesNumpy:
+            counts = numpy.zeros((n,n),dtype=numpy.int32)
+            counts[:self._numberOfPlayers,:self._numberOfPlayers] = self._counts
+            self._counts = counts
+        else:
+            for row in self._counts:
+                row.extend(array('i',[0])*count)
+            self._counts += [array('i',[0])*n for i in range(0,count)]
+        self._numberPlayersFaced += [0]*count
+        self._numberOfPlayers = n
+        # players that had faced everyone have not faced the new players
+        self._playersNotFacedEveryone = sum(1 for faced in self._numberPlayersFaced if faced < n - 1) if n > 1 else 0
+
+    def addRaces(self, races):
+        '''
+            every couple of players of races (lists of player indexes) has faced each other one more time,
+            the players faced are counted once at the end (faster than addFaced for many races)
+        '''
+        counts = self._counts
+        for race in races:
+            for i in race:
+                row = counts[i]
+                for j in race:
+                    if i != j:
+                        row[j] += 1
+        n = self._numberOfPlayers
+        if self.usesNumpy:
+            self._numberPlayersFaced = [int(faced) for faced in numpy.count_nonzero(counts,axis=1)]
+        else:
+            self._numberPlayersFaced = [n - row.count(0) for row in counts]
+        self._playersNotFacedEveryone = sum(1 for faced in self._numberPlayersFaced if faced < n - 1) if n > 1 else 0
+
+    def addFaced(self, i, j):
+        ''' player i has faced player j one more time '''
+        self._counts[i][j] += 1
+        # first time i faces j
+        if self._counts[i][j] == 1:
+            self._numberPlayersFaced[i] += 1
+            if self._numberPlayersFaced[i] == self._numberOfPlayers - 1:
+                self._playersNotFacedEveryone -= 1
+
+    def removeFaced(self, i, j):
+        ''' player i has faced player j one time less '''
+        self._counts[i][j] -= 1
+        # i has not faced j anymore
+        if self._counts[i][j] == 0:
+            if self._numberPlayersFaced[i] == self._numberOfPlayers - 1:
+                self._playersNotFacedEveryone += 1
+            self._numberPlayersFaced[i] -= 1
+
+    def timesFaced(self, i, j):
+        return int(self._counts[i][j])
+
+    def hasFaced(self, i, j):
+        return self._counts[i][j] != 0
+
+    def numberPlayersFaced(self, i):
+        ''' number of different players faced by player i '''
+        return self._numberPlayersFaced[i]
+
+    def playerFacedEveryone(self, i):
+        return self._numberPlayersFaced[i] >= self._numberOfPlayers - 1
+
+    def everyoneFacedEveryone(self):
+        return self._playersNotFacedEveryone == 0
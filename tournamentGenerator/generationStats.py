@@ -0,0 +1,114 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from functools import wraps
+from inspect import isgeneratorfunction
+from math import comb
+from time import perf_counter
+
+class GenerationStats():
+    '''
+        Statistics of a race generation, filled by a RaceGenerator created with stats=GenerationStats()
+            phaseSeconds:       seconds spent in each phase (design, allPlayersFaceEachOther, ...)
+            searches:           number of searches of the least expensive races
+            candidatesScored:   races considered by the searches (combinations of the players searched)
+            tieSizes:           number of least expensive races found by each search (one is chosen at random)
+            raceCosts:          cost of each race added, before adding it
+        If callback is given, it is called with (race, cost) for every race added
+    '''
+    def __init__(self, callback=None):
+        self.phaseSeconds = {}
+        self.searches = 0
+        self.candidatesScored = 0
+        self.tieSizes = []
+        self.raceCosts = []
+        self._callback = callback
+
+    def addPhaseTime(self, phase, seconds):
+        self.phaseSeconds[phase] = self.phaseSeconds.get(phase,0.0) + seconds
+
+    def recordSearch(self, numberOfPlayers, playersToChoose, ties):
+        ''' a search choosing playersToChoose of numberOfPlayers players found ties least expensive races '''
+        self.searches += 1
+        self.candidatesScored += comb(numberOfPlayers,playersToChoose)
+        self.tieSizes.append(ties)
+
+    def recordRace(self, race, cost):
+        self.raceCosts.append(cost)
+        if self._callback != None:
+            self._callback(race,cost)
+
+    def summary(self):
+        ''' dict of the totals, for printing or JSON '''
+        return {\
+            "phaseSeconds": dict(self.phaseSeconds),\
+            "searches": self.searches,\
+            "candidatesScored": self.candidatesScored,\
+            "averageTieSize": sum(self.tieSizes) / len(self.tieSizes) if len(self.tieSizes) != 0 else 0.0,\
+            "maximumTieSize": max(self.tieSizes) if len(self.tieSizes) != 0 else 0,\
+            "races": len(self.raceCosts),\
+            "totalRaceCost": sum(self.raceCosts)\
+        }
+
+    def printSummary(self):
+        for phase, seconds in self.phaseSeconds.items():
+            print(phase + ": " + str(round(seconds,3)) + "s")
+        summary = self.summary()
+        for key in ("searches","candidatesScored","averageTieSize","maximumTieSize","races","totalRaceCost"):
+            print(key + ": " + str(summary[key]))
+
+def timedPhase(phase):
+    '''
+        decorator of RaceGenerator methods: adds the time of the method to phase in the stats of the generator, if any
+        for generator methods, only the time spent producing the races is added (not the time of who iterates)
+    '''
+    def decorator(method):
+        if isgeneratorfunction(method):
+            @wraps(method)
+            def timedIterator(self, *args, **kwargs):
+                iterator = method(self,*args,**kwargs)
+                if self._stats is None:
+                    return iterator
+                return _timedIterator(self._stats,phase,iterator)
+            return timedIterator
+        @wraps(method)
+        def timed(self, *args, **kwargs):
+            if self._stats is None:
+                return method(self,*args,**kwargs)
+            start = perf_counter()
+            try:
+                return method(self,*args,**kwargs)
+            finally:
+                self._stats.addPhaseTime(phase,perf_counter() - start)
+        return timed
+    return decorator
+
+def _timedIterator(stats, phase, iterator):
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            finally:
+                stats.addPhaseTime(phase,perf_counter() - start)
+            yield item
+    except StopIteration:
+        return
+    finally:
+        iterator.close()
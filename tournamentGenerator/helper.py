@@ -16,6 +16,21 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ########################################################################
 
+from random import randint, random
+from datetime import time
+
+def randomIndex(length, rng=None):
+    ''' random index of a sequence of "length" elements, using rng (random.Random) if given '''
+    if rng == None:
+        return randint(0,length-1)
+    return rng.randint(0,length-1)
+
+def randomFraction(rng=None):
+    ''' random float in [0,1), using rng (random.Random) if given '''
+    if rng == None:
+        return random()
+    return rng.random()
+
 def removeList2fromList1(a,b):
     for item in b:
         try:
@@ -27,12 +42,15 @@ def removeList2fromList1(a,b):
 def printRaces(races):
     i = 1
     for race in races:
-        if (i < 10):
-            print(" " + str(i) + ".", race)
-        else:
-            print(str(i) + ".", race)
+        printRace(i,race)
         i+=1
 
+def printRace(number,race):
+    if (number < 10):
+        print(" " + str(number) + ".", race)
+    else:
+        print(str(number) + ".", race)
+
 def sameRace(race1,race2):
     # check for length
     if (len(race1) != len(race2)):
@@ -45,6 +63,10 @@ def sameRace(race1,race2):
     # if out of loop, then every player in race1 is in race2
     return True
 
+def raceKey(race):
+    ''' canonical identity of a race: same players in any order give the same key '''
+    return frozenset(race)
+
 def convertRaceResultToRace(raceResult):
     race = []
     for playerResult in raceResult:
@@ -57,5 +79,16 @@ def convertRaceResultsToRaces(raceResults):
         races.append(convertRaceResultToRace(raceResult))
     return races
 
+def timeToMicroseconds(lapTime):
+    ''' datetime.time as microseconds from 0:00 '''
+    return ((lapTime.hour*60 + lapTime.minute)*60 + lapTime.second)*1000000 + lapTime.microsecond
+
+def microsecondsToTime(microseconds):
+    ''' inverse of timeToMicroseconds '''
+    seconds, microsecond = divmod(int(microseconds),1000000)
+    minutes, second = divmod(seconds,60)
+    hour, minute = divmod(minutes,60)
+    return time(hour,minute,second,microsecond)
+
 def lapTimeToStr(lapTime):
     return lapTime.strftime('%M:%S:%f')[1:-3]
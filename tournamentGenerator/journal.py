@@ -0,0 +1,233 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import os
+import struct
+import zlib
+
+from .snapshot import dumpSnapshot, loadSnapshot, readHeader, HEADER
+from .helper import timeToMicroseconds, microsecondsToTime
+
+# journal: header, followed by records
+MAGIC = b"TGJN"
+VERSION = 1
+# magic, version, generation of the snapshot the events apply to
+JOURNAL_HEADER = struct.Struct("<4sHq")
+# record: type, length of data, crc32 of data, followed by data
+RECORD = struct.Struct("<BII")
+# types of record
+RACE = 1                # int32 player index * players of the race
+RACE_RESULT = 2         # (int32 player index, int32 position, int64 lap time microseconds) * players of the race
+RACE_RESULT_ENTRY = struct.Struct("<iiq")
+
+def readGeneration(data):
+    ''' returns the generation of the snapshot of the journal data, None if its header is incomplete '''
+    if len(data) < JOURNAL_HEADER.size:
+        return None
+    magic, version, generation = JOURNAL_HEADER.unpack_from(data,0)
+    if magic != MAGIC:
+        raise ValueError("not a tournament journal")
+    if version != VERSION:
+        raise ValueError("tournament journal version " + str(version) + " not supported")
+    return generation
+
+def iterEvents(data):
+    '''
+        yields (type, event, end of the event) for the complete events of the journal data:
+            RACE: [ player index, ... ]
+            RACE_RESULT: [ (player index, position, lap time in microseconds), ... ]
+    '''
+    offset = JOURNAL_HEADER.size
+    while offset + RECORD.size <= len(data):
+        recordType, length, crc = RECORD.unpack_from(data,offset)
+        start = offset + RECORD.size
+        payload = data[start:start+length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return
+        offset = start + length
+        if recordType == RACE:
+            yield recordType, list(struct.unpack("<" + "i"*(length//4),payload)), offset
+        elif recordType == RACE_RESULT:
+            yield recordType, list(RACE_RESULT_ENTRY.iter_unpack(payload)), offset
+        else:
+            return
+
+class Journal():
+    '''
+        Write-ahead backup of a tournament: a snapshot (basePath.tgs) and the events after it (basePath.journal)
+        Every event is appended to the journal and synced to disk before returning,
+        every compactEvery events the snapshot is written again and the journal emptied
+        recover() loads the snapshot and replays the journal, ignoring an incomplete last event
+        Snapshot and journal have the generation of the checkpoint that wrote them: a journal of an older
+        generation (crash between replacing the snapshot and emptying the journal) is already in the snapshot
+    '''
+    def __init__(self, basePath, compactEvery=100):
+        self._snapshotPath = basePath + ".tgs"
+        self._journalPath = basePath + ".journal"
+        self._compactEvery = compactEvery
+        # events in the journal
+        self._events = 0
+        # generation of the snapshot, None until checkpoint or recover:
+            # events are written only to the journal of a snapshot of this tournament
+        self._generation = None
+        self._file = None
+
+    @property
+    def snapshotPath(self):
+        return self._snapshotPath
+
+    @property
+    def journalPath(self):
+        return self._journalPath
+
+    @property
+    def events(self):
+        return self._events
+
+    def recover(self):
+        ''' returns the tournament of the snapshot with the events of the journal, None if there is no snapshot '''
+        if not os.path.exists(self._snapshotPath):
+            return None
+        with open(self._snapshotPath,"rb") as f:
+            data = f.read()
+        tournament = loadSnapshot(data)
+        self._generation = readHeader(data)["generation"]
+        self._events = 0
+        if os.path.exists(self._journalPath):
+            with open(self._journalPath,"rb") as f:
+                data = f.read()
+            generation = readGeneration(data)
+            if generation != None and generation > self._generation:
+                raise ValueError("journal " + self._journalPath + " is newer than the snapshot " + self._snapshotPath)
+            if generation != self._generation:
+                # events of an older snapshot (or incomplete header), already in the snapshot
+                self._closeFile()
+                self._emptyJournal()
+                return tournament
+            end = self._replay(tournament,data)
+            # remove an incomplete event, written while crashing
+            if end != len(data):
+                with open(self._journalPath,"r+b") as f:
+                    f.truncate(end)
+                    self._sync(f)
+        return tournament
+
+    def _replay(self, tournament, data):
+        ''' applies the events of data to tournament, returns the end of the last complete event '''
+        players = tournament.players
+        end = JOURNAL_HEADER.size
+        for recordType, event, end in iterEvents(data):
+            if recordType == RACE:
+                tournament.addRace([players[i] for i in event])
+            else:
+                tournament.addRaceResult([(players[i],position,microsecondsToTime(lapTime)) for i, position, lapTime in event])
+            self._events += 1
+        return end
+
+    def checkpoint(self, tournament):
+        ''' writes the snapshot of tournament and empties the journal '''
+        generation = self._snapshotGeneration() + 1
+        temporaryPath = self._snapshotPath + ".tmp"
+        with open(temporaryPath,"wb") as f:
+            f.write(dumpSnapshot(tournament,generation))
+            self._sync(f)
+        # the old snapshot is replaced only when the new one is complete
+        os.replace(temporaryPath,self._snapshotPath)
+        self._syncDirectory()
+        self._generation = generation
+        self._closeFile()
+        self._emptyJournal()
+        self._events = 0
+
+    def _snapshotGeneration(self):
+        ''' generation of the snapshot on disk, 0 if there is none '''
+        if self._generation != None:
+            return self._generation
+        if os.path.exists(self._snapshotPath):
+            with open(self._snapshotPath,"rb") as f:
+                return readHeader(f.read(HEADER.size))["generation"]
+        return 0
+
+    def _emptyJournal(self):
+        ''' journal of the events after the snapshot of the current generation '''
+        with open(self._journalPath,"wb") as f:
+            f.write(JOURNAL_HEADER.pack(MAGIC,VERSION,self._generation))
+            self._sync(f)
+        self._syncDirectory()
+
+    def _checkSnapshot(self):
+        ''' raises ValueError if the snapshot of the journal was not written (checkpoint) or read (recover) '''
+        if self._generation is None:
+            raise ValueError("no snapshot of the tournament for the journal " + self._journalPath + ": checkpoint or recover first")
+
+    def addRace(self, tournament, race):
+        ''' adds race to tournament and to the journal '''
+        self._checkSnapshot()
+        tournament.addRace(race)
+        self.logRace(tournament,race)
+
+    def logRace(self, tournament, race):
+        ''' adds to the journal race, already added to tournament (for example by a RaceGenerator) '''
+        self._checkSnapshot()
+        payload = struct.pack("<" + "i"*len(race),*[player.index for player in race])
+        self._append(tournament,RACE,payload)
+
+    def addRaceResult(self, tournament, resultsTuples):
+        ''' adds race result to tournament and to the journal '''
+        self._checkSnapshot()
+        tournament.addRaceResult(resultsTuples)
+        payload = b"".join(\
+            RACE_RESULT_ENTRY.pack(player.index,position,timeToMicroseconds(lapTime))\
+            for player, position, lapTime in resultsTuples\
+        )
+        self._append(tournament,RACE_RESULT,payload)
+
+    def _append(self, tournament, recordType, payload):
+        self._checkSnapshot()
+        if self._file is None:
+            if not os.path.exists(self._journalPath) or os.path.getsize(self._journalPath) < JOURNAL_HEADER.size:
+                self._emptyJournal()
+            self._file = open(self._journalPath,"ab")
+        self._file.write(RECORD.pack(recordType,len(payload),zlib.crc32(payload)) + payload)
+        self._sync(self._file)
+        self._events += 1
+        if self._events >= self._compactEvery:
+            self.checkpoint(tournament)
+
+    def _sync(self, f):
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _syncDirectory(self):
+        ''' makes renaming and creating files of the directory durable (not possible on Windows) '''
+        if not hasattr(os,"O_DIRECTORY"):
+            return
+        directory = os.open(os.path.dirname(os.path.abspath(self._snapshotPath)),os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def _closeFile(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._closeFile()
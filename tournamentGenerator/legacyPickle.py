@@ -0,0 +1,77 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import io
+import pickle
+
+from .player import Player
+from .tournament import Tournament
+
+'''
+    Pickle backups of older versions (tournament.p), whose players and tournament had different attributes:
+    the objects are loaded without their classes, and the tournament is rebuilt from its players, races and race results
+'''
+
+class _LegacyObject():
+    ''' object of an older version, only its attributes are kept '''
+    def __setstate__(self, state):
+        # objects with __slots__ are pickled as (dict, slots)
+        if isinstance(state,tuple):
+            state = dict((state[0] or {}),**(state[1] or {}))
+        self.__dict__.update(state)
+
+class _LegacyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module,name) in (("tournamentGenerator.player","Player"),("tournamentGenerator.tournament","Tournament")):
+            return _LegacyObject
+        return pickle.Unpickler.find_class(self,module,name)
+
+def _rebuild(legacy):
+    ''' tournament with new players, the races and the race results (in order of arrival) of the legacy tournament '''
+    players = [Player(player._name) for player in legacy._players]
+    newPlayers = {}
+    for i in range(0,len(players)):
+        newPlayers[id(legacy._players[i])] = players[i]
+    tournament = Tournament(players,tuple(legacy._points),legacy._pointsFastestLap)
+    for race in legacy._races:
+        tournament.addRace([newPlayers[id(player)] for player in race])
+    tournament.addRaceResults([\
+        [(newPlayers[id(player)],position,lapTime) for position, (player, lapTime) in enumerate(raceResult,1)]\
+        for raceResult in legacy._raceResults\
+    ])
+    return tournament
+
+def loadPickle(data):
+    ''' returns the tournament pickled in data, by this version or by an older one '''
+    try:
+        tournament = pickle.loads(data)
+        if isinstance(tournament,Tournament):
+            return tournament
+    except (AttributeError, TypeError, ImportError):
+        # players of older versions have no __slots__
+        pass
+    try:
+        legacy = _LegacyUnpickler(io.BytesIO(data)).load()
+        return _rebuild(legacy)
+    except (AttributeError, TypeError, KeyError, ImportError) as e:
+        raise ValueError("not a tournament pickle backup: " + str(e))
+
+def loadPickleFile(filename):
+    with open(filename,"rb") as f:
+        return loadPickle(f.read())
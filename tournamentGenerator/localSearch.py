@@ -0,0 +1,169 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from math import exp
+from time import time as now
+
+from .faceCounts import FaceCounts
+from .bounds import minimumNumberOfRaces, minimumRacesOfEachPlayer
+from .helper import randomIndex, randomFraction
+
+class _Schedule():
+    '''
+        races as lists of player indexes, with the face counts and the number of couples not faced
+        moves swap two players of two races, so every player keeps the same number of races
+    '''
+    def __init__(self, numberOfPlayers, races):
+        self.races = [list(race) for race in races]
+        self.faceCounts = FaceCounts(numberOfPlayers)
+        self.notFaced = numberOfPlayers*(numberOfPlayers-1)//2
+        for race in self.races:
+            for a in range(0,len(race)):
+                for b in range(a+1,len(race)):
+                    self._face(race[a],race[b],1)
+
+    def _face(self, i, j, times):
+        if times > 0:
+            if self.faceCounts.timesFaced(i,j) == 0:
+                self.notFaced -= 1
+            self.faceCounts.addFaced(i,j)
+            self.faceCounts.addFaced(j,i)
+        else:
+            self.faceCounts.removeFaced(i,j)
+            self.faceCounts.removeFaced(j,i)
+            if self.faceCounts.timesFaced(i,j) == 0:
+                self.notFaced += 1
+
+    def _changes(self, r, x, s, y):
+        ''' changes of the face counts when x of race r and y of race s are swapped '''
+        changes = {}
+        for i,leaving,joining in [(r,x,y),(s,y,x)]:
+            for z in self.races[i]:
+                if z != leaving:
+                    changes[(min(leaving,z),max(leaving,z))] = changes.get((min(leaving,z),max(leaving,z)),0) - 1
+                    changes[(min(joining,z),max(joining,z))] = changes.get((min(joining,z),max(joining,z)),0) + 1
+        return changes
+
+    def swapDelta(self, r, x, s, y):
+        ''' change of the number of couples not faced if x of race r and y of race s are swapped '''
+        delta = 0
+        for (i,j),change in self._changes(r,x,s,y).items():
+            timesFaced = self.faceCounts.timesFaced(i,j)
+            if timesFaced == 0 and change > 0:
+                delta -= 1
+            elif timesFaced > 0 and timesFaced + change == 0:
+                delta += 1
+        return delta
+
+    def swap(self, r, x, s, y):
+        for (i,j),change in self._changes(r,x,s,y).items():
+            for t in range(0,abs(change)):
+                self._face(i,j,change)
+        self.races[r][self.races[r].index(x)] = y
+        self.races[s][self.races[s].index(y)] = x
+
+def _reducedRaces(races, numberOfPlayers, numberOfRaces, rng):
+    '''
+        removes races until numberOfRaces are left, then replaces players with more races than the others
+        with players with less races, so that every player has the same number of races
+    '''
+    races = [list(race) for race in races]
+    while len(races) > numberOfRaces:
+        races.pop(randomIndex(len(races),rng))
+    racesOfPlayer = [0]*numberOfPlayers
+    for race in races:
+        for i in race:
+            racesOfPlayer[i] += 1
+    target = sum(racesOfPlayer) // numberOfPlayers
+    more = [i for i in range(0,numberOfPlayers) for t in range(target,racesOfPlayer[i])]
+    less = [i for i in range(0,numberOfPlayers) for t in range(racesOfPlayer[i],target)]
+    for race in races:
+        for a in range(0,len(race)):
+            if race[a] in more:
+                for y in less:
+                    if y not in race:
+                        more.remove(race[a])
+                        less.remove(y)
+                        race[a] = y
+                        break
+    if len(less) != 0:
+        return None
+    return races
+
+def _anneal(schedule, deadline, rng, temperature=2.0, cooling=0.9995):
+    ''' simulated annealing over swaps, until everyone faces everyone or deadline; True if everyone faces everyone '''
+    numberOfRaces = len(schedule.races)
+    while schedule.notFaced > 0 and now() < deadline:
+        for t in range(0,1000):
+            r = randomIndex(numberOfRaces,rng)
+            s = randomIndex(numberOfRaces,rng)
+            if r == s:
+                continue
+            x = schedule.races[r][randomIndex(len(schedule.races[r]),rng)]
+            y = schedule.races[s][randomIndex(len(schedule.races[s]),rng)]
+            if x in schedule.races[s] or y in schedule.races[r]:
+                continue
+            delta = schedule.swapDelta(r,x,s,y)
+            if delta <= 0 or randomFraction(rng) < exp(-delta/temperature):
+                schedule.swap(r,x,s,y)
+                if schedule.notFaced == 0:
+                    return True
+            temperature = max(temperature*cooling,0.05)
+    return schedule.notFaced == 0
+
+def improveSchedule(tournament, playersPerRace, timeBudget=1.0, rng=None):
+    '''
+        tries to replace the races of tournament (everyone faced everyone, same number of races, no results)
+        with less races keeping both conditions:
+            removes races, gives the same number of races to every player,
+            then searches with simulated annealing player swaps between races until everyone faces everyone
+        runs for timeBudget seconds at most, stops when the races are the lower bound (see bounds)
+        returns the number of races removed
+    '''
+    n = tournament.getNumberOfPlayers()
+    races = [[player.index for player in race] for race in tournament.races]
+    if (len(races) == 0) or tournament.somebodyDidNotFaceEveryone() or (not tournament.playersSameNumberOfRaces()):
+        return 0
+    if len(tournament.raceResults) != 0:
+        return 0
+    deadline = now() + timeBudget
+    best = races
+    # no schedule with less races than the lower bound, so no search for them
+    minimum = minimumNumberOfRaces(n,playersPerRace)
+    minimumOfEachPlayer = minimumRacesOfEachPlayer(n,playersPerRace)
+    racesOfEachPlayer = len(races)*playersPerRace // n - 1
+    while racesOfEachPlayer >= minimumOfEachPlayer and len(best) > minimum and now() < deadline:
+        # number of races must be integer, and not less than the lower bound
+        if (n*racesOfEachPlayer) % playersPerRace != 0 or n*racesOfEachPlayer // playersPerRace < minimum:
+            racesOfEachPlayer -= 1
+            continue
+        reduced = _reducedRaces(best,n,n*racesOfEachPlayer // playersPerRace,rng)
+        if reduced == None:
+            break
+        schedule = _Schedule(n,reduced)
+        if not _anneal(schedule,deadline,rng):
+            break
+        best = schedule.races
+        racesOfEachPlayer -= 1
+    if len(best) < len(races):
+        players = tournament.players
+        tournament.clearRaces()
+        for race in best:
+            tournament.addRace([players[i] for i in race])
+    return len(races) - len(best)
@@ -0,0 +1,119 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+from .raceCosts import playerAndRefacingCosts, racesOfIndexes
+
+def _leastExpensiveRacesOfPrefixes(snapshot,n,prefixes):
+    '''
+        least expensive combinations of n players whose first player is one of "prefixes"
+        snapshot is (cost of each player, refacing cost of each couple of players) from playerAndRefacingCosts
+        returns list of (prefix, cost, combinations) with the least cost of each prefix
+    '''
+    playerCost,refacing = snapshot
+    m = len(playerCost)
+    results = []
+    for a in prefixes:
+        # cost of each player when in a race with player a
+        costWithA = [playerCost[i] + refacing[a][i] for i in range(0,m)]
+        cost = None
+        races = []
+        for rest in combinations(range(a+1,m),n-1):
+            raceCost = playerCost[a]
+            for i in rest:
+                raceCost += costWithA[i]
+            for i,j in combinations(rest,2):
+                raceCost += refacing[i][j]
+            if cost == None or raceCost < cost:
+                cost = raceCost
+                races = [(a,) + rest]
+            elif raceCost == cost:
+                races.append((a,) + rest)
+        results.append((a,cost,races))
+    return results
+
+class ParallelRaceSearch():
+    '''
+        Finds the least expensive races (same races in the same order as leastExpensiveRaces)
+        by splitting the combinations among worker processes by first player.
+        Each worker receives a compact snapshot (costs of players and couples), not the players.
+        Can be used as raceSearch of RaceGenerator.
+    '''
+    def __init__(self, workers, minCombinations=100000):
+        self._workers = workers
+        # with less combinations, the search is done in this process
+        self._minCombinations = minCombinations
+        self._executor = None
+
+    def __call__(self,players,playersPerRace,averageNumberOfRaces,fixedPlayers=None):
+        players = list(players)
+        fixed = list(fixedPlayers) if fixedPlayers != None else []
+        n = playersPerRace - len(fixed)
+        m = len(players)
+        if n == 0:
+            return [fixed]
+        if n > m:
+            return []
+        snapshot = playerAndRefacingCosts(players,fixed)
+        prefixes = list(range(0,m-n+1))
+        if self._numberOfCombinations(m,n) < self._minCombinations or self._workers < 2:
+            results = _leastExpensiveRacesOfPrefixes(snapshot,n,prefixes)
+        else:
+            if self._executor == None:
+                self._executor = ProcessPoolExecutor(self._workers)
+            # first players spread among the tasks, since the first ones have more combinations
+            numberOfTasks = min(len(prefixes),self._workers*4)
+            tasks = [prefixes[i::numberOfTasks] for i in range(0,numberOfTasks)]
+            futures = [self._executor.submit(_leastExpensiveRacesOfPrefixes,snapshot,n,task) for task in tasks]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            results.sort(key=lambda result : result[0])
+        # merge the least expensive races of each first player
+        cost = None
+        found = []
+        for a,prefixCost,races in results:
+            if prefixCost == None:
+                continue
+            if cost == None or prefixCost < cost:
+                cost = prefixCost
+                found = list(races)
+            elif prefixCost == cost:
+                found.extend(races)
+        return racesOfIndexes(players,found,fixedPlayers)
+
+    def _numberOfCombinations(self,m,n):
+        result = 1
+        for i in range(0,n):
+            result = result * (m-i) // (i+1)
+        return result
+
+    def close(self):
+        ''' stops the worker processes '''
+        if self._executor != None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
@@ -16,20 +16,32 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ########################################################################
 
-from random import randint
 from datetime import time
 
-from .helper import lapTimeToStr
+from .helper import lapTimeToStr, randomIndex, timeToMicroseconds, microsecondsToTime
+from .playerColumns import NO_FASTEST_LAP
 
 class Player():
-    'Player class'
+    '''
+        Player class
+        A player of a tournament is a view on its row of the PlayerColumns and FaceCounts of the tournament,
+        otherwise it keeps its own counters
+    '''
+    __slots__ = ('_name','_races','_racesDone','_points','_fastestLap','_facedPlayers','_faceCounts','_columns','_index')
+
     def __init__(self, name):
         self._name = name
         self._races = 0
         self._racesDone = 0
         self._points = 0
         self._fastestLap = None
+        # players faced (once for every time faced), when in a tournament only the ones not in the tournament
         self._facedPlayers = []
+        # face-count index and player columns of the tournament and index of the player in them
+            # None when the player is not part of a tournament
+        self._faceCounts = None
+        self._columns = None
+        self._index = None
 
     def __repr__(self):
         return self._name
@@ -40,63 +52,160 @@ class Player():
 ### GETTERS AND SETTERS ###
     @property
     def races(self):
+        if self._columns is not None:
+            return self._columns.races[self._index]
         return self._races
     
     @property
     def facedPlayers(self):
+        if self._columns is not None:
+            # players of the tournament faced (in the order of the tournament), then the others
+            facedPlayers = []
+            for j in range(0,self._faceCounts.numberOfPlayers):
+                facedPlayers += [self._columns.player(j)]*self._faceCounts.timesFaced(self._index,j)
+            return facedPlayers + self._facedPlayers
         return list(self._facedPlayers)
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def faceCounts(self):
+        ''' face-count index of the tournament (None when the player is not part of a tournament) '''
+        return self._faceCounts
+
     @property
     def racesDone(self):
+        if self._columns is not None:
+            return self._columns.racesDone[self._index]
         return self._racesDone
     
     @property
     def points(self):
+        if self._columns is not None:
+            return self._columns.points[self._index]
         return self._points
     
     @property
     def fastestLap(self):
+        if self._columns is not None:
+            fastestLap = self._columns.fastestLap[self._index]
+            if fastestLap == NO_FASTEST_LAP:
+                return None
+            return microsecondsToTime(fastestLap)
         return self._fastestLap
 
     @fastestLap.setter
     def fastestLap(self, fastestLap):
         # check fastestLap of type datetime.time
         if type(fastestLap) is time:
-            self._fastestLap = fastestLap
+            if self._columns is not None:
+                self._columns.change(self,self._setColumnFastestLap,timeToMicroseconds(fastestLap))
+            else:
+                self._fastestLap = fastestLap
+
+    def _setColumnFastestLap(self, microseconds):
+        self._columns.fastestLap[self._index] = microseconds
 ###########################
 
+    def attachFaceCounts(self, faceCounts, index, columns=None):
+        '''
+            uses the face-count index of the tournament, where the player has index "index"
+            if columns (PlayerColumns) is given, the counters of the player are moved to its row,
+                and faced players to faceCounts when indexFacedPlayers is called
+        '''
+        if columns is not None:
+            races, racesDone, points, fastestLap = self.races, self.racesDone, self.points, self.fastestLap
+            self._facedPlayers = self.facedPlayers if self._columns is None else list(self._facedPlayers)
+            self._races = self._racesDone = self._points = self._fastestLap = None
+            self._columns = columns
+            self._index = index
+            columns.races[index] = races
+            columns.racesDone[index] = racesDone
+            columns.points[index] = points
+            if fastestLap != None:
+                columns.fastestLap[index] = timeToMicroseconds(fastestLap)
+        self._faceCounts = faceCounts
+        self._index = index
+
+    def indexFacedPlayers(self):
+        ''' adds the faced players that share the face-count index to it '''
+        others = []
+        for player in self._facedPlayers:
+            if self._sharesFaceCounts(player):
+                self._faceCounts.addFaced(self._index,player._index)
+            else:
+                others.append(player)
+        if self._columns is not None:
+            self._facedPlayers = others
+
+    def _sharesFaceCounts(self, player):
+        ''' checks if both players are indexed by the same face-count index '''
+        return (self._faceCounts is not None) and (self._faceCounts is player._faceCounts)
+
     def addRace(self):
-        self._races += 1
+        if self._columns is not None:
+            self._columns.races[self._index] += 1
+        else:
+            self._races += 1
         return
 
+    def clearRaces(self):
+        ''' removes races and faced players (the face-count index is reset by the tournament) '''
+        if self._columns is not None:
+            self._columns.races[self._index] = 0
+        else:
+            self._races = 0
+        self._facedPlayers = []
+
     def addFacedPlayer(self, player):
+        if self._sharesFaceCounts(player):
+            self._faceCounts.addFaced(self._index,player._index)
+            # the face-count index is enough for the players of the tournament
+            if self._columns is not None:
+                return
         self._facedPlayers.append(player)
         return
 
     def addRaceDone(self):
-        self._racesDone += 1
+        if self._columns is not None:
+            self._columns.racesDone[self._index] += 1
+        else:
+            self._racesDone += 1
         return
 
     def addPoints(self,points):
         if (type(points) == int and points >= 0):
-            self._points += points
+            if self._columns is not None:
+                self._columns.change(self,self._addColumnPoints,points)
+            else:
+                self._points += points
+
+    def _addColumnPoints(self, points):
+        self._columns.points[self._index] += points
 
     def getFastestLapPrintable(self):
-        if self._fastestLap == None:
+        fastestLap = self.fastestLap
+        if fastestLap == None:
             return "None"
-        return lapTimeToStr(self._fastestLap)
+        return lapTimeToStr(fastestLap)
 
     def hasFaced(self, player):
+        if self._sharesFaceCounts(player):
+            return self._faceCounts.hasFaced(self._index,player._index)
         for p in self._facedPlayers:
             if p == player:
                 return True
         return False
 
     def numberOfTimesAlreadyFaced(self, player):
+        if self._sharesFaceCounts(player):
+            return self._faceCounts.timesFaced(self._index,player._index)
         n = 0
         for p in self._facedPlayers:
             if (p == player):
@@ -104,6 +213,8 @@ class Player():
         return n
 
     def numberPlayersFaced(self):
+        if self._columns is not None:
+            return int(sum(self._faceCounts.counts[self._index])) + len(self._facedPlayers)
         return len(self._facedPlayers)
 
     def playersNotFaced(self, allPlayers):
@@ -115,11 +226,11 @@ class Player():
 
 ### PRINT FUNCTIONS ###
     def printNumberOfRaces(self):
-        print(str(self) + ":" + str(self._races))
+        print(str(self) + ":" + str(self.races))
     
     def printPlayersFaced(self):
         stringFacedPlayers = "["
-        facedPlayers = list(self._facedPlayers)
+        facedPlayers = self.facedPlayers
         facedPlayers.sort(key=lambda player : player.name)
         for facedPlayer in facedPlayers:
             stringFacedPlayers += ( str(facedPlayer) + "," )
@@ -153,9 +264,10 @@ def playersWithLeastRaces(players):
         i += 1
     return plr
 
-def playerWithLeastRaces(players):
+def playerWithLeastRaces(players, rng=None):
+    ''' random player with least races, using rng (random.Random) if given '''
     p = playersWithLeastRaces(players)
-    i = randint(0,len(p)-1) 
+    i = randomIndex(len(p),rng)
     return p[i]
 
 def nPlayersWithLeastRaces(n, players):
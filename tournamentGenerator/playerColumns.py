@@ -0,0 +1,63 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from array import array
+
+# fastest lap of a player without fastest lap
+NO_FASTEST_LAP = -1
+
+class PlayerColumns():
+    '''
+        Counters of the players of a tournament, one column per counter keyed by player index:
+            races, races done, points and fastest lap (microseconds, NO_FASTEST_LAP if none)
+        Players of the tournament are views on their row, so a player costs a few references
+        Columns are array.array (plain ints when read, so players return the same types as before)
+    '''
+    def __init__(self, players):
+        # players by index, needed to return the players faced
+        self._players = players
+        n = len(players)
+        self.races = array('l',[0])*n
+        self.racesDone = array('l',[0])*n
+        self.points = array('q',[0])*n
+        self.fastestLap = array('q',[NO_FASTEST_LAP])*n
+        # called as changed(player, change, args) to change the points or the fastest lap of a player,
+            # so that the tournament keeps its standings in order (None: change applied directly)
+        self.changed = None
+
+    def change(self, player, change, *args):
+        ''' applies change(*args), a change of the points or fastest lap of player '''
+        if self.changed is None:
+            change(*args)
+        else:
+            self.changed(player,change,args)
+
+    def addPlayers(self, count):
+        ''' adds the rows of count players, already appended to the players '''
+        self.races.extend(array('l',[0])*count)
+        self.racesDone.extend(array('l',[0])*count)
+        self.points.extend(array('q',[0])*count)
+        self.fastestLap.extend(array('q',[NO_FASTEST_LAP])*count)
+
+    @property
+    def numberOfPlayers(self):
+        return len(self._players)
+
+    def player(self, index):
+        return self._players[index]
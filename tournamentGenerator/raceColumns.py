@@ -0,0 +1,109 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from array import array
+from collections.abc import Sequence
+
+from .helper import timeToMicroseconds, microsecondsToTime
+
+def raceIndexKey(race):
+    ''' canonical identity of a race of players of a tournament, smaller than raceKey: bytes of the sorted player indexes '''
+    return array('i',sorted(player.index for player in race)).tobytes()
+
+class RaceColumns(Sequence):
+    '''
+        Races of a tournament stored as player indexes in one array of 32 bit integers
+        (race i is between offsets[i] and offsets[i+1]), instead of lists of players
+        It is a sequence of races: race i is created as a list of players only when read
+    '''
+    def __init__(self, players):
+        # players by index
+        self._players = players
+        self._playerIndexes = array('i')
+        self._offsets = array('l',[0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index,slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("race index out of range")
+        return [self._players[i] for i in self.playerIndexes(index)]
+
+    def playerIndexes(self, index):
+        ''' indexes of the players of race index '''
+        return self._playerIndexes[self._offsets[index]:self._offsets[index+1]]
+
+    def append(self, race):
+        for player in race:
+            if player.index is None or player.index >= len(self._players) or self._players[player.index] is not player:
+                raise ValueError(str(player) + " is not a player of the tournament")
+        self._playerIndexes.extend(player.index for player in race)
+        self._offsets.append(len(self._playerIndexes))
+
+class RaceResultColumns(Sequence):
+    '''
+        Race results of a tournament stored as parallel arrays, in the order of arrival:
+            player indexes, positions and lap times (microseconds)
+        It is a sequence of race results: result i is created as a list of (player,time) only when read
+    '''
+    def __init__(self, players):
+        # players by index
+        self._players = players
+        self._playerIndexes = array('i')
+        self._positions = array('i')
+        self._lapTimes = array('q')
+        self._offsets = array('l',[0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index,slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("race result index out of range")
+        start, end = self._offsets[index], self._offsets[index+1]
+        return [(self._players[self._playerIndexes[i]],microsecondsToTime(self._lapTimes[i])) for i in range(start,end)]
+
+    def playerIndexes(self, index):
+        return self._playerIndexes[self._offsets[index]:self._offsets[index+1]]
+
+    def positions(self, index):
+        return self._positions[self._offsets[index]:self._offsets[index+1]]
+
+    def lapTimes(self, index):
+        ''' lap times of race result index, in microseconds '''
+        return self._lapTimes[self._offsets[index]:self._offsets[index+1]]
+
+    def append(self, raceResult, positions=None):
+        ''' raceResult is a list of (player,time) in order of arrival, positions are 1, 2, ... if not given '''
+        if positions == None:
+            positions = range(1,len(raceResult)+1)
+        for (player,lapTime), position in zip(raceResult,positions):
+            self._playerIndexes.append(player.index)
+            self._positions.append(position)
+            self._lapTimes.append(timeToMicroseconds(lapTime))
+        self._offsets.append(len(self._playerIndexes))
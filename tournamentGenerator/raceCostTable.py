@@ -0,0 +1,213 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from itertools import combinations
+from array import array
+
+class RaceCostTable():
+    '''
+        Persistent costs of every possible race between the players of a tournament.
+        The cost of costOfRace is split in:
+            the refacing cost, stored for each race and bucketed by cost
+            the number of races of each player and the average number of races,
+                which are read from the players when the least expensive races are searched
+        After a race is added to the tournament, update must be called:
+            only the races containing a couple of players of the added race are re-keyed
+        Races are identified by their rank in the order of combinations of the player positions
+        Only searches without fixed players (generate_randomLowCost) use the table, which is built by the first one:
+            searches with fixed players score only the races of a player, so they are left to the race search
+        A table of more than maxNumberOfRaces races is not buildable (see buildable)
+    '''
+    def __init__(self, players, playersPerRace, maxNumberOfRaces=1000000):
+        self._players = list(players)
+        self._playersPerRace = playersPerRace
+        n = len(self._players)
+        # every player must be indexed by the same face-count index
+        self._faceCounts = self._players[0].faceCounts if n > 0 else None
+        for player in self._players:
+            if player.faceCounts is None or player.faceCounts is not self._faceCounts:
+                raise ValueError("players must be part of the same tournament")
+        # player index -> position in the table
+        self._position = {}
+        for i in range(0,n):
+            self._position[self._players[i].index] = i
+        self._prepareRanks(n,playersPerRace)
+        self._maxNumberOfRaces = maxNumberOfRaces
+        # refacing cost of each race, and refacing cost -> set of races with that cost (None until built)
+        self._costs = None
+        self._buckets = None
+
+    @property
+    def built(self):
+        return self._costs is not None
+
+    @property
+    def buildable(self):
+        ''' True if the possible races are not more than maxNumberOfRaces '''
+        return self._numberOfRaces <= self._maxNumberOfRaces
+
+    def _build(self):
+        ''' refacing costs of every race, from the face counts '''
+        if not self.buildable:
+            raise ValueError("too many possible races for a cost table")
+        self._costs = array('q',[0]*self._numberOfRaces)
+        self._buckets = {}
+        r = 0
+        for race in combinations(range(0,len(self._players)),self._playersPerRace):
+            cost = self._refacingCostOfRace(race)
+            self._costs[r] = cost
+            self._bucket(cost).add(r)
+            r += 1
+
+    def _prepareRanks(self,n,k):
+        '''
+            rank of race (c0 < c1 < ...) in the order of combinations is
+                sum over i of the number of combinations starting with c0..c(i-1),v with c(i-1) < v < ci
+            self._ranks[i][c] is the number of those combinations for c(i-1) = -1 < v < c
+        '''
+        binomial = [[0]*(k+1) for i in range(0,n+1)]
+        for i in range(0,n+1):
+            binomial[i][0] = 1
+            for j in range(1,min(i,k)+1):
+                binomial[i][j] = binomial[i-1][j-1] + binomial[i-1][j]
+        self._numberOfRaces = binomial[n][k]
+        self._ranks = []
+        for i in range(0,k):
+            ranks = [0]*(n+1)
+            for c in range(1,n+1):
+                ranks[c] = ranks[c-1] + binomial[n-c][k-1-i]
+            self._ranks.append(ranks)
+
+    def _rank(self,positions):
+        ''' rank of the race with players in the (sorted) positions '''
+        rank = 0
+        previous = -1
+        i = 0
+        for c in positions:
+            rank += self._ranks[i][c] - self._ranks[i][previous+1]
+            previous = c
+            i += 1
+        return rank
+
+    def __len__(self):
+        return self._numberOfRaces
+
+    def _bucket(self,cost):
+        if cost not in self._buckets:
+            self._buckets[cost] = set()
+        return self._buckets[cost]
+
+    def _refacing(self,timesFaced):
+        if timesFaced == 0:
+            return 0
+        return pow(3,timesFaced)
+
+    def _timesFaced(self,i,j):
+        return self._faceCounts.timesFaced(self._players[i].index,self._players[j].index)
+
+    def _refacingCostOfRace(self,race):
+        cost = 0
+        for i,j in combinations(race,2):
+            cost += self._refacing(self._timesFaced(i,j))
+        return cost
+
+    def _unrank(self,r):
+        ''' positions of the players of the race with rank r '''
+        positions = []
+        previous = -1
+        for i in range(0,self._playersPerRace):
+            c = previous + 1
+            while self._ranks[i][c+1] - self._ranks[i][previous+1] <= r:
+                c += 1
+            r -= self._ranks[i][c] - self._ranks[i][previous+1]
+            positions.append(c)
+            previous = c
+        return positions
+
+    def cost(self,race,averageNumberOfRaces):
+        ''' same as costOfRace, for a race between players of the table '''
+        positions = sorted(self._position[player.index] for player in race)
+        racesCost = 0
+        for i in positions:
+            racesCost += self._players[i].races + 1
+        refacingCost = self._costs[self._rank(positions)] if self.built else self._refacingCostOfRace(positions)
+        return refacingCost + racesCost - self._playersPerRace*averageNumberOfRaces
+
+    def update(self,race):
+        ''' re-keys the races containing a couple of players of "race", which has just been added to the tournament '''
+        # not built yet: built from the face counts, which already have race
+        if not self.built:
+            return
+        racePositions = sorted(self._position[player.index] for player in race)
+        others = [i for i in range(0,len(self._players)) if i not in racePositions]
+        # races containing at least a couple of players of "race":
+            # choose the players of "race" in it (at least 2) and the others
+        for m in range(2,min(len(racePositions),self._playersPerRace)+1):
+            for common in combinations(racePositions,m):
+                delta = 0
+                for a,b in combinations(common,2):
+                    timesFaced = self._timesFaced(a,b)
+                    delta += self._refacing(timesFaced) - self._refacing(timesFaced-1)
+                for rest in combinations(others,self._playersPerRace-m):
+                    r = self._rank(sorted(common + rest))
+                    cost = self._costs[r]
+                    self._buckets[cost].discard(r)
+                    if len(self._buckets[cost]) == 0:
+                        del self._buckets[cost]
+                    self._costs[r] = cost + delta
+                    self._bucket(cost + delta).add(r)
+
+    def leastExpensiveRaces(self,players):
+        '''
+            same result as leastExpensiveRaces without fixed players (same races in the same order),
+            but the refacing costs are read from the table instead of being computed
+        '''
+        positions = [self._position[player.index] for player in players]
+        racesCost = {}
+        for player in players:
+            racesCost[self._position[player.index]] = player.races + 1
+        if not self.built:
+            self._build()
+        # scan the buckets from the least expensive refacing cost
+            # the races cost is at least the one of the players with least races
+        minRacesCost = sum(sorted(racesCost.values())[:self._playersPerRace])
+        cost = None
+        found = []
+        for bucketCost in sorted(self._buckets):
+            if cost != None and bucketCost + minRacesCost > cost:
+                break
+            for r in self._buckets[bucketCost]:
+                race = self._unrank(r)
+                if not all(i in racesCost for i in race):
+                    continue
+                raceCost = bucketCost
+                for i in race:
+                    raceCost += racesCost[i]
+                if cost == None or raceCost < cost:
+                    cost = raceCost
+                    found = [race]
+                elif raceCost == cost:
+                    found.append(race)
+        # order of the combinations of "players"
+        order = {}
+        for i in positions:
+            order[i] = len(order)
+        races = [sorted(race,key=lambda i : order[i]) for race in found]
+        races.sort(key=lambda race : [order[i] for i in race])
+        return [tuple(self._players[i] for i in race) for race in races]
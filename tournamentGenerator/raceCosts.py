@@ -16,8 +16,17 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ########################################################################
 
-from itertools import combinations
-from random import randint
+from itertools import combinations, chain, islice
+
+from .helper import randomIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# number of combinations scored at once by the vectorized search
+COMBINATIONS_CHUNK_SIZE = 65536
 
 def costOfRace(race,averageNumberOfRaces):
     '''
@@ -85,13 +94,165 @@ def leastExpensiveRaces(players,playersPerRace,averageNumberOfRaces,fixedPlayers
                     races.append(race)
     return races
 
-def leastExpensiveRace(players,playersPerRace,averageNumberOfRaces,fixedPlayers=None):
+def _timesFacedMatrix(players):
+    ''' returns numpy matrix with the number of times each couple of "players" has faced each other '''
+    faceCounts = players[0].faceCounts if len(players) > 0 else None
+    # if all the players are indexed in a numpy face-count index, take the submatrix
+    if faceCounts is not None and faceCounts.usesNumpy and all(p.faceCounts is faceCounts for p in players):
+        indexes = [p.index for p in players]
+        return faceCounts.counts[numpy.ix_(indexes,indexes)].astype(numpy.int64)
+    timesFaced = numpy.zeros((len(players),len(players)),dtype=numpy.int64)
+    for i in range(0,len(players)):
+        for j in range(i+1,len(players)):
+            timesFaced[i,j] = timesFaced[j,i] = players[i].numberOfTimesAlreadyFaced(players[j])
+    return timesFaced
+
+def playerAndRefacingCosts(players,fixedPlayers=None,useNumpy=False):
+    '''
+        costs needed by the race searches to cost the races between "players" with "fixedPlayers":
+            (cost of each player, refacing cost of each couple of players as matrix: 3^timesFaced, 0 if not faced)
+        the cost of each player is races+1 plus refacing with the fixed players
+        the differential with the average number of races and the costs between fixed players
+            are the same for every race, so they are left out
+        lists if not useNumpy, numpy arrays otherwise
+    '''
+    players = list(players)
+    fixed = list(fixedPlayers) if fixedPlayers != None else []
+    m = len(players)
+    if useNumpy:
+        allPlayers = players + fixed
+        timesFaced = _timesFacedMatrix(allPlayers)
+        refacing = numpy.where(timesFaced > 0, numpy.power(3,timesFaced), 0)
+        races = numpy.array([player.races for player in players],dtype=numpy.int64)
+        playerCost = races + 1 + refacing[:m,m:].sum(axis=1)
+        return (playerCost,refacing[:m,:m])
+    playerCost = []
+    for player in players:
+        cost = player.races + 1
+        for fixedPlayer in fixed:
+            timesFaced = player.numberOfTimesAlreadyFaced(fixedPlayer)
+            if timesFaced > 0:
+                cost += pow(3,timesFaced)
+        playerCost.append(cost)
+    refacing = [[0]*m for i in range(0,m)]
+    for i in range(0,m):
+        for j in range(i+1,m):
+            timesFaced = players[i].numberOfTimesAlreadyFaced(players[j])
+            if timesFaced > 0:
+                refacing[i][j] = refacing[j][i] = pow(3,timesFaced)
+    return (playerCost,refacing)
+
+def racesOfIndexes(players,found,fixedPlayers=None):
+    '''
+        races of "players" from the player indexes of each race in found, like the ones of leastExpensiveRaces:
+            lists ending with fixedPlayers if given, tuples otherwise
+    '''
+    fixed = list(fixedPlayers) if fixedPlayers != None else None
+    races = []
+    for indexes in found:
+        if fixed != None:
+            race = [players[i] for i in indexes]
+            race.extend(fixed)
+        else:
+            race = tuple(players[i] for i in indexes)
+        races.append(race)
+    return races
+
+def leastExpensiveRacesVectorized(players,playersPerRace,averageNumberOfRaces,fixedPlayers=None):
+    '''
+        same as leastExpensiveRaces (same races in the same order), but needs numpy
+        the combinations are turned into arrays of indexes and scored in chunks:
+            the differential with averageNumberOfRaces is the same for every race, so it is not computed
+            the cost of each couple is taken from a matrix of 3^timesFaced (0 if not faced)
+    '''
+    if numpy is None:
+        raise ImportError("numpy is needed for the vectorized race costs")
+    players = list(players)
+    fixed = list(fixedPlayers) if fixedPlayers != None else []
+    n = playersPerRace - len(fixed)
+    if n == 0:
+        return [fixed]
+    if n > len(players):
+        return []
+    m = len(players)
+    playerCost,refacing = playerAndRefacingCosts(players,fixed,True)
+    cost = None
+    chunks = []
+    iterator = combinations(range(0,m),n)
+    while True:
+        chunk = numpy.fromiter(chain.from_iterable(islice(iterator,COMBINATIONS_CHUNK_SIZE)),dtype=numpy.intp)
+        if len(chunk) == 0:
+            break
+        chunk = chunk.reshape(-1,n)
+        chunkCosts = playerCost[chunk].sum(axis=1)
+        for a,b in combinations(range(0,n),2):
+            chunkCosts += refacing[chunk[:,a],chunk[:,b]]
+        chunkCost = chunkCosts.min()
+        if cost == None or chunkCost < cost:
+            cost = chunkCost
+            chunks = [chunk[chunkCosts == cost]]
+        elif chunkCost == cost:
+            chunks.append(chunk[chunkCosts == cost])
+    return racesOfIndexes(players,chain.from_iterable(chunk.tolist() for chunk in chunks),fixedPlayers)
+
+def leastExpensiveRacesBranchAndBound(players,playersPerRace,averageNumberOfRaces,fixedPlayers=None):
+    '''
+        same as leastExpensiveRaces (same races in the same order), but with a pruned depth-first search
+        the differential with averageNumberOfRaces is the same for every race, so it is not computed:
+            the cost left of each player is races+1 plus the refacing costs, which are never negative
+        so a partial race is dropped when its cost, plus the cheapest players that could complete it,
+        is more than the cost of the best race found
+    '''
+    players = list(players)
+    fixed = list(fixedPlayers) if fixedPlayers != None else []
+    n = playersPerRace - len(fixed)
+    if n == 0:
+        return [fixed]
+    m = len(players)
+    if n > m:
+        return []
+    playerCost,refacing = playerAndRefacingCosts(players,fixed)
+    # minimum cost of the players from index i on
+    minPlayerCost = [0]*(m+1)
+    for i in range(m-1,-1,-1):
+        minPlayerCost[i] = playerCost[i] if i == m-1 else min(playerCost[i],minPlayerCost[i+1])
+    best = [None]
+    found = []
+    chosen = []
+
+    def search(start,partialCost):
+        needed = n - len(chosen)
+        if needed == 0:
+            if best[0] == None or partialCost < best[0]:
+                best[0] = partialCost
+                del found[:]
+                found.append(tuple(chosen))
+            elif partialCost == best[0]:
+                found.append(tuple(chosen))
+            return
+        for i in range(start,m-needed+1):
+            cost = partialCost + playerCost[i]
+            for j in chosen:
+                cost += refacing[i][j]
+            # the remaining needed-1 players cost at least minPlayerCost[i+1] each
+            if best[0] != None and cost + (needed-1)*minPlayerCost[i+1] > best[0]:
+                continue
+            chosen.append(i)
+            search(i+1,cost)
+            chosen.pop()
+
+    search(0,0)
+    return racesOfIndexes(players,found,fixedPlayers)
+
+def leastExpensiveRace(players,playersPerRace,averageNumberOfRaces,fixedPlayers=None,raceSearch=leastExpensiveRaces,rng=None):
     '''
         find least expensive race between "players" (if multiple races with same least cost, return random race)
         if player == None, race between players 
         if player specified (= P), then P is fixed so it must be in the race
             for example: race can be [P,players[3],players[7]] 
+        raceSearch is the function used to find the least expensive races (leastExpensiveRaces or any alternative)
+        rng is the random.Random used to choose between races with same cost (if None, the random module)
     '''
-    races = leastExpensiveRaces(players,playersPerRace,averageNumberOfRaces,fixedPlayers)
-    i = randint(0,len(races)-1) 
+    races = raceSearch(players,playersPerRace,averageNumberOfRaces,fixedPlayers)
+    i = randomIndex(len(races),rng)
     return races[i]
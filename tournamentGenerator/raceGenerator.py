@@ -17,30 +17,167 @@
 ########################################################################
     
 from __future__ import print_function
+from random import Random
+from time import time as now
+from multiprocessing import Pool, TimeoutError
 
 from .tournament import *
 from .raceCosts import *
-from .helper import removeList2fromList1, printRaces
+from .raceCostTable import RaceCostTable
+from .parallelRaceSearch import ParallelRaceSearch
+from .helper import removeList2fromList1, printRaces, randomIndex
+from .randomPlayerGenerator import RandomPlayerGenerator
+from .bounds import minimumNumberOfRaces, optimalityGap
+from .designs import design
+from .localSearch import improveSchedule
+from .generationStats import timedPhase
+
+def repeatedPairings(tournament):
+    ''' number of times couples of players face each other after the first time '''
+    n = tournament.getNumberOfPlayers()
+    repeated = 0
+    for i in range(0,n):
+        for j in range(i+1,n):
+            timesFaced = tournament.faceCounts.timesFaced(i,j)
+            if timesFaced > 1:
+                repeated += timesFaced - 1
+    return repeated
+
+def racesVariance(tournament):
+    ''' variance of the number of races of the players '''
+    average = tournament.averageNumberOfRaces()
+    variance = 0.0
+    for player in tournament.players:
+        variance += (player.races - average)**2
+    return variance / tournament.getNumberOfPlayers()
+
+def scheduleScore(tournament):
+    ''' (number of races, repeated pairings, variance of races), the lower the better '''
+    return (len(tournament.races),repeatedPairings(tournament),racesVariance(tournament))
+
+def _generateSchedule(numberOfPlayers, playersPerRace, seed, raceSearch, incrementalCosts, designs):
+    '''
+        generates the races of numberOfPlayers anonymous players with a RaceGenerator seeded with seed
+        returns (score, races as lists of player indexes)
+    '''
+    tournament = Tournament.init_WithPlayerGenerator(RandomPlayerGenerator(numberOfPlayers))
+    raceGenerator = RaceGenerator(playersPerRace,raceSearch=raceSearch,incrementalCosts=incrementalCosts,rng=Random(seed),designs=designs)
+    raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+    races = [[player.index for player in race] for race in tournament.races]
+    return (scheduleScore(tournament),races)
+
+def _generateScheduleOfRun(run):
+    ''' _generateSchedule with its arguments in a tuple (for Pool.imap_unordered) '''
+    return _generateSchedule(*run)
 
 class RaceGenerator():
     'Race generator class'
-    def __init__(self, playersPerRace, printRaces = False):
+    def __init__(self, playersPerRace, printRaces = False, raceSearch = leastExpensiveRaces, incrementalCosts = False, workers = None, rng = None, designs = True, improveTimeBudget = None, stats = None):
         self._playersPerRace = playersPerRace
         self._printRacesFlag = printRaces
+        # function used to find the least expensive races (for example leastExpensiveRacesVectorized)
+        self._raceSearch = raceSearch
+        # random.Random used for every choice between equivalent races or players
+            # so that a schedule can be reproduced (if None, the random module)
+        self._rng = rng
+        # with more workers, the races are searched by worker processes (ParallelRaceSearch),
+            # so raceSearch can't be given too
+        if workers != None and workers > 1:
+            if raceSearch is not leastExpensiveRaces:
+                raise ValueError("raceSearch can't be given with more than 1 worker")
+            self._raceSearch = ParallelRaceSearch(workers)
+        # if True, searches without fixed players (generate_randomLowCost, so generate_randomUntilSameNumberOfRaces)
+            # read the costs of all the possible races from a RaceCostTable, updated after each race added,
+            # instead of scoring every race each time; searches with fixed players always use raceSearch,
+            # as the searches without if there are too many possible races for the table
+        self._incrementalCostsFlag = incrementalCosts
+        self._costTable = None
+        self._costTableTournament = None
+        # if True, known designs are used instead of the search, when they exist (see designs)
+        self._designsFlag = designs
+        # seconds of local search to remove races after generate_lowCostForPlayerWithLeastRaces (None for no search)
+        self._improveTimeBudget = improveTimeBudget
+        # GenerationStats filled while generating (None for no statistics)
+        self._stats = stats
+        # races more than the lower bound, of the last tournament generated
+        self._optimalityGap = None
+        # function adding the races to the tournament while iterating, as addRace(tournament, race) (see iterRaces)
+        self._addRaceFunction = None
+
+    @property
+    def optimalityGap(self):
+        return self._optimalityGap
+
+    def _reportOptimalityGap(self,tournament):
+        ''' stores (and prints if printing races) the races of tournament more than the lower bound '''
+        self._optimalityGap = optimalityGap(tournament,self._playersPerRace)
+        if self._printRacesFlag:
+            print("Races: " + str(len(tournament.races)) + ", optimality gap: " + str(self._optimalityGap))
+
+    def _prepareCostTable(self,tournament):
+        ''' creates the cost table of the tournament, if not already created '''
+        if self._incrementalCostsFlag and self._costTableTournament is not tournament:
+            self._costTable = RaceCostTable(tournament.getPlayers(),self._playersPerRace)
+            if not self._costTable.buildable:
+                self._costTable = None
+            self._costTableTournament = tournament
+
+    @property
+    def stats(self):
+        return self._stats
+
+    def _leastExpensiveRace(self,players,averageNumberOfRaces,fixedPlayers=None):
+        ''' random race between the least expensive ones (as leastExpensiveRace) '''
+        if self._costTable != None and fixedPlayers == None:
+            races = self._costTable.leastExpensiveRaces(players)
+        else:
+            races = self._raceSearch(players,self._playersPerRace,averageNumberOfRaces,fixedPlayers)
+        if self._stats != None:
+            numberOfFixedPlayers = len(fixedPlayers) if fixedPlayers != None else 0
+            self._stats.recordSearch(len(players),self._playersPerRace - numberOfFixedPlayers,len(races))
+        return races[randomIndex(len(races),self._rng)]
+
+    def close(self):
+        ''' stops the worker processes, if any '''
+        if isinstance(self._raceSearch,ParallelRaceSearch):
+            self._raceSearch.close()
+
+    def _addRace(self,tournament,race):
+        if self._stats != None:
+            self._stats.recordRace(race,tournament.costOfRace(race))
+        if self._addRaceFunction != None:
+            self._addRaceFunction(tournament,race)
+        else:
+            tournament.addRace(race)
+        if self._costTable != None:
+            self._costTable.update(race)
+        self.printRace(race)
 
     def generate_randomLowCost(self,tournament):
+        for race in self._iterRandomLowCost(tournament):
+            pass
+
+    @timedPhase("randomLowCost")
+    def _iterRandomLowCost(self,tournament):
         '''
             generates by adding least cost races 
             until all players have faced each other
                 every player same number of races
+            yields each race added
         '''
+        self._prepareCostTable(tournament)
         # while at least a player hasn't faced everyone and not all players have same number of races
         while ( not(tournament.playersSameNumberOfRaces()) or (tournament.somebodyDidNotFaceEveryone()) ):
-            race = leastExpensiveRace(tournament.players,self._playersPerRace,tournament.averageNumberOfRaces())
-            tournament.addRace(race)
-            self.printRace(race)
+            race = self._leastExpensiveRace(tournament.getPlayers(),tournament.averageNumberOfRaces())
+            self._addRace(tournament,race)
+            yield race
 
     def generate_AllPlayersFaceEachOther(self,tournament):
+        for race in self._iterAllPlayersFaceEachOther(tournament):
+            pass
+
+    @timedPhase("allPlayersFaceEachOther")
+    def _iterAllPlayersFaceEachOther(self,tournament):
         '''
             generates by:
             until all players have faced each other:
@@ -48,7 +185,9 @@ class RaceGenerator():
                 add least costly race between him and players he hasn't met
                     in case not enough players, get the rest from players with least races
                     (example: 4 players per race, player has only 1 player not met, so get at least 2 from least number of races)
+            yields each race added
         '''
+        self._prepareCostTable(tournament)
         # while at least a player hasn't faced everyone
         while (tournament.somebodyDidNotFaceEveryone()):
             player = tournament.getPlayerThatHasntFacedEveryone()
@@ -58,9 +197,9 @@ class RaceGenerator():
                 # if number of playersNotFaced equal to playersPerRace - 1 or more
                     # find combination of (playersPerRace - 1) players, that along with player gives race with least cost
                 if ( len(playersNotFaced) > (self._playersPerRace - 1) ):
-                    race = leastExpensiveRace(playersNotFaced,self._playersPerRace,tournament.averageNumberOfRaces(),[player])
-                    tournament.addRace(race)
-                    self.printRace(race)
+                    race = self._leastExpensiveRace(playersNotFaced,tournament.averageNumberOfRaces(),[player])
+                    self._addRace(tournament,race)
+                    yield race
                 # if number of playersNotFaced equal to playersPerRace - 1 
                     # then by adding player I have exactly playersPerRace number of players
                     # so the race is the player with playersNotFaced
@@ -68,8 +207,8 @@ class RaceGenerator():
                     # append player and add race
                     race = list(playersNotFaced)
                     race.append(player)
-                    tournament.addRace(race)
-                    self.printRace(race)
+                    self._addRace(tournament,race)
+                    yield race
                 # playersNotFaced not enough for a race, so I fix playerNotFaced and player, 
                     # and get the remaining players from playerWithLeastRaces
                     # NOTE: by using atLeastNplayersWithLeastRaces, I might have more than needed, so I check the costs
@@ -81,51 +220,259 @@ class RaceGenerator():
                     # add at least n players, where n is needed to reach playerPerRace
                         # I actually get least playerPerRace number of players, and then I remove fixedPlayers 
                             # since fixedPlayers could be in playersWithLeastRaces
-                    otherPlayers = atLeastNplayersWithLeastRaces(self._playersPerRace,tournament.players)
+                    otherPlayers = atLeastNplayersWithLeastRaces(self._playersPerRace,tournament.getPlayers())
                     removeList2fromList1(otherPlayers,fixedPlayers)
-                    race = leastExpensiveRace(\
+                    race = self._leastExpensiveRace(\
                             otherPlayers,\
-                            self._playersPerRace,\
                             tournament.averageNumberOfRaces(),\
                             fixedPlayers)
-                    tournament.addRace(race)
-                    self.printRace(race)
+                    self._addRace(tournament,race)
+                    yield race
                 playersNotFaced = player.playersNotFaced(tournament.players)
         # 2) until every player same number of race
         # while ( not(tournament.playersSameNumberOfRaces()) ):
         #    tournament.addRace(leastExpensiveRace(tournament.players,self.playersPerRace,tournament.averageNumberOfRaces()))
    
     def generate_AllPlayersSameNumberOfRaces(self,tournament):
+        for race in self._iterAllPlayersSameNumberOfRaces(tournament):
+            pass
+
+    @timedPhase("allPlayersSameNumberOfRaces")
+    def _iterAllPlayersSameNumberOfRaces(self,tournament):
         '''
             generates by:
                 until every player same number of races
                     add least costly races
+            yields each race added
         '''
+        self._prepareCostTable(tournament)
         # until every player same number of race
         while ( not(tournament.playersSameNumberOfRaces()) ):
             # get a random player with least number of races
-            player = playerWithLeastRaces(tournament.players)
+            player = playerWithLeastRaces(tournament.players,self._rng)
             # add least cost race by fixing player, and remaining playersWithLeastRaces
-            otherPlayers = atLeastNplayersWithLeastRaces(self._playersPerRace,tournament.players)
+            otherPlayers = atLeastNplayersWithLeastRaces(self._playersPerRace,tournament.getPlayers())
             removeList2fromList1(otherPlayers,[player])
-            race = leastExpensiveRace(\
+            race = self._leastExpensiveRace(\
                         otherPlayers,\
-                        self._playersPerRace,\
                         tournament.averageNumberOfRaces(),\
                         [player])
-            tournament.addRace(race)
-            self.printRace(race)
+            self._addRace(tournament,race)
+            yield race
        
+    @timedPhase("newPlayersSameNumberOfRaces")
+    def _iterNewPlayersSameNumberOfRaces(self,tournament):
+        '''
+            as _iterAllPlayersSameNumberOfRaces, but the other players of the race are searched only between
+            the players with least races that the fixed player has faced less (3 per other player of the race),
+            instead of every player with least races
+            yields each race added
+        '''
+        self._prepareCostTable(tournament)
+        numberOfCandidates = 3*(self._playersPerRace - 1)
+        # until every player same number of race
+        while ( not(tournament.playersSameNumberOfRaces()) ):
+            player = playerWithLeastRaces(tournament.players,self._rng)
+            otherPlayers = atLeastNplayersWithLeastRaces(self._playersPerRace,tournament.getPlayers())
+            removeList2fromList1(otherPlayers,[player])
+            # stable sort, so same races and times faced in the order of the players
+            otherPlayers.sort(key=lambda other : (other.races,player.numberOfTimesAlreadyFaced(other)))
+            race = self._leastExpensiveRace(\
+                        otherPlayers[:numberOfCandidates],\
+                        tournament.averageNumberOfRaces(),\
+                        [player])
+            self._addRace(tournament,race)
+            yield race
+
     def printRace(self,race):
         if self._printRacesFlag:
             print(race)
             
+    def generate_design(self,tournament):
+        '''
+            if tournament has no races and a design is known for its number of players,
+            adds the races of the design (everyone faces everyone exactly once) and returns True
+        '''
+        races = self._designRaces(tournament)
+        if races == None:
+            return False
+        for race in self._iterDesign(tournament,races):
+            pass
+        return True
+
+    def _designRaces(self,tournament):
+        ''' races (lists of player indexes) of the design for tournament, None if it has races or there is no design '''
+        if len(tournament.races) != 0:
+            return None
+        return design(tournament.getNumberOfPlayers(),self._playersPerRace)
+
+    @timedPhase("design")
+    def _iterDesign(self,tournament,races):
+        ''' adds races (lists of player indexes) and yields each race added '''
+        players = tournament.players
+        for race in races:
+            race = [players[i] for i in race]
+            self._addRace(tournament,race)
+            yield race
+
+    def generate_newPlayers(self, tournament, players):
+        '''
+            adds players to tournament (see Tournament.addPlayers) and generates only the races needed
+            so that again everyone has faced everyone and every player has the same number of races
+            returns the number of races added
+        '''
+        numberOfRaces = len(tournament.races)
+        for race in self.iterNewPlayers(tournament,players):
+            pass
+        return len(tournament.races) - numberOfRaces
+
+    def iterNewPlayers(self, tournament, players, cancel=None):
+        '''
+            adds players to tournament (see Tournament.addPlayers) when called,
+            and returns an iterator (as iterRaces) on the races added for them:
+                the other players had already faced each other, so the races searched to face everyone
+                are between a player and the new players it has not faced
+                then, the races to have same number of races are searched between a few candidates (see _iterNewPlayersSameNumberOfRaces)
+            so the searches do not grow with the number of players
+        '''
+        tournament.addPlayers(players)
+        # the cost table is for the players before
+        if self._costTableTournament is tournament:
+            self._costTable = None
+            self._costTableTournament = None
+        phases = [self._iterAllPlayersFaceEachOther(tournament),self._iterNewPlayersSameNumberOfRaces(tournament)]
+        return self._iterPhases(tournament,phases,cancel)
+
+    def iterRaces(self, tournament, randomLowCost=False, cancel=None, addRace=None):
+        '''
+            generates the races of tournament as generate_lowCostForPlayerWithLeastRaces
+            (as generate_randomUntilSameNumberOfRaces if randomLowCost, no local search in both cases),
+            yielding each race as soon as it is added to the tournament
+            generation stops when the iteration is stopped (close, or break of a for loop),
+            or after a race if cancel (threading.Event) is set: the races added so far stay in the tournament
+            if given, addRace(tournament, race) adds each race instead of tournament.addRace:
+                the search only reads the races and the face counts of the tournament,
+                so another thread can use the tournament if it takes the lock taken by addRace
+        '''
+        races = self._designRaces(tournament) if self._designsFlag else None
+        if races != None:
+            phases = [self._iterDesign(tournament,races)]
+        elif randomLowCost:
+            phases = [self._iterAllPlayersFaceEachOther(tournament),self._iterRandomLowCost(tournament)]
+        else:
+            phases = [self._iterAllPlayersFaceEachOther(tournament),self._iterAllPlayersSameNumberOfRaces(tournament)]
+        return self._iterPhases(tournament,phases,cancel,addRace)
+
+    def _iterPhases(self, tournament, phases, cancel, addRace=None):
+        '''
+            yields the races of phases (iterators of races), one phase after the other, stops if cancel is set
+            races are added by addRace, if given
+        '''
+        self._addRaceFunction = addRace
+        try:
+            for phase in phases:
+                try:
+                    for race in phase:
+                        yield race
+                        if cancel != None and cancel.is_set():
+                            return
+                finally:
+                    phase.close()
+        finally:
+            self._addRaceFunction = None
+        self._reportOptimalityGap(tournament)
+
     def generate_randomUntilSameNumberOfRaces(self,tournament):
-        self.generate_AllPlayersFaceEachOther(tournament)
-        self.generate_randomLowCost(tournament)
+        if not (self._designsFlag and self.generate_design(tournament)):
+            self.generate_AllPlayersFaceEachOther(tournament)
+            self.generate_randomLowCost(tournament)
+        self._reportOptimalityGap(tournament)
 
     def generate_lowCostForPlayerWithLeastRaces(self, tournament):
-        self.generate_AllPlayersFaceEachOther(tournament)
-        self.generate_AllPlayersSameNumberOfRaces(tournament)
+        if not (self._designsFlag and self.generate_design(tournament)):
+            self.generate_AllPlayersFaceEachOther(tournament)
+            self.generate_AllPlayersSameNumberOfRaces(tournament)
+            if self._improveTimeBudget != None:
+                self.improve(tournament,self._improveTimeBudget)
+        self._reportOptimalityGap(tournament)
+
+    @timedPhase("improve")
+    def improve(self, tournament, timeBudget):
+        '''
+            local search (see localSearch) that replaces the races of tournament with less races,
+            keeping everyone faced and same number of races, for timeBudget seconds at most
+            returns the number of races removed
+        '''
+        removed = improveSchedule(tournament,self._playersPerRace,timeBudget,self._rng)
+        # races have been replaced, so the cost table does not match the tournament anymore
+        if removed != 0 and self._costTableTournament is tournament:
+            self._costTable = None
+            self._costTableTournament = None
+        if self._printRacesFlag:
+            print("Races removed by local search: " + str(removed))
+        return removed
+
+    def generate_bestOf(self, tournament, numberOfRuns, workers=None, timeBudget=None):
+        '''
+            generates numberOfRuns schedules with generate_lowCostForPlayerWithLeastRaces, each with its own seed,
+            and adds to tournament (with no races) the best one: 
+                fewest races, then fewest repeated pairings, then lowest variance of races per player
+            the runs are done by worker processes if workers is more than 1
+            stops when timeBudget (seconds) is over (at least a run is completed)
+                or when a schedule has the minimum number of races (see bounds)
+            returns the number of runs completed
+        '''
+        if numberOfRuns < 1:
+            raise ValueError("numberOfRuns must be at least 1")
+        # seeds from rng, so that the best schedule can be reproduced
+        seeds = [randomIndex(2**32,self._rng) for i in range(0,numberOfRuns)]
+        # a ParallelRaceSearch can't be sent to workers
+        raceSearch = self._raceSearch if not isinstance(self._raceSearch,ParallelRaceSearch) else leastExpensiveRaces
+        arguments = (tournament.getNumberOfPlayers(),self._playersPerRace)
+        minimum = minimumNumberOfRaces(*arguments)
+        deadline = None if timeBudget == None else now() + timeBudget
+        best = None
+        runs = 0
+        if workers == None or workers < 2:
+            for seed in seeds:
+                result = _generateSchedule(arguments[0],arguments[1],seed,raceSearch,self._incrementalCostsFlag,self._designsFlag)
+                runs += 1
+                if best == None or result[0] < best[0]:
+                    best = result
+                if best[0][0] <= minimum or (deadline != None and now() >= deadline):
+                    break
+        else:
+            runArguments = [(arguments[0],arguments[1],seed,raceSearch,self._incrementalCostsFlag,self._designsFlag) for seed in seeds]
+            pool = Pool(workers)
+            try:
+                results = pool.imap_unordered(_generateScheduleOfRun,runArguments)
+                while runs < numberOfRuns:
+                    timeout = None if (deadline == None or best == None) else max(0,deadline - now())
+                    try:
+                        result = results.next(timeout)
+                    except TimeoutError:
+                        break
+                    runs += 1
+                    if best == None or result[0] < best[0]:
+                        best = result
+                    if best[0][0] <= minimum or (deadline != None and now() >= deadline):
+                        break
+            finally:
+                # the runs not needed anymore are stopped
+                pool.terminate()
+                pool.join()
+        # add the races of the best schedule to the tournament, players by position
+        self.addSchedule(tournament,best[1])
+        return runs
+
+    def addSchedule(self, tournament, races):
+        '''
+            adds races (lists of player indexes, for example from a ScheduleCache) to tournament,
+            mapping the indexes onto the players of tournament by position
+        '''
+        players = tournament.players
+        for race in races:
+            self._addRace(tournament,[players[i] for i in race])
+        self._reportOptimalityGap(tournament)
 
 
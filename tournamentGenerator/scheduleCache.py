@@ -0,0 +1,151 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import os
+import struct
+import sys
+from array import array
+from itertools import combinations
+
+'''
+    Persistent cache of the best known schedules, keyed by (numberOfPlayers, playersPerRace, seed)
+    A schedule is the list of races as lists of player indexes, so it fits any tournament with that number of players
+    Each schedule is a file of the cache directory:
+        header (see HEADER)
+        players of the races        int32 * (numberOfRaces*playersPerRace)
+    The least recently used schedules are removed when the files are more than maxBytes
+'''
+
+MAGIC = b"TGSC"
+VERSION = 1
+# magic, version, numberOfPlayers, playersPerRace, seed (-1 for any seed), numberOfRaces
+HEADER = struct.Struct("<4sHiiqq")
+EXTENSION = ".tgc"
+DEFAULT_DIRECTORY = "scheduleCache"
+
+def scheduleOf(tournament):
+    ''' races of tournament as lists of player indexes '''
+    return [[player.index for player in race] for race in tournament.races]
+
+def scheduleScoreOf(numberOfPlayers, races):
+    ''' (number of races, repeated pairings, variance of races) of races as lists of player indexes, as scheduleScore of raceGenerator '''
+    pairings = {}
+    racesOfPlayers = [0]*numberOfPlayers
+    for race in races:
+        for i in race:
+            racesOfPlayers[i] += 1
+        for pair in combinations(sorted(race),2):
+            pairings[pair] = pairings.get(pair,0) + 1
+    repeated = sum(timesFaced - 1 for timesFaced in pairings.values())
+    average = sum(racesOfPlayers) / numberOfPlayers
+    variance = sum((races - average)**2 for races in racesOfPlayers) / numberOfPlayers
+    return (len(races),repeated,variance)
+
+class ScheduleCache():
+    '''
+        Directory of schedules, the most recently used are kept within maxBytes
+        seed is the seed of the RaceGenerator, None if not seeded: the best schedule found so far is kept
+    '''
+    def __init__(self, directory=DEFAULT_DIRECTORY, maxBytes=16*1024*1024):
+        self._directory = directory
+        self._maxBytes = maxBytes
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def _path(self, numberOfPlayers, playersPerRace, seed):
+        name = str(numberOfPlayers) + "-" + str(playersPerRace) + "-" + ("any" if seed == None else str(seed))
+        return os.path.join(self._directory,name + EXTENSION)
+
+    def getSchedule(self, numberOfPlayers, playersPerRace, seed=None):
+        ''' returns the schedule cached for the key, None if there is none (or it is not valid) '''
+        path = self._path(numberOfPlayers,playersPerRace,seed)
+        try:
+            with open(path,"rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        races = self._parse(data,numberOfPlayers,playersPerRace)
+        if races == None:
+            os.remove(path)
+            return None
+        # most recently used
+        os.utime(path)
+        return races
+
+    def _parse(self, data, numberOfPlayers, playersPerRace):
+        if len(data) < HEADER.size:
+            return None
+        magic, version, players, perRace, seed, numberOfRaces = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or players != numberOfPlayers or perRace != playersPerRace:
+            return None
+        indexes = array("i")
+        if len(data) != HEADER.size + numberOfRaces*playersPerRace*indexes.itemsize:
+            return None
+        indexes.frombytes(data[HEADER.size:])
+        if sys.byteorder == "big":
+            indexes.byteswap()
+        if len(indexes) != 0 and (min(indexes) < 0 or max(indexes) >= numberOfPlayers):
+            return None
+        return [list(indexes[i:i+playersPerRace]) for i in range(0,len(indexes),playersPerRace)]
+
+    def putSchedule(self, numberOfPlayers, playersPerRace, races, seed=None):
+        '''
+            stores races (lists of player indexes), unless the cached schedule is as good (see scheduleScoreOf)
+            returns True if stored
+        '''
+        indexes = array("i",[index for race in races for index in race])
+        if len(indexes) != len(races)*playersPerRace:
+            raise ValueError("every race must have " + str(playersPerRace) + " players")
+        cached = self.getSchedule(numberOfPlayers,playersPerRace,seed)
+        if cached != None and scheduleScoreOf(numberOfPlayers,cached) <= scheduleScoreOf(numberOfPlayers,races):
+            return False
+        if sys.byteorder == "big":
+            indexes.byteswap()
+        os.makedirs(self._directory,exist_ok=True)
+        path = self._path(numberOfPlayers,playersPerRace,seed)
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath,"wb") as f:
+            f.write(HEADER.pack(MAGIC,VERSION,numberOfPlayers,playersPerRace,-1 if seed == None else seed,len(races)))
+            f.write(indexes.tobytes())
+        os.replace(temporaryPath,path)
+        self._evict(path)
+        return True
+
+    def _evict(self, keep):
+        ''' removes the least recently used schedules (except keep) until the files are within maxBytes '''
+        files = []
+        for name in os.listdir(self._directory):
+            if name.endswith(EXTENSION):
+                stat = os.stat(os.path.join(self._directory,name))
+                files.append((stat.st_mtime,stat.st_size,os.path.join(self._directory,name)))
+        total = sum(size for mtime, size, path in files)
+        for mtime, size, path in sorted(files):
+            if total <= self._maxBytes:
+                break
+            if path != keep:
+                os.remove(path)
+                total -= size
+
+    def clear(self):
+        if os.path.isdir(self._directory):
+            for name in os.listdir(self._directory):
+                if name.endswith(EXTENSION):
+                    os.remove(os.path.join(self._directory,name))
@@ -0,0 +1,58 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from collections.abc import Sequence
+
+class SequenceView(Sequence):
+    '''
+        Read-only view of a sequence of a tournament, without copying it
+        source is the sequence, or a function without arguments returning it (read at every access)
+        The view follows the changes of the tournament, copy() returns a list that does not
+        Compares equal to any sequence with the same elements (for example a list)
+    '''
+    def __init__(self, source):
+        self._source = source if callable(source) else (lambda : source)
+
+    def __len__(self):
+        return len(self._source())
+
+    def __getitem__(self, index):
+        return self._source()[index]
+
+    def __iter__(self):
+        return iter(self._source())
+
+    def __eq__(self, other):
+        if isinstance(other,Sequence) and not isinstance(other,str):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return list(self)
@@ -0,0 +1,209 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import struct
+import sys
+from array import array
+
+from .player import Player
+from .tournament import Tournament
+from .helper import timeToMicroseconds, microsecondsToTime
+
+'''
+    Compact binary snapshot of a tournament, replacing pickle backups
+    Little-endian, every section starts at a multiple of 8 bytes:
+        header (see HEADER)
+        points for each position                    int64 * numberOfPoints
+        name offsets                                int32 * (numberOfPlayers+1)
+        names                                       utf-8 bytes
+        races, races done, points of each player    int32, int32, int64 * numberOfPlayers
+        fastest lap of each player                  int64 * numberOfPlayers (microseconds, -1 if none)
+        race offsets                                int32 * (numberOfRaces+1)
+        players of the races                        int32 * raceSlots
+        race result offsets                         int32 * (numberOfRaceResults+1)
+        players, positions of the race results      int32 * resultSlots
+        lap times of the race results               int64 * resultSlots (microseconds)
+    Players, races and race results are enough to rebuild the tournament,
+    counters of the players are stored so that it can be read without rebuilding it (see snapshotReader)
+    The generation is the number of the checkpoint that wrote the snapshot (see journal), 0 if none
+'''
+
+MAGIC = b"TGSN"
+VERSION = 2
+# magic, version, flags, numberOfPlayers, numberOfPoints, pointsFastestLap,
+    # numberOfRaces, raceSlots, numberOfRaceResults, resultSlots, namesLength, generation
+HEADER = struct.Struct("<4sHHqqqqqqqqq")
+# flags
+FLAG_NUMPY = 1
+FLAG_COLUMNAR_RACES = 2
+
+def _pad(length):
+    return (-length) % 8
+
+def _arrayBytes(typecode, values):
+    a = array(typecode,values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    data = a.tobytes()
+    return data + b"\0"*_pad(len(data))
+
+def _readArray(typecode, data, offset, length):
+    ''' returns (array, offset of the next section) '''
+    a = array(typecode)
+    end = offset + length*a.itemsize
+    if end > len(data):
+        raise ValueError("truncated tournament snapshot")
+    a.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a, end + _pad(end - offset)
+
+def dumpSnapshot(tournament, generation=0):
+    ''' returns the snapshot of tournament as bytes '''
+    players = tournament.players
+    races = tournament.races
+    raceResults = tournament.raceResults
+    names = b""
+    nameOffsets = [0]
+    for player in players:
+        names += player.name.encode("utf-8")
+        nameOffsets.append(len(names))
+    raceOffsets = [0]
+    racePlayers = []
+    for race in races:
+        racePlayers += [player.index for player in race]
+        raceOffsets.append(len(racePlayers))
+    resultOffsets = [0]
+    resultPlayers = []
+    resultPositions = []
+    resultLapTimes = []
+    for i in range(0,len(raceResults)):
+        raceResult = raceResults[i]
+        resultPlayers += [player.index for player, lapTime in raceResult]
+        resultPositions += tournament.getRaceResultPositions(i)
+        resultLapTimes += [timeToMicroseconds(lapTime) for player, lapTime in raceResult]
+        resultOffsets.append(len(resultPlayers))
+    flags = (FLAG_NUMPY if tournament.faceCounts.usesNumpy else 0) | (FLAG_COLUMNAR_RACES if tournament.columnarRaces else 0)
+    columns = tournament.playerColumns
+    return b"".join([\
+        HEADER.pack(MAGIC,VERSION,flags,len(players),len(tournament.points),tournament.pointsFastestLap,\
+            len(races),len(racePlayers),len(raceResults),len(resultPlayers),len(names),generation),\
+        _arrayBytes('q',tournament.points),\
+        _arrayBytes('i',nameOffsets),\
+        names + b"\0"*_pad(len(names)),\
+        _arrayBytes('i',columns.races),\
+        _arrayBytes('i',columns.racesDone),\
+        _arrayBytes('q',columns.points),\
+        _arrayBytes('q',columns.fastestLap),\
+        _arrayBytes('i',raceOffsets),\
+        _arrayBytes('i',racePlayers),\
+        _arrayBytes('i',resultOffsets),\
+        _arrayBytes('i',resultPlayers),\
+        _arrayBytes('i',resultPositions),\
+        _arrayBytes('q',resultLapTimes)\
+    ])
+
+def readHeader(data):
+    ''' returns the header of a snapshot as a dict, raises ValueError if data is not a snapshot '''
+    if len(data) < HEADER.size:
+        raise ValueError("not a tournament snapshot")
+    values = HEADER.unpack_from(data,0)
+    if values[0] != MAGIC:
+        raise ValueError("not a tournament snapshot")
+    if values[1] != VERSION:
+        raise ValueError("tournament snapshot version " + str(values[1]) + " not supported")
+    keys = ("magic","version","flags","numberOfPlayers","numberOfPoints","pointsFastestLap",\
+        "numberOfRaces","raceSlots","numberOfRaceResults","resultSlots","namesLength","generation")
+    return dict(zip(keys,values))
+
+def sectionOffsets(header):
+    ''' returns { section name : (offset, typecode, length) } of the sections of a snapshot with header '''
+    n = header["numberOfPlayers"]
+    sections = (\
+        ("points",'q',header["numberOfPoints"]),\
+        ("nameOffsets",'i',n+1),\
+        ("names",'B',header["namesLength"]),\
+        ("races",'i',n),\
+        ("racesDone",'i',n),\
+        ("playerPoints",'q',n),\
+        ("fastestLap",'q',n),\
+        ("raceOffsets",'i',header["numberOfRaces"]+1),\
+        ("racePlayers",'i',header["raceSlots"]),\
+        ("resultOffsets",'i',header["numberOfRaceResults"]+1),\
+        ("resultPlayers",'i',header["resultSlots"]),\
+        ("resultPositions",'i',header["resultSlots"]),\
+        ("resultLapTimes",'q',header["resultSlots"])\
+    )
+    offsets = {}
+    offset = HEADER.size
+    for name, typecode, length in sections:
+        offsets[name] = (offset,typecode,length)
+        size = length*array(typecode).itemsize
+        offset += size + _pad(size)
+    return offsets
+
+def readSections(data):
+    ''' returns (header, dict of the sections of the snapshot as arrays, names as bytes) '''
+    header = readHeader(data)
+    sections = {}
+    for name, (offset, typecode, length) in sectionOffsets(header).items():
+        if name == "names":
+            sections[name] = bytes(data[offset:offset+length])
+        else:
+            sections[name] = _readArray(typecode,data,offset,length)[0]
+    return header, sections
+
+def loadSnapshot(data):
+    '''
+        returns the tournament of a snapshot (bytes):
+        the counters of the players are read from the snapshot, the races and race results are not applied again
+    '''
+    header, sections = readSections(data)
+    nameOffsets = sections["nameOffsets"]
+    names = sections["names"]
+    players = [Player(names[nameOffsets[i]:nameOffsets[i+1]].decode("utf-8")) for i in range(0,header["numberOfPlayers"])]
+    tournament = Tournament(players,tuple(sections["points"]),header["pointsFastestLap"],\
+        bool(header["flags"] & FLAG_NUMPY),bool(header["flags"] & FLAG_COLUMNAR_RACES))
+    raceOffsets = sections["raceOffsets"]
+    racePlayers = sections["racePlayers"]
+    races = [racePlayers[raceOffsets[r]:raceOffsets[r+1]] for r in range(0,header["numberOfRaces"])]
+    resultOffsets = sections["resultOffsets"]
+    raceResults = []
+    for r in range(0,header["numberOfRaceResults"]):
+        start, end = resultOffsets[r], resultOffsets[r+1]
+        raceResults.append((\
+            sections["resultPlayers"][start:end],\
+            sections["resultPositions"][start:end],\
+            sections["resultLapTimes"][start:end]\
+        ))
+    counters = (sections["races"],sections["racesDone"],sections["playerPoints"],sections["fastestLap"])
+    tournament._restore(races,raceResults,counters)
+    return tournament
+
+def saveSnapshot(tournament, filename):
+    with open(filename,"wb") as f:
+        f.write(dumpSnapshot(tournament))
+
+def loadSnapshotFile(filename):
+    with open(filename,"rb") as f:
+        return loadSnapshot(f.read())
+
+def isSnapshotFile(filename):
+    with open(filename,"rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
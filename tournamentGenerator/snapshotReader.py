@@ -0,0 +1,248 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+import mmap
+import os
+import sys
+from array import array
+
+from .snapshot import readHeader, readSections, sectionOffsets, HEADER
+from .journal import readGeneration, iterEvents, RACE
+from .playerColumns import NO_FASTEST_LAP
+from .helper import microsecondsToTime, lapTimeToStr
+
+class SnapshotReader():
+    '''
+        Read-only tournament of a snapshot file (see snapshot), memory-mapped:
+        queries read the arrays of the file, without creating Player objects or rebuilding the tournament
+        Players are identified by index, as in the snapshot
+        With journal, the events of the journal of the snapshot (basePath.journal of basePath.tgs, see Journal)
+        are read when opening: they are kept in memory over the mapped arrays, events written later are not seen
+    '''
+    def __init__(self, filename, journal=True):
+        self._file = open(filename,"rb")
+        self._mmap = None
+        self._views = []
+        # events of the journal: races, race results as [ (player index, lap time in microseconds), ... ]
+        self._journalRaces = []
+        self._journalResults = []
+        # counters of the players changed by the journal: { section : { player index : value } }
+        self._journalCounters = {"races":{},"racesDone":{},"playerPoints":{},"fastestLap":{}}
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(),0,access=mmap.ACCESS_READ)
+            self._header = readHeader(self._mmap[:HEADER.size])
+            if sys.byteorder == "little":
+                self._sections = self._mapSections()
+            else:
+                # arrays of the file are little-endian, so they are copied
+                self._sections = readSections(self._mmap)[1]
+            if journal and filename.endswith(".tgs"):
+                self._readJournal(filename[:-len(".tgs")] + ".journal")
+        except:
+            self.close()
+            raise
+
+    def _mapSections(self):
+        ''' memoryviews of the sections of the file '''
+        memory = memoryview(self._mmap)
+        self._views.append(memory)
+        sections = {}
+        for name, (offset, typecode, length) in sectionOffsets(self._header).items():
+            end = offset + length*array(typecode).itemsize
+            if end > len(self._mmap):
+                raise ValueError("truncated tournament snapshot")
+            view = memory[offset:end]
+            if typecode != 'B':
+                view = view.cast(typecode)
+            self._views.append(view)
+            sections[name] = view
+        return sections
+
+    def _readJournal(self, journalPath):
+        if not os.path.exists(journalPath):
+            return
+        with open(journalPath,"rb") as f:
+            data = f.read()
+        # journal of an older snapshot, its events are already in the snapshot
+        if readGeneration(data) != self._header["generation"]:
+            return
+        for recordType, event, end in iterEvents(data):
+            if recordType == RACE:
+                self._journalRaces.append(event)
+                for i in event:
+                    self._setCounter("races",i,self.playerRaces(i) + 1)
+            else:
+                self._addRaceResult(event)
+
+    def _addRaceResult(self, event):
+        ''' applies a race result of the journal to the counters, as Tournament '''
+        event = sorted(event,key=lambda entry : entry[1])
+        points = self.points
+        for position in range(0,len(event)):
+            i, lapTime = event[position][0], event[position][2]
+            if position < len(points):
+                self._setCounter("playerPoints",i,self.playerPoints(i) + points[position])
+            fastestLap = self._counter("fastestLap",i)
+            if fastestLap == NO_FASTEST_LAP or lapTime < fastestLap:
+                self._setCounter("fastestLap",i,lapTime)
+            self._setCounter("racesDone",i,self.playerRacesDone(i) + 1)
+        self._journalResults.append([(i,lapTime) for i, position, lapTime in event])
+        # first by position if same time
+        fastest = min(event,key=lambda entry : entry[2])[0]
+        self._setCounter("playerPoints",fastest,self.playerPoints(fastest) + self.pointsFastestLap)
+
+    def _counter(self, section, index):
+        return self._journalCounters[section].get(index,self._sections[section][index])
+
+    def _setCounter(self, section, index, value):
+        self._journalCounters[section][index] = value
+
+    def _column(self, section):
+        ''' counters of every player, with the changes of the journal '''
+        column = self._sections[section]
+        changes = self._journalCounters[section]
+        if changes:
+            column = list(column)
+            for i, value in changes.items():
+                column[i] = value
+        return column
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def numberOfPlayers(self):
+        return self._header["numberOfPlayers"]
+
+    @property
+    def numberOfRaces(self):
+        return self._header["numberOfRaces"] + len(self._journalRaces)
+
+    @property
+    def numberOfRaceResults(self):
+        return self._header["numberOfRaceResults"] + len(self._journalResults)
+
+    @property
+    def journalEvents(self):
+        ''' events of the journal read with the snapshot '''
+        return len(self._journalRaces) + len(self._journalResults)
+
+    @property
+    def points(self):
+        return tuple(self._sections["points"])
+
+    @property
+    def pointsFastestLap(self):
+        return self._header["pointsFastestLap"]
+
+### PLAYERS ###
+    def playerName(self, index):
+        nameOffsets = self._sections["nameOffsets"]
+        return bytes(self._sections["names"][nameOffsets[index]:nameOffsets[index+1]]).decode("utf-8")
+
+    def playerRaces(self, index):
+        return self._counter("races",index)
+
+    def playerRacesDone(self, index):
+        return self._counter("racesDone",index)
+
+    def playerPoints(self, index):
+        return self._counter("playerPoints",index)
+
+    def playerFastestLap(self, index):
+        ''' datetime.time, None if the player has no fastest lap '''
+        fastestLap = self._counter("fastestLap",index)
+        if fastestLap == NO_FASTEST_LAP:
+            return None
+        return microsecondsToTime(fastestLap)
+###############
+
+### RACES ###
+    def getRace(self, index):
+        ''' player indexes of race index '''
+        if index >= self._header["numberOfRaces"]:
+            return list(self._journalRaces[index - self._header["numberOfRaces"]])
+        raceOffsets = self._sections["raceOffsets"]
+        return list(self._sections["racePlayers"][raceOffsets[index]:raceOffsets[index+1]])
+
+    def getRaces(self):
+        return [self.getRace(i) for i in range(0,self.numberOfRaces)]
+
+    def getRaceResult(self, index):
+        ''' [ (player index, time), ... ] of race result index in order of arrival '''
+        if index >= self._header["numberOfRaceResults"]:
+            return [(i,microsecondsToTime(lapTime)) for i, lapTime in self._journalResults[index - self._header["numberOfRaceResults"]]]
+        resultOffsets = self._sections["resultOffsets"]
+        lapTimes = self._sections["resultLapTimes"]
+        players = self._sections["resultPlayers"]
+        return [(players[i],microsecondsToTime(lapTimes[i])) for i in range(resultOffsets[index],resultOffsets[index+1])]
+
+    def getRacesToDo(self):
+        ''' player indexes of the races without race result (one result for each race, as Tournament) '''
+        resultOffsets = self._sections["resultOffsets"]
+        resultPlayers = self._sections["resultPlayers"]
+        results = {}
+        for r in range(0,self._header["numberOfRaceResults"]):
+            key = tuple(sorted(resultPlayers[resultOffsets[r]:resultOffsets[r+1]]))
+            results[key] = results.get(key,0) + 1
+        for raceResult in self._journalResults:
+            key = tuple(sorted(i for i, lapTime in raceResult))
+            results[key] = results.get(key,0) + 1
+        racesToDo = []
+        for race in self.getRaces():
+            key = tuple(sorted(race))
+            if results.get(key,0) > 0:
+                results[key] -= 1
+            else:
+                racesToDo.append(race)
+        return racesToDo
+#############
+
+### STANDINGS ###
+    def getStandings(self):
+        ''' player indexes ordered by points (same points: order of players), as Tournament '''
+        points = self._column("playerPoints")
+        return sorted(range(0,self.numberOfPlayers),key=lambda i : (-points[i],i))
+
+    def getStandingsPrintable(self):
+        ''' [ (player name, number of races, points), ... ] ordered by points '''
+        return [(self.playerName(i),self.playerRacesDone(i),self.playerPoints(i)) for i in self.getStandings()]
+
+    def getFastestLapStanding(self):
+        ''' player indexes with a fastest lap ordered by fastest lap, as Tournament '''
+        fastestLap = self._column("fastestLap")
+        players = [i for i in range(0,self.numberOfPlayers) if fastestLap[i] != NO_FASTEST_LAP]
+        return sorted(players,key=lambda i : (fastestLap[i],i))
+
+    def getFastestLapStandingPrintable(self):
+        ''' [ (player name, time), ... ] ordered by fastest lap '''
+        return [(self.playerName(i),lapTimeToStr(self.playerFastestLap(i))) for i in self.getFastestLapStanding()]
+#################
@@ -0,0 +1,97 @@
+########################################################################
+# Software for generating races of a tournament
+# Copyright (C) 2018 Axel Bernardinis <abernardinis@hotmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+########################################################################
+
+
+from bisect import bisect_left
+from collections.abc import Sequence
+
+class Standings(Sequence):
+    '''
+        Players kept in order, without sorting again the whole list
+        key(player) must return (value, tie-break), players with lower key come first:
+            a player must be removed before its value changes, and added again after
+        Adding or removing a player is O(log n) to search + O(n) to move (list insertion)
+    '''
+    def __init__(self, key, players=()):
+        self._key = key
+        # sorted keys, and players in the same order
+        self._keys = []
+        self._players = []
+        for player in players:
+            self.add(player)
+
+    def __len__(self):
+        return len(self._players)
+
+    def __getitem__(self, index):
+        return self._players[index]
+
+    def __contains__(self, player):
+        i = bisect_left(self._keys,self._key(player))
+        return i < len(self._players) and self._players[i] is player
+
+    @property
+    def players(self):
+        return list(self._players)
+
+    def add(self, player):
+        key = self._key(player)
+        i = bisect_left(self._keys,key)
+        self._keys.insert(i,key)
+        self._players.insert(i,player)
+
+    def remove(self, player):
+        i = bisect_left(self._keys,self._key(player))
+        if i == len(self._players) or self._players[i] is not player:
+            raise ValueError(str(player) + " not in standings")
+        self._keys.pop(i)
+        self._players.pop(i)
+
+    def first(self):
+        ''' first player, None if empty '''
+        if len(self._players) == 0:
+            return None
+        return self._players[0]
+
+    def rank(self, player):
+        ''' 1 + number of players with a better value (players with same value have same rank) '''
+        return bisect_left(self._keys,self._key(player)[:1]) + 1
+
+    def position(self, player):
+        ''' 1-based position of player in the standings (different for players with same value) '''
+        i = bisect_left(self._keys,self._key(player))
+        if i == len(self._players) or self._players[i] is not player:
+            raise ValueError(str(player) + " not in standings")
+        return i + 1
+
+    def top(self, n):
+        ''' first n players '''
+        return self._players[:n]
+
+    def between(self, first, last):
+        ''' players from position first to position last (1-based, included) '''
+        return self._players[max(first-1,0):last]
+
+# keys of the standings of a tournament (functions of the module, so that the standings can be pickled)
+def pointsKey(player):
+    ''' more points first, then order of players '''
+    return (-player.points,player.index)
+
+def fastestLapKey(player):
+    ''' better fastest lap first, then order of players '''
+    return (player.fastestLap,player.index)
@@ -17,40 +17,82 @@
 ########################################################################
 
 from itertools import combinations
-from random import randint
 from datetime import time
+from array import array
 
 from .player import *
 from .raceCosts import *
-from .helper import removeList2fromList1, convertRaceResultToRace, sameRace
+from .faceCounts import FaceCounts
+from .playerColumns import PlayerColumns
+from .raceColumns import RaceColumns, RaceResultColumns, raceIndexKey
+from .standings import Standings, pointsKey, fastestLapKey
+from .sequenceView import SequenceView
+from .helper import convertRaceResultToRace, raceKey, randomIndex, microsecondsToTime
+
+def _checkNewPlayers(players):
+    ''' players are views on the face-count index of their tournament, so they can't be in two tournaments '''
+    for player in players:
+        if player.index != None:
+            raise ValueError(str(player) + " is already a player of a tournament")
+    if len(set(id(player) for player in players)) != len(players):
+        raise ValueError("players must be different")
 
 class Tournament():
     'Tournament class, containing players and races'
-    def __init__(self, players, points=(), pointsFastestLap=1):
+    def __init__(self, players, points=(), pointsFastestLap=1, useNumpy=False, columnarRaces=False):
+        _checkNewPlayers(players)
         self._players = players
+        # number of times each player has faced each other, keyed by index of player
+        self._faceCounts = FaceCounts(len(self._players),useNumpy)
+        # races, races done, points and fastest lap of each player, keyed by index of player
+        self._playerColumns = PlayerColumns(self._players)
+        for i in range(0,len(self._players)):
+            self._players[i].attachFaceCounts(self._faceCounts,i,self._playerColumns)
+        # players could have already faced someone before being indexed
+        for player in self._players:
+            player.indexFacedPlayers()
         # contains tuple with points assigned for each position
         self._points = points
         # points assigned for fastest lap of race
         self._pointsFastestLap = pointsFastestLap
+        # if True, races and race results are stored as arrays of player indexes (see raceColumns)
+        self._columnarRaces = columnarRaces
         # races, which are lists of players in the race
-        self._races = []
+        self._races = RaceColumns(self._players) if columnarRaces else []
+        # canonical identity of races (smaller keys with columnar races)
+        self._raceKey = raceIndexKey if columnarRaces else raceKey
         # race results which are arrays of (player, time) tuples in the order of arrival
-        self._raceResults = []
-        # races to do (not played yet)
-        self._racesToDo = []
-        # list of players in the order based on points
-        self._standings = list(self._players)
-        # list of players in the order based on fastest lap
-        self._standingsFastestLap = []
+        self._raceResults = RaceResultColumns(self._players) if columnarRaces else []
+        # index of races by raceKey: key -> [ race index, ... ]
+        self._raceIndexes = {}
+        # races to do (not played yet), race index -> None, in the order of the races
+        self._racesToDo = {}
+        # race indexes to do by raceKey, in the order of the races: key -> [ race index, ... ]
+        self._racesToDoIndexes = {}
+        # list of races to do, built when needed (None after a change of races to do)
+        self._racesToDoList = None
+        # results without a race to do (yet), by raceKey: key -> number of results
+        self._resultsWithoutRace = {}
+        # players in the order based on points (same points: order of players)
+        self._standings = Standings(pointsKey,self._players)
+        # players with a fastest lap in the order based on fastest lap (same time: order of players)
+        self._standingsFastestLap = Standings(fastestLapKey,\
+            [player for player in self._players if player.fastestLap != None])
+        # points or fastest lap of a player changed outside of a race result (player.addPoints, ...)
+            # move the player in the standings
+        self._playerColumns.changed = self._playerChanged
+        # True while race results are applied, the standings are updated once for their players
+        self._applyingRaceResults = False
 
     @classmethod
-    def init_WithPlayerGenerator(cls, playerGenerator, points=(), pointsFastestLap=1):
-        return cls(playerGenerator.generate(),points,pointsFastestLap)
+    def init_WithPlayerGenerator(cls, playerGenerator, points=(), pointsFastestLap=1, useNumpy=False, columnarRaces=False):
+        return cls(playerGenerator.generate(),points,pointsFastestLap,useNumpy,columnarRaces)
     
     def addRace(self,race):
         # race must be a list or tuple of Player
         if ( (isinstance(race,list) or isinstance(race,tuple)) and isinstance(race[0],Player) ):
             self._races.append(race)
+            self._indexRace(len(self._races)-1,race)
             # increment number of races
             for player in race:
                 player.addRace()
@@ -62,42 +104,158 @@ class Tournament():
             raise TypeError(race + " is not of type Player")
         return
     
+    def clearRaces(self):
+        ''' removes all the races, so that they can be generated again (only if no race has been played) '''
+        if len(self._raceResults) != 0:
+            raise ValueError("Races can't be removed after race results")
+        self._races = RaceColumns(self._players) if self._columnarRaces else []
+        self._raceIndexes = {}
+        self._racesToDo = {}
+        self._racesToDoIndexes = {}
+        self._racesToDoList = None
+        self._resultsWithoutRace = {}
+        self._faceCounts = FaceCounts(len(self._players),self._faceCounts.usesNumpy)
+        for i in range(0,len(self._players)):
+            self._players[i].clearRaces()
+            self._players[i].attachFaceCounts(self._faceCounts,i,self._playerColumns)
+
+    def addPlayers(self, players):
+        '''
+            adds players joining after the races have been generated, races and race results are kept
+            the races of the new players are generated by RaceGenerator.generate_newPlayers
+        '''
+        _checkNewPlayers(players)
+        first = len(self._players)
+        # face-count index, player columns and races share the list of players
+        self._players.extend(players)
+        self._faceCounts.addPlayers(len(players))
+        self._playerColumns.addPlayers(len(players))
+        for i in range(first,len(self._players)):
+            self._players[i].attachFaceCounts(self._faceCounts,i,self._playerColumns)
+        for player in players:
+            player.indexFacedPlayers()
+            self._standings.add(player)
+            if player.fastestLap != None:
+                self._standingsFastestLap.add(player)
+
+    def _restore(self, races, raceResults, counters):
+        '''
+            sets the races and race results of a new tournament without applying them again (see snapshot):
+                races are lists of player indexes
+                race results are (player indexes, positions, lap times in microseconds) in order of arrival
+                counters are the races, races done, points and fastest lap (microseconds) of each player
+        '''
+        players = self._players
+        self._faceCounts.addRaces(races)
+        for indexes in races:
+            race = [players[i] for i in indexes]
+            self._races.append(race)
+            self._indexRace(len(self._races)-1,race)
+        for indexes, positions, lapTimes in raceResults:
+            raceResult = [(players[indexes[i]],microsecondsToTime(lapTimes[i])) for i in range(0,len(indexes))]
+            if self._columnarRaces:
+                self._raceResults.append(raceResult,list(positions))
+            else:
+                self._raceResults.append(raceResult)
+            self._raceDone(convertRaceResultToRace(raceResult))
+        columns = self._playerColumns
+        racesOfPlayers, racesDone, points, fastestLap = counters
+        columns.races[:] = array('l',racesOfPlayers)
+        columns.racesDone[:] = array('l',racesDone)
+        columns.points[:] = array('q',points)
+        columns.fastestLap[:] = array('q',fastestLap)
+        self._standings = Standings(pointsKey,players)
+        self._standingsFastestLap = Standings(fastestLapKey,[player for player in players if player.fastestLap != None])
+
+    def _indexRace(self, index, race):
+        ''' adds the race at index to the index of races, and to the races to do if no result is waiting for it '''
+        key = self._raceKey(race)
+        self._raceIndexes.setdefault(key,[]).append(index)
+        # a result of this race was added before the race
+        if self._resultsWithoutRace.get(key,0) > 0:
+            self._resultsWithoutRace[key] -= 1
+        else:
+            self._racesToDo[index] = None
+            self._racesToDoList = None
+            self._racesToDoIndexes.setdefault(key,[]).append(index)
+
+    def _raceDone(self, race):
+        ''' removes from races to do the first race with players of race, or keeps the result for a later race '''
+        key = self._raceKey(race)
+        indexes = self._racesToDoIndexes.get(key)
+        if indexes:
+            del self._racesToDo[indexes.pop(0)]
+            self._racesToDoList = None
+        else:
+            self._resultsWithoutRace[key] = self._resultsWithoutRace.get(key,0) + 1
+
+    def _getRacesToDoList(self):
+        ''' list of races to do, built again only if races to do have changed '''
+        if self._racesToDoList is None:
+            self._racesToDoList = [self._races[i] for i in self._racesToDo]
+        return self._racesToDoList
+
+    # properties are read-only views that follow the changes of the tournament (see SequenceView),
+        # get* methods (getPlayers, getRaces, ...) return copies
     @property
     def players(self):
-        return list(self._players)
+        return SequenceView(self._players)
 
     @property
     def points(self):
         return self._points
 
+    @property
+    def faceCounts(self):
+        return self._faceCounts
+
+    @property
+    def columnarRaces(self):
+        return self._columnarRaces
+
+    @property
+    def playerColumns(self):
+        return self._playerColumns
+
     @property
     def pointsFastestLap(self):
         return self._pointsFastestLap
 
     @property
     def races(self):
-        return list(self._races)
+        return SequenceView(self._races)
 
     @property
     def raceResults(self):
-        return list(self._raceResults)
+        return SequenceView(self._raceResults)
 
     @property
     def racesToDo(self):
-        self._calculateRacesToDo()
-        return list(self._racesToDo)
+        return SequenceView(self._getRacesToDoList)
 
     @property
     def standings(self):
-        return list(self._standings)
+        return SequenceView(self._standings)
     
     @property
     def standingsFastestLap(self):
-        return list(self._standingsFastestLap)
+        return SequenceView(self._standingsFastestLap)
     
     def getNumberOfPlayers(self):
         return len(self._players)
 
+    def getPlayers(self):
+        return list(self._players)
+
+    def getRaces(self):
+        return list(self._races)
+
+    def getRaceResults(self):
+        return list(self._raceResults)
+
+    def getRacesToDo(self):
+        return list(self._getRacesToDoList())
+
 
     def getRace(self,index):
         return list(self._races[index])
@@ -105,24 +263,24 @@ class Tournament():
     def getRaceResult(self,index):
         return list(self._raceResults[index])
 
+    def getRaceResultPositions(self,index):
+        ''' positions of the players of race result index, in order of arrival '''
+        if self._columnarRaces:
+            return list(self._raceResults.positions(index))
+        return list(range(1,len(self._raceResults[index])+1))
+
     def getRaceToDo(self,index):
-        self._calculateRacesToDo()
-        return list(self._racesToDo[index])
+        return list(self._getRacesToDoList()[index])
 
     def raceExists(self,race):
-        for r in self._races:
-            # check if every player of race is contained in r, if so raceExists
-            allRplayersInRace = True
-            i = 0
-            while (i < len(r)) and allRplayersInRace:
-                # if race does not contain player (r[i])
-                if not (r[i] in race):
-                    allRplayersInRace = False
-                i += 1
-            # if all players of r are in race, then this is the race, so raceExists
-            if allRplayersInRace:
-                return True
-        return False
+        for player in race:
+            if not self._isPlayer(player):
+                return False
+        return self._raceKey(race) in self._raceIndexes
+
+    def _isPlayer(self, player):
+        ''' checks if player is a player of the tournament '''
+        return player.index != None and player.index < len(self._players) and self._players[player.index] is player
         
     def playersSameNumberOfRaces(self):
         ''' checks if all players of tournament have the same number of races '''
@@ -143,30 +301,25 @@ class Tournament():
     
     def somebodyDidNotFaceEveryone(self):
         ''' checks if there is at least a player that hasn't faced every other player '''
-        for player in self._players:
-            # if player has at least a player not faced, then somebodyDidNotFaceEveryone (true)
-            if len(player.playersNotFaced(self._players)) != 0:
-                return True
-        # all players have playersNotFaced list empty, so everyone has faced everyone
-        return False
+        return not self._faceCounts.everyoneFacedEveryone()
 
     def getPlayerThatHasntFacedEveryone(self):
         for player in self._players:
             # if player has at least a player not faced, then return this player
-            if len(player.playersNotFaced(self._players)) != 0:
+            if not self._faceCounts.playerFacedEveryone(player.index):
                 return player
         # all players have playersNotFaced list empty, so everyone has faced everyone
         return None
 
-    def getRandomPlayerThatHasntFacedEveryone(self):
+    def getRandomPlayerThatHasntFacedEveryone(self, rng=None):
         p = []
         for player in self._players:
             # if player has at least a player not faced, then return this player
-            if len(player.playersNotFaced(self._players)) != 0:
+            if not self._faceCounts.playerFacedEveryone(player.index):
                 p.append(player)
         # random index of players that haven't faced everyone
         if (len(p) != 0):
-            i = randint(0,len(p)-1) 
+            i = randomIndex(len(p),rng)
             return p[i]
         else:
             return None
@@ -190,19 +343,71 @@ class Tournament():
                 add races done
             give point for fastest lap
         '''
+        self._checkRaceResult(resultsTuples)
+        players = [resultsTuple[0] for resultsTuple in resultsTuples]
+        # players are moved in standings after their points and fastest lap change
+        self._removeFromStandings(players)
+        self._applyingRaceResults = True
+        try:
+            self._applyRaceResult(resultsTuples)
+        finally:
+            self._applyingRaceResults = False
+            self._addToStandings(players)
+
+    def addRaceResults(self,batch):
+        '''
+            batch is a list of race results, each one as resultsTuples of addRaceResult
+            the whole batch is checked before adding any race result,
+            so if a race result is not valid none is added
+            standings are updated once for the whole batch
+        '''
+        for resultsTuples in batch:
+            self._checkRaceResult(resultsTuples)
+        # every player of the batch, once
+        players = list(dict.fromkeys(resultsTuple[0] for resultsTuples in batch for resultsTuple in resultsTuples))
+        self._removeFromStandings(players)
+        self._applyingRaceResults = True
+        try:
+            for resultsTuples in batch:
+                self._applyRaceResult(resultsTuples)
+        finally:
+            self._applyingRaceResults = False
+            self._addToStandings(players)
+
+    def _checkRaceResult(self,resultsTuples):
+        ''' raises TypeError or ValueError if resultsTuples is not a valid race result of the tournament '''
+        if not (isinstance(resultsTuples,list) or isinstance(resultsTuples,tuple)) or len(resultsTuples) == 0:
+            raise TypeError(str(resultsTuples) + " is not a list of (player,position,time)")
+        players = set()
+        positions = set()
+        for resultsTuple in resultsTuples:
+            if len(resultsTuple) != 3 or not isinstance(resultsTuple[0],Player) or type(resultsTuple[2]) is not time:
+                raise TypeError(str(resultsTuple) + " is not of type (player,position,time)")
+            player = resultsTuple[0]
+            if not self._isPlayer(player):
+                raise ValueError(str(player) + " is not a player of the tournament")
+            if player in players:
+                raise ValueError(str(player) + " is more than once in the race result")
+            position = resultsTuple[1]
+            if type(position) is not int or position < 1 or position > len(resultsTuples):
+                raise ValueError("position " + str(position) + " is not between 1 and " + str(len(resultsTuples)))
+            if position in positions:
+                raise ValueError("position " + str(resultsTuple[1]) + " is more than once in the race result")
+            players.add(player)
+            positions.add(resultsTuple[1])
+
+    def _applyRaceResult(self,resultsTuples):
+        ''' adds the race result, without updating the standings '''
         # creates race result
         raceResult = []
-        # sort race results by position
-        resultsTuples.sort(key=lambda resultsTuple : resultsTuple[1])
+        # race results by position
+        resultsTuples = sorted(resultsTuples,key=lambda resultsTuple : resultsTuple[1])
         i = 0
         for resultsTuple in resultsTuples:
           # give points to each player
             # if there are point for that position
-            try:
+            if i < len(self._points):
                 resultsTuple[0].addPoints(self._points[i])
-            except IndexError:
-                # there are no points for ith position
-                pass
             i += 1
           # set fastest lap time of each player
             # if player has not fastest time
@@ -213,55 +418,54 @@ class Tournament():
             resultsTuple[0].addRaceDone()
           # append (player,time)
             raceResult.append((resultsTuple[0],resultsTuple[2]))
-        self._raceResults.append(raceResult)
-        # sort race results by fastest lap time, and give player points for fastestLap
-        resultsTuples.sort(key=lambda resultsTuple : resultsTuple[2])
-        resultsTuples[0][0].addPoints(self._pointsFastestLap)
-
-    def _calculateStandingsFastestLap(self):
-        ''' calculates and stores players ordered by fastest lap '''
-        # if standingsFastestLap does not contain all players
-            # copy players to standingsFastestLap
-            # remove players without fastestLap
-        # sort standingsFastestLap
-        if (len(self._standingsFastestLap) != len(self._players)):
-            self._standingsFastestLap = list(self._players)
-            i = 0
-            while i < len(self._standingsFastestLap):
-                if (self._standingsFastestLap[i].fastestLap == None):
-                    self._standingsFastestLap.pop(i)
-                else:
-                    i += 1
-        self._standingsFastestLap.sort(key=lambda player : player.fastestLap)
-
-    def _calculateStandings(self):
-        ''' calculates and stores players ordered by points '''
-        self._standings.sort(key=lambda player : player.points,reverse=True)
+        if self._columnarRaces:
+            self._raceResults.append(raceResult,[resultsTuple[1] for resultsTuple in resultsTuples])
+        else:
+            self._raceResults.append(raceResult)
+        self._raceDone(convertRaceResultToRace(raceResult))
+        # give player with fastest lap time points for fastestLap (first by position if same time)
+        min(resultsTuples,key=lambda resultsTuple : resultsTuple[2])[0].addPoints(self._pointsFastestLap)
+
+    def _playerChanged(self, player, change, args):
+        ''' applies change(*args) to the points or fastest lap of player, moving it in the standings '''
+        if self._applyingRaceResults:
+            change(*args)
+            return
+        self._removeFromStandings([player])
+        try:
+            change(*args)
+        finally:
+            self._addToStandings([player])
+
+    def _removeFromStandings(self, players):
+        for player in players:
+            self._standings.remove(player)
+            if player.fastestLap != None:
+                self._standingsFastestLap.remove(player)
+
+    def _addToStandings(self, players):
+        for player in players:
+            self._standings.add(player)
+            if player.fastestLap != None:
+                self._standingsFastestLap.add(player)
 
     def getFastestLapTime(self):
-        self._calculateStandingsFastestLap()
         if (len(self._standingsFastestLap) == 0):
             return None
         else:
-            return self._standingsFastestLap[0].fastestLap
+            return self._standingsFastestLap.first().fastestLap
 
     def getFastestLapPlayer(self):
-        self._calculateStandingsFastestLap()
-        if (len(self._standingsFastestLap) == 0):
-            return None
-        else:
-            return self._standingsFastestLap[0]
+        return self._standingsFastestLap.first()
 
     def getFastestLapStanding(self):
         ''' returns [ player, ... ] ordered by fastest lap '''
-        self._calculateStandingsFastestLap()
-        return list(self._standingsFastestLap)
+        return self._standingsFastestLap.players
 
     def getFastestLapStandingPrintable(self):
         ''' returns [ (player name, time), ... ] rdered by fastest lap '''
-        self._calculateStandingsFastestLap()
         result = []
-        for player in self._standingsFastestLap:
+        for player in self._standingsFastestLap.players:
             result.append(\
                 (\
                     player.name,\
@@ -272,14 +476,24 @@ class Tournament():
 
     def getStandings(self):
         ''' returns [ player, ... ] ordered by points '''
-        self._calculateStandings()
-        return list(self._standings)
+        return self._standings.players
+
+    def getRank(self, player):
+        ''' rank of player by points (1 + number of players with more points) '''
+        return self._standings.rank(player)
+
+    def getTopStandings(self, n):
+        ''' returns [ player, ... ] of the first n players by points '''
+        return self._standings.top(n)
+
+    def getStandingsBetween(self, first, last):
+        ''' returns [ player, ... ] from position first to position last (1-based, included) by points '''
+        return self._standings.between(first,last)
 
     def getStandingsPrintable(self):
         ''' returns [ (player name, number of races, points), ... ] ordered by points '''
-        self._calculateStandings()
         result = []
-        for player in self._standings:
+        for player in self._standings.players:
             result.append(\
                 (\
                     player.name,\
@@ -289,22 +503,6 @@ class Tournament():
             )
         return result
 
-    def _calculateRacesToDo(self):
-        if self._racesToDo == []:
-            # all races, then I remove the ones already done
-            self._racesToDo = list(self._races)
-        # temporarily store races which will be removed at the end
-        racesToRemove = []
-        # for each race to do check if present in race results, if so remove it
-        for race in self._racesToDo:
-            for raceResultTmp in self._raceResults:
-                raceResult = convertRaceResultToRace(raceResultTmp)
-                # if raceResult is the same as race, then this race is already done
-                    # so I remove it from racesToDo
-                if sameRace(raceResult,race):
-                    racesToRemove.append(race)
-        removeList2fromList1(self._racesToDo,racesToRemove)
-
 ### PRINT FUNCTIONS ###
     ### PRINT CHECKS ###
     def printNumberOfRacesOfEachPlayer(self):
@@ -19,19 +19,40 @@
 from __future__ import print_function
 import os.path
 from cmd import Cmd
-import pickle
+import threading
 
 from .tournament import *
+from .snapshot import saveSnapshot, loadSnapshotFile, isSnapshotFile
+from .legacyPickle import loadPickleFile
+from .journal import Journal
+from .generationStats import GenerationStats
 from .randomPlayerGenerator import RandomPlayerGenerator
 from .playerGeneratorFromFile import PlayerGeneratorFromFile
 from .raceGenerator import RaceGenerator
-from .helper import printRaces, convertRaceResultToRace, convertRaceResultsToRaces, sameRace, lapTimeToStr
+from .bounds import minimumNumberOfRaces
+from .scheduleCache import ScheduleCache, scheduleOf
+from .helper import printRaces, printRace, convertRaceResultToRace, convertRaceResultsToRaces, sameRace, lapTimeToStr
 
 class TournamentShell(Cmd):
     'Class for tournament shell interface'
-    def __init__(self,t=None,np=None,pr=None,p=None,pf=None,flp=1):
+    # commands that take the lock of the tournament only when needed, since they wait for the user
+    _unlockedCommands = ("playRace",)
+
+    def __init__(self,t=None,np=None,pr=None,p=None,pf=None,flp=1,journal=None,scheduleCache=None):
         Cmd.__init__(self)
         self._tournament = t
+        # prompt when no tournament is generated in background
+        self._defaultPrompt = self.prompt
+        # lock of the tournament, taken by commands and by the background generation for each race
+        self._lock = threading.RLock()
+        # background generation: thread, cancel event, minimum number of races
+        self._generationThread = None
+        self._cancelGeneration = threading.Event()
+        self._minimumNumberOfRaces = 0
+        # backup of the tournament: snapshot after generation, and journal of every race result
+        self._journal = journal if journal != None else Journal("tournament")
+        # schedules of previous generations, reused for the same number of players and players per race
+        self._scheduleCache = scheduleCache if scheduleCache != None else ScheduleCache()
         # number of players of the tournament needed for generation without file with player names
         self._numberOfPlayers = np
         # number of players that participate in each race
@@ -46,16 +67,64 @@ class TournamentShell(Cmd):
     
     @classmethod
     def init_fromPickle(cls, filename):
-        tournament = pickle.load(open(filename,"rb"))
+        ''' from a pickle backup, also of older versions '''
+        return cls._init_fromTournament(loadPickleFile(filename))
+
+    @classmethod
+    def init_fromSnapshot(cls, filename):
+        return cls._init_fromTournament(loadSnapshotFile(filename))
+
+    @classmethod
+    def init_fromJournal(cls, basePath):
+        ''' from the snapshot basePath.tgs and the race results of the journal basePath.journal '''
+        journal = Journal(basePath)
+        tournament = journal.recover()
+        if tournament == None:
+            raise ValueError("no backup " + journal.snapshotPath)
+        return cls._init_fromTournament(tournament,journal)
+
+    @classmethod
+    def init_fromBackup(cls, filename):
+        ''' from a snapshot backup (with its journal, if any), or from a pickle backup of older versions '''
+        if isSnapshotFile(filename):
+            if filename.endswith(".tgs"):
+                return cls.init_fromJournal(filename[:-len(".tgs")])
+            return cls.init_fromSnapshot(filename)
+        return cls.init_fromPickle(filename)
+
+    @classmethod
+    def _init_fromTournament(cls, tournament, journal=None):
         # get the first race to see how many players per race
-        return cls(\
+            # no races if the backup was written when the background generation started
+        shell = cls(\
             tournament,\
             tournament.getNumberOfPlayers(),\
-            len(tournament.getRace(0)),\
-            tournament.points\
+            len(tournament.getRace(0)) if len(tournament.races) > 0 else None,\
+            tournament.points,\
+            journal=journal\
         )
+        # without the journal it was recovered from, the tournament needs its snapshot before race results are journaled
+        if journal == None:
+            shell._backup()
+        return shell
 
 ### CMD commands ###
+    def onecmd(self,line):
+        # commands see the tournament between two races generated in background
+        command = self.parseline(line)[0]
+        if command in self._unlockedCommands:
+            return Cmd.onecmd(self,line)
+        with self._lock:
+            return Cmd.onecmd(self,line)
+
+    def postcmd(self,stop,line):
+        # progress of background generation in the prompt
+        if self.generating:
+            self.prompt = "(generating " + self._generationProgress() + ") "
+        else:
+            self.prompt = self._defaultPrompt
+        return stop
+
     # exit function
     def do_quit(self,s):
         exit()
@@ -70,7 +139,7 @@ class TournamentShell(Cmd):
     def help_q(self):
         print("Quits the program")
     
-    ### creates pickle of tournamentGenerator as backup ##
+    ### creates snapshot of tournamentGenerator as backup ##
     def do_backup(self,s):
         if (s != ""):
             p = s.split()
@@ -78,8 +147,8 @@ class TournamentShell(Cmd):
         else:
             self._backup()
     def help_backup(self):
-        print("Creates pickle of tournament as backup.")
-        print("USAGE: backup [filename.p]")
+        print("Creates snapshot of tournament as backup.")
+        print("USAGE: backup [filename.tgs]")
     
     ### generate tournament ###
     def do_generateTournament(self,s):
@@ -95,11 +164,16 @@ class TournamentShell(Cmd):
                 p = s.split()
                 if "-v" in p:
                     v = True
+                b = "-b" in p
+                c = "--noCache" not in p
                 if "--printRacesOnGenerate" in p:
                     p = True
-                self.generateTournament(v,p)
-            # write pickle backup
-            self._backup()
+                else:
+                    p = False
+                self.generateTournament(v,p,b,c)
+            # write snapshot backup (written by the background generation for each race)
+            if not self.generating:
+                self._backup()
         except ValueError as e:
             print("ERROR: cannot generate tournament")
             print(e)
@@ -113,6 +187,8 @@ class TournamentShell(Cmd):
         print("OPTIONS:")
         print("\t -v                     : verbose, prints data to check the correctness of tournament")
         print("\t --printRacesOnGenerate : prints the races as they are generated")
+        print("\t -b                     : generates in background, races can be printed and played while generating")
+        print("\t --noCache              : generates even if a schedule of the same size is cached (kept if better)")
         print("Generates the tournament. NOTE: the following must be set beforehand:")
         print("\t numberOfPlayers or playerListFilename")
         print("\t points")
@@ -121,7 +197,8 @@ class TournamentShell(Cmd):
     def do_playRace(self,s):
         raceInserted = False
         if (s == ""):
-            self.printRacesToDo()
+            with self._lock:
+                self.printRacesToDo()
             raceNumberRaw = input("Number of race to be played: ")
             # quit playRace
             if (raceNumberRaw == "q"):
@@ -130,7 +207,7 @@ class TournamentShell(Cmd):
             while (incorrectNumber):
                 try:
                     raceNumber = int(raceNumberRaw)
-                    if ( (raceNumber > 0) and (raceNumber <= len(self._tournament.racesToDo) ) ):
+                    if ( (raceNumber > 0) and (raceNumber <= self._numberOfRacesToDo()) ):
                         raceInserted = self.playRace(raceNumber)
                         # end loop
                         incorrectNumber = False
@@ -149,16 +226,15 @@ class TournamentShell(Cmd):
             p = s.split()
             try:
                 raceNumber = int(p[0])
-                if ( (raceNumber > 0) and (raceNumber <= len(self._tournament.racesToDo) ) ):
+                if ( (raceNumber > 0) and (raceNumber <= self._numberOfRacesToDo()) ):
                     raceInserted = self.playRace(raceNumber)
                 else:
                     print("Wrong race number")
             except ValueError:
                 print("Wrong race number")
         if (raceInserted):
+            # race result already written to the journal by playRace
             print("Race results inserted")
-            # write pickle backup
-            self._backup()
         else:
             print("ERROR: race results not inserted")
 
@@ -166,6 +242,38 @@ class TournamentShell(Cmd):
         print("USAGE: playRace RACENUMBER")
         print("Adds the result (including fastest time) of the race specified with the number.")
 
+    ### players joining late ###
+    def do_addPlayers(self,s):
+        names = s.split()
+        if len(names) == 0:
+            print("Names of the players must be given")
+        elif self._tournament is None or self.generating:
+            print("ERROR: players can be added only to a generated tournament")
+        else:
+            self.addPlayers(names)
+            # write snapshot backup (the journal has no players)
+            self._backup()
+    def help_addPlayers(self):
+        print("USAGE: addPlayers NAME [NAME ...]")
+        print("Adds players to the generated tournament, and the races needed so that everyone faces everyone again.")
+
+    ### background generation ###
+    def do_generationStatus(self,s):
+        if self.generating:
+            print("Generating: " + self._generationProgress() + " races")
+        else:
+            print("No tournament being generated")
+    def help_generationStatus(self):
+        print("Prints the races generated so far by the background generation, and the minimum number of races")
+    def do_cancelGeneration(self,s):
+        if self.generating:
+            self._cancelGeneration.set()
+            print("Generation will stop after the current race")
+        else:
+            print("No tournament being generated")
+    def help_cancelGeneration(self):
+        print("Stops the background generation, keeping the races generated so far")
+
   ### GETTERS AND SETTERS ###
     def do_setNumberOfPlayers(self,s):
         # check for positive integer
@@ -188,7 +296,7 @@ class TournamentShell(Cmd):
                     error = True
         if (not error):
             self._numberOfPlayers = n
-            # write pickle backup
+            # write snapshot backup
             self._backup()
         else:
             print("Number of players must be positive integer greater than players per race")
@@ -215,7 +323,7 @@ class TournamentShell(Cmd):
                     error = True
         if (not error):
             self._playersPerRace = n
-            # write pickle backup
+            # write snapshot backup
             self._backup()
         else:
             print("Players per race must be positive integer less than number of players")
@@ -246,7 +354,7 @@ class TournamentShell(Cmd):
             error = True
         if (not error):
             self._points = tuple(points)
-            # write pickle backup
+            # write snapshot backup
             self._backup()
         else:
             print("Points must be positive integers separated by a comma")
@@ -272,7 +380,7 @@ class TournamentShell(Cmd):
             error = True
         if (not error):
             self._fastestLapPoint = n
-            # write pickle backup
+            # write snapshot backup
             self._backup()
         else:
             print("Fastest lap point must be positive integer")
@@ -381,7 +489,19 @@ class TournamentShell(Cmd):
         else:
             self._fastestLapPoint = value
     
-    def generateTournament(self,verbose=False,printRacesOnGenerate=False):
+    @property
+    def generating(self):
+        ''' True while the tournament is generated in background '''
+        return self._generationThread != None and self._generationThread.is_alive()
+
+    def waitGeneration(self):
+        ''' waits for the end of the background generation, if any '''
+        if self._generationThread != None:
+            self._generationThread.join()
+
+    def generateTournament(self,verbose=False,printRacesOnGenerate=False,background=False,useCache=True):
+        if self.generating:
+            raise ValueError("Tournament already being generated")
         if (self._playersPerRace == None):
             raise ValueError("Players per race must be defined")
         elif (self._points == None):
@@ -405,20 +525,100 @@ class TournamentShell(Cmd):
         if (self._numberOfPlayers == None):
             self._numberOfPlayers = self._tournament.getNumberOfPlayers()
         # generate races
-        raceGenerator = RaceGenerator(self._playersPerRace,printRacesOnGenerate)
-        raceGenerator.generate_lowCostForPlayerWithLeastRaces(self._tournament)
-        print("Tournament generated")
+        # statistics of the generation, printed if verbose
+        stats = GenerationStats() if verbose else None
+        raceGenerator = RaceGenerator(self._playersPerRace,stats=stats)
+        # schedule cached by a previous generation, players mapped by position
+            # without useCache the schedule is generated, and cached only if better
+        cached = None
+        if useCache:
+            cached = self._scheduleCache.getSchedule(self._tournament.getNumberOfPlayers(),self._playersPerRace)
+        if cached != None:
+            raceGenerator.addSchedule(self._tournament,cached)
+            if printRacesOnGenerate:
+                printRaces(self._tournament.races)
+            print("Tournament generated (cached schedule)")
+        elif background:
+            self._startGeneration(raceGenerator,printRacesOnGenerate)
+            return
+        else:
+            # races streamed as they are generated, Ctrl-C cancels the generation
+            try:
+                for number, race in enumerate(raceGenerator.iterRaces(self._tournament),1):
+                    if printRacesOnGenerate:
+                        printRace(number,race)
+            except KeyboardInterrupt:
+                self._tournament = None
+                print("Generation cancelled")
+                return
+            self._scheduleCache.putSchedule(self._tournament.getNumberOfPlayers(),self._playersPerRace,scheduleOf(self._tournament))
+            print("Tournament generated")
         if verbose:
             printRaces(self._tournament.races)
             self._tournament.printNumberOfRacesOfEachPlayer()
             self._tournament.printPlayersFacedByEachPlayer()
-            
+            print("Races more than the minimum: " + str(raceGenerator.optimalityGap))
+            if cached == None:
+                stats.printSummary()
+
+    def addPlayers(self,names):
+        ''' adds players with names to the tournament, generating only the races of the new players '''
+        raceGenerator = RaceGenerator(self._playersPerRace)
+        firstRace = len(self._tournament.races)
+        raceGenerator.generate_newPlayers(self._tournament,[Player(name) for name in names])
+        self._numberOfPlayers = self._tournament.getNumberOfPlayers()
+        print("Races added:")
+        for number in range(firstRace,len(self._tournament.races)):
+            printRace(number + 1,self._tournament.races[number])
+
+    def _startGeneration(self,raceGenerator,printRacesOnGenerate=False):
+        ''' generates the races in a thread, the shell can print and play the races already generated '''
+        self._cancelGeneration.clear()
+        self._minimumNumberOfRaces = minimumNumberOfRaces(self._tournament.getNumberOfPlayers(),self._playersPerRace)
+        # snapshot without races, races and race results written to the journal
+        self._backup()
+        self._generationThread = threading.Thread(\
+            target=self._generate,\
+            args=(raceGenerator,self._tournament,printRacesOnGenerate),\
+            daemon=True\
+        )
+        self._generationThread.start()
+        print("Generating tournament in background")
+
+    def _generate(self,raceGenerator,tournament,printRacesOnGenerate):
+        def addRace(tournament,race):
+            # the search runs without the lock, commands wait only while a race is added and written to the journal
+            with self._lock:
+                self._journal.addRace(tournament,race)
+                if printRacesOnGenerate:
+                    printRace(len(tournament.races),race)
+        for race in raceGenerator.iterRaces(tournament,cancel=self._cancelGeneration,addRace=addRace):
+            pass
+        with self._lock:
+            self._backup()
+            if not self._cancelGeneration.is_set():
+                self._scheduleCache.putSchedule(tournament.getNumberOfPlayers(),self._playersPerRace,scheduleOf(tournament))
+        if self._cancelGeneration.is_set():
+            print("\nGeneration cancelled: " + str(len(tournament.races)) + " races")
+        else:
+            print("\nTournament generated: " + str(len(tournament.races)) + " races")
+
+    def _numberOfRacesToDo(self):
+        with self._lock:
+            return len(self._tournament.racesToDo)
+
+    def _generationProgress(self):
+        ''' races generated / minimum number of races '''
+        with self._lock:
+            return str(len(self._tournament.races)) + "/" + str(self._minimumNumberOfRaces) + "+"
+
     def playRace(self,raceNumber):
         if ( (raceNumber < 1) and (raceNumber > len(self._tournament.racesToDo)) ):
             print("Wrong race number")
             return False
         i = raceNumber - 1
-        race = self._tournament.getRaceToDo(i)
+        with self._lock:
+            race = self._tournament.getRaceToDo(i)
         raceResult = []
         # positions entered, needed to check that the same players won't have same position
         positions = []
@@ -475,14 +675,23 @@ class TournamentShell(Cmd):
             fastestLap = time(0,minutes,seconds,milliseconds*1000) # *1000 because time needs microseconds
             # add race result
             raceResult.append([player,position,fastestLap])
-        self._tournament.addRaceResult(raceResult)
+        with self._lock:
+            self._journal.addRaceResult(self._tournament,raceResult)
         return True
         
 
             
-    def _backup(self,filename="tournament.p"):
-        ''' creates a pickle as a backup '''
-        pickle.dump(self._tournament,open(filename,"wb"))
+    def _backup(self,filename=None):
+        '''
+            creates a snapshot (see snapshot) as a backup, if the tournament has been generated
+            without filename, it is the snapshot of the journal (and the journal is emptied)
+        '''
+        if self._tournament is None:
+            return
+        if filename == None:
+            self._journal.checkpoint(self._tournament)
+        else:
+            saveSnapshot(self._tournament,filename)
         
 ### PRINT FUNCTIONS ###
     def printRaces(self):
@@ -499,7 +708,7 @@ class TournamentShell(Cmd):
 
     def printPlayers(self):
         print("PLAYERS:")
-        players = self._tournament.players
+        players = self._tournament.getPlayers()
         players.sort(key=lambda player : player.name)
         i = 1
         for player in players:
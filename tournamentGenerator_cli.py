@@ -18,25 +18,29 @@
 
 import sys
 
-from tournamentGenerator import RaceGenerator, Tournament, RandomPlayerGenerator, PlayerGeneratorFromFile
-from tournamentGenerator.helper import printRaces
+from tournamentGenerator import RaceGenerator, Tournament, RandomPlayerGenerator, PlayerGeneratorFromFile, ScheduleCache
+from tournamentGenerator.helper import printRace, printRaces
+from tournamentGenerator.scheduleCache import scheduleOf
 
 if __name__ == '__main__':
-    if len(sys.argv) == 4:
-        debug = bool(sys.argv[3])
-    elif len(sys.argv) == 3:
+    # --noCache: generates even if a schedule is cached (the new one is cached if better)
+    useCache = "--noCache" not in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--noCache"]
+    if len(argv) == 4:
+        debug = bool(argv[3])
+    elif len(argv) == 3:
         debug = False
     else:
         print("tournamentGenerator.py: missing arguments")
-        print("Usage: python tournamentGenerator.py NUMBER_PLAYERS_PER_RACE PLAYERS_NAME_FILE/NUMBER_OF_PLAYERS [DEBUG]")
+        print("Usage: python tournamentGenerator.py NUMBER_PLAYERS_PER_RACE PLAYERS_NAME_FILE/NUMBER_OF_PLAYERS [DEBUG] [--noCache]")
         sys.exit()
     
     numberOfPlayers = 0
-    playersPerRace = int(sys.argv[1])
+    playersPerRace = int(argv[1])
     try:
-        numberOfPlayers = int(sys.argv[2])
+        numberOfPlayers = int(argv[2])
     except ValueError:
-        filename = sys.argv[2]
+        filename = argv[2]
     
     if numberOfPlayers == 0:
         playerGenerator = PlayerGeneratorFromFile(filename)
@@ -46,9 +50,18 @@ if __name__ == '__main__':
     tournament = Tournament.init_WithPlayerGenerator(playerGenerator)
     
     raceGenerator = RaceGenerator(playersPerRace,debug)
-    raceGenerator.generate_lowCostForPlayerWithLeastRaces(tournament)
+    # schedule cached by a previous run with the same number of players, players mapped by position
+    scheduleCache = ScheduleCache()
+    cached = scheduleCache.getSchedule(tournament.getNumberOfPlayers(),playersPerRace) if useCache else None
+    if cached != None:
+        raceGenerator.addSchedule(tournament,cached)
+        printRaces(tournament.races)
+    else:
+        # races printed as soon as they are generated
+        for number, race in enumerate(raceGenerator.iterRaces(tournament),1):
+            printRace(number,race)
+        scheduleCache.putSchedule(tournament.getNumberOfPlayers(),playersPerRace,scheduleOf(tournament))
     
     # debug
-    printRaces(tournament.getRaces())
     tournament.printNumberOfRacesOfEachPlayer()
     tournament.printPlayersFacedByEachPlayer()
@@ -22,9 +22,9 @@ from tournamentGenerator import TournamentShell
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
-        # use pickle
-        pickleFilename = sys.argv[1]
-        myCmd = TournamentShell.init_fromPickle(pickleFilename)
+        # use backup (snapshot, or pickle of older versions)
+        backupFilename = sys.argv[1]
+        myCmd = TournamentShell.init_fromBackup(backupFilename)
     else:
         myCmd = TournamentShell()
     myCmd.cmdloop()